@@ -7,24 +7,107 @@ db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
 
+def register_session_listeners(listeners):
+    """Attach (event name, listener) pairs to db.session, once per process."""
+    from sqlalchemy import event
+
+    # db.session is shared by every app instance, so init_app may run more than once
+    for name, listener in listeners:
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object('app.config.Config')  # config.py in project root
-    
+
+    from app import engine_config
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_config.engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
     db.init_app(app)
+    engine_config.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
+
+    from app.analysis_cache import analysis_cache
+    from app.ai_engine import bug_history
+    from app.incremental import document_store
+    from app.stats import bug_stats
+    from app.search import search_index
+    from app.code_store import code_store
+    from app.user_cache import user_cache
+    from app.access import access_cache
+    from app.passwords import password_hasher
+    from app.metrics import metrics
+    from app.http_cache import http_cache
+    from app.events import event_bus
+    from app.activity import activity_log
+    from app.rollups import bug_rollups
+    from app.jobs import worker_pool
+    analysis_cache.init_app(app)
+    bug_history.init_app(app)
+    document_store.init_app(app)
+    bug_stats.init_app(app)
+    search_index.init_app(app)
+    code_store.init_app(app)
+    user_cache.init_app(app)
+    access_cache.init_app(app)
+    password_hasher.init_app(app)
+    metrics.init_app(app)
+    http_cache.init_app(app)
+    event_bus.init_app(app)
+    activity_log.init_app(app)
+    bug_rollups.init_app(app)
+    worker_pool.init_app(app)
     
     # Import and register blueprints
     from app.routes.auth import auth_bp
     from app.routes.project import project_bp
     from app.routes.bug import bug_bp
     from app.routes.dashboard import dashboard_bp
+    from app.routes.admin import admin_bp
+    from app.routes.search import search_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.bulk import bulk_bp
+    from app.routes.events import events_bp
+    from app.routes.activity import activity_bp
+    from app.routes.analytics import analytics_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(project_bp)
     app.register_blueprint(bug_bp)
     app.register_blueprint(dashboard_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(bulk_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(activity_bp)
+    app.register_blueprint(analytics_bp)
+
+    # CLI commands
+    from app.jobs import jobs_cli
+    from app.batch import batch_cli
+    from app.stats import stats_cli
+    from app.search import search_cli
+    from app.dedup import dedup_cli
+    from app.code_store import blobs_cli
+    from app.bulk import bulk_cli
+    from app.events import events_cli
+    from app.activity import activity_cli
+    from app.rollups import rollups_cli
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(batch_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(dedup_cli)
+    app.cli.add_command(blobs_cli)
+    app.cli.add_command(bulk_cli)
+    app.cli.add_command(events_cli)
+    app.cli.add_command(activity_cli)
+    app.cli.add_command(rollups_cli)
     
     return app
 
@@ -0,0 +1,159 @@
+# app/access.py
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.models import Bug, Team, User, team_members
+from app.ttl_cache import TTLCache
+
+# -------------------------
+# One user's view of the bug table
+# -------------------------
+class AccessScope:
+    """
+    What one user may see: every bug for admins, otherwise the bugs they
+    reported plus every bug in a project one of their teams belongs to.
+    Per-row checks are a set lookup, so they cost the same for a user in
+    one team as for one in a hundred.
+    """
+
+    __slots__ = ("user_id", "is_admin", "project_ids")
+
+    def __init__(self, user_id, is_admin=False, project_ids=frozenset()):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.project_ids = frozenset(project_ids)
+
+    def allows(self, created_by, project_id):
+        return self.is_admin or created_by == self.user_id or project_id in self.project_ids
+
+    def can_view(self, bug):
+        """``bug`` is a Bug or any row with created_by and project_id."""
+        return self.allows(bug.created_by, bug.project_id)
+
+    def can_modify(self, bug):
+        # Team members follow a project's bugs; changing them stays with the reporter
+        return self.is_admin or bug.created_by == self.user_id
+
+    def bug_filter(self):
+        """
+        WHERE clause limiting a Bug query to this scope, or None for admins.
+        Both branches are indexed: (created_by, created_at, id) and
+        (project_id, created_at, id).
+        """
+        if self.is_admin:
+            return None
+        clause = Bug.created_by == self.user_id
+        if self.project_ids:
+            clause = db.or_(clause, Bug.project_id.in_(sorted(self.project_ids)))
+        return clause
+
+    def apply(self, query):
+        clause = self.bug_filter()
+        return query if clause is None else query.where(clause)
+
+    def __repr__(self):
+        return f"<AccessScope user={self.user_id} admin={self.is_admin} projects={len(self.project_ids)}>"
+
+# -------------------------
+# Visible project sets
+# -------------------------
+class AccessCache(TTLCache):
+    """
+    Visible project-id sets by user id, computed with one indexed query
+    over team_members: a memo on ``g`` for the current request and a
+    bounded LRU with a short TTL for the process.
+
+    Committed changes to team membership, a team's project or a team's
+    existence invalidate the users involved in this process; other
+    processes pick the change up when their entry expires. Code that
+    writes team_members with Core statements should call ``invalidate``.
+    """
+
+    memo_key = "_access_cache"
+
+    def __init__(self, ttl=60.0, max_entries=10000):
+        super().__init__(ttl, max_entries)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("ACCESS_CACHE_TTL", self.ttl)
+        self.max_entries = app.config.get("ACCESS_CACHE_MAX_ENTRIES", self.max_entries)
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["access_cache"] = self
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def project_ids(self, user_id):
+        """Frozen set of project ids whose teams ``user_id`` belongs to."""
+        return self.get(user_id)
+
+    @staticmethod
+    def _load(user_id):
+        return frozenset(db.session.execute(
+            db.select(Team.project_id).distinct()
+            .join(team_members, team_members.c.team_id == Team.id)
+            .where(team_members.c.user_id == user_id)
+        ).scalars())
+
+    def scope_for(self, user):
+        """AccessScope for a User or CachedUser; admins need no lookup."""
+        if user.is_admin:
+            return AccessScope(user.id, is_admin=True)
+        return AccessScope(user.id, project_ids=self.project_ids(user.id))
+
+
+access_cache = AccessCache()
+
+def current_scope():
+    """AccessScope of the logged-in user."""
+    from flask_login import current_user
+
+    return access_cache.scope_for(current_user)
+
+# -------------------------
+# Flush-time invalidation
+# -------------------------
+def _member_ids(team, include_removed=True):
+    members = inspect(team).attrs.members.history
+    users = list(members.unchanged or ()) + list(members.added or ())
+    if include_removed:
+        users += list(members.deleted or ())
+    return {user.id for user in users if user.id is not None}
+
+def _collect_membership_changes(session, flush_context, instances):
+    changed = session.info.setdefault("changed_access_user_ids", set())
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if isinstance(obj, Team):
+                state = inspect(obj)
+                if state.attrs.project_id.history.has_changes() and obj in session.dirty:
+                    # Moving a team to another project changes what all of its members see
+                    obj.members  # load the collection so the history below is complete
+                    changed |= _member_ids(obj)
+                else:
+                    members = state.attrs.members.history
+                    changed |= {user.id for user in list(members.added or ()) + list(members.deleted or ())
+                                if user.id is not None}
+            elif isinstance(obj, User) and obj in session.dirty:
+                if inspect(obj).attrs.teams.history.has_changes():
+                    changed.add(obj.id)
+        for obj in session.deleted:
+            if isinstance(obj, Team):
+                obj.members
+                changed |= _member_ids(obj)
+            elif isinstance(obj, User):
+                changed.add(obj.id)
+
+def _after_commit(session):
+    changed = session.info.pop("changed_access_user_ids", None)
+    if changed:
+        access_cache.invalidate(changed)
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("changed_access_user_ids", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_membership_changes),
+    ("after_commit", _after_commit),
+    ("after_soft_rollback", _after_rollback),
+)
@@ -0,0 +1,319 @@
+# app/activity.py
+from datetime import datetime
+
+import click
+from flask import has_request_context
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.models import Bug, BugActivity, BugHistory, Comment
+
+KINDS = ("status", "severity", "project", "ai_fix", "comment")
+# Bug columns logged on change, by activity kind
+TRACKED = {"status": "status", "severity": "severity", "project": "project_id", "ai_fix": "fixed_code_hash"}
+RESOLVED = ("Fixed", "Closed")
+
+# -------------------------
+# Recording
+# -------------------------
+def activity(bug_id, kind, old=None, new=None, actor_id=None, at=None):
+    """One bug_activity row as a dict, for ``log_activity``."""
+    return {
+        "bug_id": bug_id,
+        "kind": kind,
+        "old_value": None if old is None else str(old),
+        "new_value": None if new is None else str(new),
+        "actor_id": actor_id,
+        "created_at": at or datetime.utcnow(),
+    }
+
+def _current_actor():
+    if not has_request_context():
+        return None
+    from flask_login import current_user
+
+    return current_user.id if current_user.is_authenticated else None
+
+def log_activity(session, rows):
+    """
+    Queue activity rows; they are inserted with one statement when the
+    session commits, and dropped on rollback. Bulk writers whose Core
+    statements skip the flush hooks call this directly.
+    """
+    if not activity_log.enabled or not rows:
+        return
+    actor = _current_actor()
+    for row in rows:
+        if row.get("actor_id") is None:
+            row["actor_id"] = actor
+    session.info.setdefault("bug_activity", []).extend(rows)
+
+def _collect_activity(session, flush_context):
+    # after_flush: new objects have ids and dirty ones still show this flush's changes
+    rows = []
+    now = datetime.utcnow()
+    for obj in session.new:
+        if isinstance(obj, Bug):
+            rows.append(activity(obj.id, "status", new=obj.status, at=obj.created_at or now))
+            if obj.fixed_code_hash:
+                rows.append(activity(obj.id, "ai_fix", new=obj.fixed_code_hash, at=obj.created_at or now))
+        elif isinstance(obj, Comment):
+            rows.append(activity(obj.bug_id, "comment", new=obj.id, actor_id=obj.author_id,
+                                 at=obj.created_at or now))
+    for obj in session.dirty:
+        if not isinstance(obj, Bug) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        for kind, column in TRACKED.items():
+            history = state.attrs[column].history
+            if not history.added or history.added == history.deleted:
+                continue
+            old = history.deleted[0] if history.deleted else None
+            rows.append(activity(obj.id, kind, old, history.added[0], at=now))
+    log_activity(session, rows)
+
+def _write_activity(session):
+    # Pending changes are flushed first so their rows join the same INSERT
+    session.flush()
+    rows = session.info.pop("bug_activity", None)
+    if rows:
+        session.connection().execute(db.insert(BugActivity), rows)
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("bug_activity", None)
+
+_SESSION_LISTENERS = (
+    ("after_flush", _collect_activity),
+    ("before_commit", _write_activity),
+    ("after_soft_rollback", _after_rollback),
+)
+
+
+class ActivityLog:
+    """
+    Append-only log of bug changes (status, severity, project, AI fixes and
+    comments) in the bug_activity table. Rows are gathered by session hooks
+    and written with a single INSERT per transaction; the query functions
+    below read it with indexed range scans and SQL window functions.
+    """
+
+    def __init__(self):
+        self.enabled = True
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get("ACTIVITY_LOG_ENABLED", True))
+        if self.enabled:
+            register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["activity_log"] = self
+
+
+activity_log = ActivityLog()
+
+# -------------------------
+# Per-bug timeline
+# -------------------------
+def timeline(bug_id, after_id=None, limit=100, kinds=None):
+    """
+    Activity of one bug, oldest first: an index range scan on
+    (bug_id, created_at, id). Pass the last id seen as ``after_id`` for
+    the next page.
+    """
+    query = db.select(BugActivity).where(BugActivity.bug_id == bug_id)
+    if kinds:
+        query = query.where(BugActivity.kind.in_(kinds))
+    if after_id is not None:
+        last = db.session.get(BugActivity, after_id)
+        if last is not None:
+            query = query.where(db.tuple_(BugActivity.created_at, BugActivity.id) > (last.created_at, last.id))
+    query = query.order_by(BugActivity.created_at, BugActivity.id).limit(limit)
+    return db.session.execute(query).scalars().all()
+
+# -------------------------
+# Metrics (computed in SQL)
+# -------------------------
+def _seconds(start, end):
+    if db.session.get_bind().dialect.name == "sqlite":
+        return (db.func.julianday(end) - db.func.julianday(start)) * 86400.0
+    return db.extract("epoch", end - start)
+
+def _status_rows(columns, bug_id=None, project_id=None, scope=None):
+    """Status rows limited to whole bugs, so window frames never lose a bug's earlier rows."""
+    query = db.select(*columns).where(BugActivity.kind == "status")
+    if bug_id is not None:
+        query = query.where(BugActivity.bug_id == bug_id)
+    if project_id is not None or scope is not None:
+        query = query.join(Bug, Bug.id == BugActivity.bug_id)
+        if project_id is not None:
+            query = query.where(Bug.project_id == project_id)
+        if scope is not None:
+            query = scope.apply(query)
+    return query
+
+def time_in_status(bug_id=None, project_id=None, scope=None, since=None, until=None, now=None):
+    """
+    Time spent in each status, from LEAD() over every bug's status rows;
+    a bug's current status counts up to ``now``. ``since`` / ``until``
+    keep the intervals that began in that window. Returns
+    {status: {"intervals", "open", "total_seconds", "mean_seconds"}}.
+    """
+    window = {"partition_by": BugActivity.bug_id, "order_by": (BugActivity.created_at, BugActivity.id)}
+    intervals = _status_rows(
+        [
+            BugActivity.new_value.label("status"),
+            BugActivity.created_at.label("started_at"),
+            db.func.lead(BugActivity.created_at).over(**window).label("ended_at"),
+        ],
+        bug_id, project_id, scope,
+    ).subquery()
+
+    seconds = _seconds(intervals.c.started_at, db.func.coalesce(intervals.c.ended_at, now or datetime.utcnow()))
+    query = (
+        db.select(
+            intervals.c.status,
+            db.func.count().label("intervals"),
+            db.func.count().filter(intervals.c.ended_at.is_(None)).label("open"),
+            db.func.sum(seconds).label("total_seconds"),
+            db.func.avg(seconds).label("mean_seconds"),
+        )
+        .group_by(intervals.c.status)
+        .order_by(intervals.c.status)
+    )
+    if since is not None:
+        query = query.where(intervals.c.started_at >= since)
+    if until is not None:
+        query = query.where(intervals.c.started_at < until)
+    return {
+        row.status: {
+            "intervals": row.intervals,
+            "open": row.open,
+            "total_seconds": round(row.total_seconds or 0.0, 1),
+            "mean_seconds": round(row.mean_seconds or 0.0, 1),
+        }
+        for row in db.session.execute(query)
+    }
+
+def mttr(project_id=None, scope=None, since=None, until=None, group_by=None):
+    """
+    Mean time to resolve: for every move into a resolved status, the time
+    since the bug last left one (or was reported), so reopened bugs count
+    once per resolution. Status rows carry the previous status, so one
+    running MAX() over each bug's rows carries the open time forward.
+    ``since`` / ``until`` select resolutions by when they happened;
+    ``group_by`` is None, "project" or "severity". Returns a list of
+    {"key", "resolved", "mean_seconds", "min_seconds", "max_seconds"}.
+    """
+    was_resolved = db.and_(BugActivity.old_value.isnot(None), BugActivity.old_value.in_(RESOLVED))
+    is_resolved = BugActivity.new_value.in_(RESOLVED)
+    # A bug opens when reported unresolved or when reopened
+    opens = db.case((db.and_(db.not_(is_resolved), db.or_(BugActivity.old_value.is_(None), was_resolved)),
+                     BugActivity.created_at))
+    window = {"partition_by": BugActivity.bug_id, "order_by": (BugActivity.created_at, BugActivity.id)}
+    marked = _status_rows(
+        [
+            BugActivity.bug_id,
+            BugActivity.created_at.label("resolved_at"),
+            db.case((db.and_(is_resolved, db.not_(was_resolved)), 1), else_=0).label("resolves"),
+            db.func.max(opens).over(**window).label("open_since"),
+        ],
+        project_id=project_id, scope=scope,
+    ).subquery()
+
+    seconds = _seconds(marked.c.open_since, marked.c.resolved_at)
+    key = db.literal(None)
+    if group_by == "project":
+        key = Bug.project_id
+    elif group_by == "severity":
+        key = Bug.severity
+    elif group_by is not None:
+        raise ValueError("group_by must be None, 'project' or 'severity'")
+    query = db.select(
+        key.label("key"),
+        db.func.count().label("resolved"),
+        db.func.avg(seconds).label("mean_seconds"),
+        db.func.min(seconds).label("min_seconds"),
+        db.func.max(seconds).label("max_seconds"),
+    ).where(marked.c.resolves == 1, marked.c.open_since.isnot(None))
+    if group_by is not None:
+        query = query.join(Bug, Bug.id == marked.c.bug_id).group_by(key).order_by(key)
+    else:
+        query = query.select_from(marked)
+    if since is not None:
+        query = query.where(marked.c.resolved_at >= since)
+    if until is not None:
+        query = query.where(marked.c.resolved_at < until)
+    return [
+        {
+            "key": row.key,
+            "resolved": row.resolved,
+            "mean_seconds": round(row.mean_seconds, 1) if row.mean_seconds is not None else None,
+            "min_seconds": round(row.min_seconds, 1) if row.min_seconds is not None else None,
+            "max_seconds": round(row.max_seconds, 1) if row.max_seconds is not None else None,
+        }
+        for row in db.session.execute(query)
+        if row.resolved
+    ]
+
+# -------------------------
+# Backfill from existing rows
+# -------------------------
+def backfill_activity(chunk_size=1000):
+    """
+    Give bugs that have no activity yet a reported row, plus status rows
+    from bug_history where it has any, so metrics cover older bugs.
+    Commits per chunk; returns the number of bugs backfilled.
+    """
+    first_old_status = (
+        db.select(BugHistory.old_status)
+        .where(BugHistory.bug_id == Bug.id)
+        .order_by(BugHistory.changed_at, BugHistory.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    columns = ["bug_id", "kind", "old_value", "new_value", "created_at"]
+    total = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(
+            db.select(Bug.id)
+            .where(Bug.id > last_id, ~db.exists().where(BugActivity.bug_id == Bug.id))
+            .order_by(Bug.id)
+            .limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return total
+        db.session.execute(db.insert(BugActivity).from_select(columns, db.select(
+            Bug.id, db.literal("status"), db.null(), db.func.coalesce(first_old_status, Bug.status), Bug.created_at,
+        ).where(Bug.id.in_(ids))))
+        db.session.execute(db.insert(BugActivity).from_select(columns, db.select(
+            BugHistory.bug_id, db.literal("status"), BugHistory.old_status, BugHistory.new_status,
+            BugHistory.changed_at,
+        ).where(BugHistory.bug_id.in_(ids))))
+        db.session.commit()
+        total += len(ids)
+        last_id = ids[-1]
+
+# -------------------------
+# CLI: flask activity ...
+# -------------------------
+activity_cli = AppGroup("activity", help="Bug activity log.")
+
+@activity_cli.command("backfill")
+@with_appcontext
+def backfill_command():
+    """Write activity rows for bugs reported before the log existed."""
+    count = backfill_activity()
+    click.echo(f"Backfilled {count} bug(s).")
+
+@activity_cli.command("report")
+@click.option("--project-id", type=int, help="Only bugs of this project.")
+@click.option("--group-by", type=click.Choice(["project", "severity"]), help="Split MTTR by this.")
+@with_appcontext
+def report_command(project_id, group_by):
+    """Print time in status and mean time to resolve."""
+    for status, row in time_in_status(project_id=project_id).items():
+        click.echo(f"{status:<12} {row['intervals']:>8} intervals  mean {row['mean_seconds'] / 3600:10.1f}h  "
+                   f"({row['open']} open)")
+    for row in mttr(project_id=project_id, group_by=group_by):
+        label = f"{group_by} {row['key']}" if group_by else "all"
+        click.echo(f"MTTR {label:<20} {row['mean_seconds'] / 3600:10.1f}h over {row['resolved']} resolution(s)")
@@ -1,5 +1,10 @@
+import hashlib
+import re
 from datetime import datetime
 
+from app.bug_log import BugLog
+from app.rewrite_engine import DEFAULT_ENGINE, DEFAULT_RULES, trie_pattern
+
 # -------------------------
 # FIX_SUGGESTIONS dictionary
 # -------------------------
@@ -70,99 +75,116 @@ AUTO_FIX_TEMPLATES = {
     "Async missing await": "# Add await for async calls",
 }
 
+# -------------------------
+# Severity keyword groups
+# -------------------------
+HIGH_SEVERITY_KEYWORDS = ["crash", "data loss", "security"]
+MEDIUM_SEVERITY_KEYWORDS = ["error", "slow", "database", "login", "button", "network"]
+
+# -------------------------
+# Rule-set version
+# -------------------------
+# Bump RULES_REVISION whenever the code of a rewrite rule class changes; edits to
+# the dictionaries above and to the DEFAULT_RULES list (order, classes and
+# parameters) are picked up by the digest automatically.
+RULES_REVISION = 1
+RULESET_VERSION = "%d-%s" % (RULES_REVISION, hashlib.sha1(repr((
+    FIX_SUGGESTIONS, CATEGORY_MAP, AUTO_FIX_TEMPLATES,
+    HIGH_SEVERITY_KEYWORDS, MEDIUM_SEVERITY_KEYWORDS,
+    [rule.signature() for rule in DEFAULT_RULES],
+)).encode("utf-8")).hexdigest()[:12])
+
 # -------------------------
 # In-memory bug history
 # -------------------------
-bug_history = []
+# Bounded ring buffer of log_bug results (see app/bug_log.py); BUG_LOG_SIZE sets the capacity
+bug_history = BugLog(
+    severities=("Low", "Medium", "High"),
+    categories=list(dict.fromkeys(CATEGORY_MAP.values())) + ["General"],
+)
+
+# -------------------------
+# Compiled keyword matcher
+# -------------------------
+class KeywordMatcher:
+    """
+    Finds every keyword contained in a text with one regex scan.
+    The pattern reports the longest keyword starting at each position;
+    shorter keywords that are prefixes of it are added from a lookup table,
+    so the result equals ``{k for k in keywords if k in text}``.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self._pattern = re.compile("(?=(%s))" % trie_pattern(self.keywords))
+        self._prefixes = {
+            k: [p for p in self.keywords if p != k and k.startswith(p)]
+            for k in self.keywords
+        }
+
+    def find(self, text):
+        hits = set()
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword not in hits:
+                hits.add(keyword)
+                hits.update(self._prefixes[keyword])
+        return hits
+
+
+KEYWORD_MATCHER = KeywordMatcher(
+    list(FIX_SUGGESTIONS) + list(CATEGORY_MAP) + [k.lower() for k in AUTO_FIX_TEMPLATES]
+)
+
+def classify_description(description):
+    """
+    Scan the description once and return severity, category, fix suggestion
+    and matching auto-fix templates, each resolved in dictionary order.
+    """
+    hits = KEYWORD_MATCHER.find(description.lower())
+
+    severity = "Low"
+    for k in FIX_SUGGESTIONS:
+        if k in hits:
+            if k in HIGH_SEVERITY_KEYWORDS:
+                severity = "High"
+                break
+            elif k in MEDIUM_SEVERITY_KEYWORDS:
+                severity = "Medium"
+                break
+
+    category = next((c for k, c in CATEGORY_MAP.items() if k in hits), "General")
+    fix = next((f for k, f in FIX_SUGGESTIONS.items() if k in hits), "Review logs and code modules.")
+    templates = [t for k, t in AUTO_FIX_TEMPLATES.items() if k.lower() in hits]
+
+    return {
+        "severity": severity,
+        "category": category,
+        "fix": fix,
+        "templates": templates,
+    }
 
 # -------------------------
 # AI Functions
 # -------------------------
 def predict_bug_severity(description):
-    desc = description.lower()
-    high = ["crash", "data loss", "security"]
-    medium = ["error", "slow", "database", "login", "button", "network"]
-    for k in FIX_SUGGESTIONS:
-        if k in desc:
-            if k in high:
-                return "High"
-            elif k in medium:
-                return "Medium"
-    return "Low"
+    return classify_description(description)["severity"]
 
 def detect_category(description):
-    desc = description.lower()
-    for keyword, category in CATEGORY_MAP.items():
-        if keyword in desc:
-            return category
-    return "General"
+    return classify_description(description)["category"]
 
 def suggest_fix(description):
-    desc = description.lower()
-    for keyword, fix in FIX_SUGGESTIONS.items():
-        if keyword in desc:
-            return fix
-    return "Review logs and code modules."
-
-def generate_auto_fix(description, code=""):
-    desc = description.lower()
-    fixes = []
+    return classify_description(description)["fix"]
 
+def generate_auto_fix(description, code="", templates=None):
     # Apply automated templates
-    for keyword, template in AUTO_FIX_TEMPLATES.items():
-        if keyword.lower() in desc:
-            fixes.append(template)
-
-    # Python code auto-fixes
-    if 'TODO_BUG' in code:
-        code = code.replace("TODO_BUG", "FIXED_PART")
-        fixes.append("Replaced TODO_BUG with FIXED_PART")
-    if 'print(' in code and 'print (' not in code:
-        code = code.replace('print(', 'print (')
-        fixes.append("Fixed print formatting")
-    if 'if ' in code and ':\n' not in code:
-        code = code.replace('if ', 'if:\n    ')
-        fixes.append("Fixed if statement formatting")
-    if 'for ' in code and ':\n' not in code:
-        code = code.replace('for ', 'for:\n    ')
-        fixes.append("Fixed for loop formatting")
-
-    # Frontend button/HTML fixes
-    # Add onclick if missing
-    if '<button' in code and 'onclick' not in code:
-        code = code.replace('<button', '<button onclick="defaultClick()"')
-        fixes.append("Added default onclick handler")
-    # Enable disabled buttons
-    if 'disabled' in code:
-        code = code.replace('disabled', '')
-        fixes.append("Enabled button automatically")
-    # Add tooltip if missing
-    if '<button' in code and 'title=' not in code:
-        code = code.replace('<button', '<button title="Click me"')
-        fixes.append("Added tooltip to button")
-    # Fix duplicate IDs
-    import re
-    ids = re.findall(r'id="(.*?)"', code)
-    seen = set()
-    for i, id_name in enumerate(ids):
-        if id_name in seen:
-            new_id = f"{id_name}_{i}"
-            code = code.replace(f'id="{id_name}"', f'id="{new_id}"', 1)
-            fixes.append(f"Fixed duplicate button ID: {id_name} → {new_id}")
-        seen.add(id_name)
-
-    # Modal fixes
-    if '<div class="modal"' in code and 'close' not in code:
-        code += '\n<!-- Added close button -->'
-        fixes.append("Added close button to modal")
-
-    # Form fixes
-    if '<form' in code and 'submit' not in code:
-        code += '\n<input type="submit" value="Submit">'
-        fixes.append("Added submit button to form")
-    if 'input' in code and 'pattern' not in code:
-        code += '\n<!-- Added basic input validation -->'
-        fixes.append("Added input validation to form fields")
+    if templates is None:
+        templates = classify_description(description)["templates"]
+    fixes = list(templates)
+
+    # Code rewrites run as one ordered rule pass (see app/rewrite_engine.py)
+    code, notes = DEFAULT_ENGINE.apply(code)
+    fixes.extend(notes)
 
     return code, "\n---\n".join(fixes) if fixes else "No automated fix available."
 
@@ -174,26 +196,27 @@ def analyze_and_fix_code(code, description=""):
     if not code:
         return "", "No code provided", "Low"
     
-    # Use the existing generate_auto_fix function
-    fixed_code, notes = generate_auto_fix(description, code)
-    
-    # Predict severity
-    severity = predict_bug_severity(description)
+    # Classify once and reuse the matches for both fixes and severity
+    matches = classify_description(description)
+    fixed_code, notes = generate_auto_fix(description, code, matches["templates"])
+    severity = matches["severity"]
     
     return fixed_code, notes, severity
 
 def log_bug(description, code=""):
-    severity = predict_bug_severity(description)
-    category = detect_category(description)
-    fixed_code, auto_fix_notes = generate_auto_fix(description, code)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    bug = {
+    matches = classify_description(description)
+    severity = matches["severity"]
+    category = matches["category"]
+    fixed_code, auto_fix_notes = generate_auto_fix(description, code, matches["templates"])
+    now = datetime.now()
+    # The history keeps a hash of the fixed code; the caller gets the code itself
+    code_hash = bug_history.append(description, severity, category, auto_fix_notes, fixed_code, now.timestamp())
+    return {
         "description": description,
         "severity": severity,
         "category": category,
         "auto_fix_notes": auto_fix_notes,
         "fixed_code": fixed_code,
-        "timestamp": timestamp
+        "code_hash": code_hash,
+        "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
     }
-    bug_history.append(bug)
-    return bug
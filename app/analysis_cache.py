@@ -0,0 +1,199 @@
+# app/analysis_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from app.ai_engine import analyze_and_fix_code, RULESET_VERSION
+
+# -------------------------
+# Content-addressed cache for analyze_and_fix_code
+# -------------------------
+class AnalysisCache:
+    """
+    Bounded LRU cache of ``analyze_and_fix_code`` results.
+
+    Entries are keyed on a SHA-256 of (code, description, rule-set version),
+    so changing the rules invalidates everything without an explicit flush.
+    The in-memory tier is limited by an approximate byte budget; an optional
+    SQLite file acts as a second tier shared by all workers on the host,
+    capped at ``db_max_rows`` with the oldest entries pruned first.
+    """
+
+    # Prune the SQLite tier once per this many writes from a process
+    PRUNE_EVERY = 64
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, db_path=None, db_max_rows=100000):
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self._disk_writes = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Guards the SQLite connection, so disk I/O never holds up the memory tier
+        self._disk_lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    def init_app(self, app):
+        self.max_bytes = app.config.get("ANALYSIS_CACHE_MAX_BYTES", self.max_bytes)
+        self.db_path = app.config.get("ANALYSIS_CACHE_DB", self.db_path)
+        self.db_max_rows = app.config.get("ANALYSIS_CACHE_DB_MAX_ROWS", self.db_max_rows)
+        app.extensions["analysis_cache"] = self
+
+    # -------------------------
+    # Keys and sizing
+    # -------------------------
+    @staticmethod
+    def make_key(code, description=""):
+        digest = hashlib.sha256()
+        for part in (RULESET_VERSION, description or "", code or ""):
+            data = part.encode("utf-8")
+            digest.update(len(data).to_bytes(8, "big"))
+            digest.update(data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _entry_size(key, value):
+        return len(key) + sum(len(part) for part in value)
+
+    # -------------------------
+    # In-memory tier
+    # -------------------------
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._disk_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+        self._store(key, value)
+        return value
+
+    def put(self, key, value):
+        self._store(key, value)
+        self._disk_put(key, value)
+
+    def _store(self, key, value):
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_value)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ruleset_version": RULESET_VERSION,
+            }
+
+    # -------------------------
+    # Optional SQLite tier
+    # -------------------------
+    def _connection(self):
+        # Caller holds _disk_lock. Connections must not cross a gunicorn fork, so reopen per process
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, fixed_code TEXT, notes TEXT, severity TEXT)"
+            )
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _disk_get(self, key):
+        if not self.db_path:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._connection().execute(
+                    "SELECT fixed_code, notes, severity FROM analysis_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Analysis cache read failed: {e}")
+            return None
+        return tuple(row) if row else None
+
+    def _disk_put(self, key, value):
+        if not self.db_path:
+            return
+        try:
+            with self._disk_lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, fixed_code, notes, severity) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key,) + tuple(value),
+                )
+                self._disk_writes += 1
+                if self.db_max_rows and self._disk_writes % self.PRUNE_EVERY == 0:
+                    self._prune(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Analysis cache write failed: {e}")
+
+    def _prune(self, conn):
+        # REPLACE gives a rewritten entry a new rowid, so rowids run oldest to newest
+        conn.execute(
+            "DELETE FROM analysis_cache WHERE rowid <= (SELECT max(rowid) FROM analysis_cache) - ?",
+            (self.db_max_rows,),
+        )
+
+    # -------------------------
+    # Cached analysis
+    # -------------------------
+    def analyze(self, code, description=""):
+        if not code:
+            return analyze_and_fix_code(code, description)
+        key = self.make_key(code, description)
+        value = self.get(key)
+        if value is None:
+            value = tuple(analyze_and_fix_code(code, description))
+            self.put(key, value)
+        return value
+
+
+analysis_cache = AnalysisCache()
+
+def cached_analyze_and_fix_code(code, description=""):
+    """Drop-in replacement for analyze_and_fix_code backed by the shared cache."""
+    return analysis_cache.analyze(code, description)
@@ -0,0 +1,161 @@
+# app/batch.py
+import multiprocessing
+import os
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+from app.models import BatchRun, Bug
+from app.ai_engine import generate_auto_fix
+from app.code_store import code_store
+from app.events import bug_event, stage_events
+from app.activity import activity, log_activity
+
+# -------------------------
+# Worker function (runs in child processes)
+# -------------------------
+def _analyze_row(row):
+    bug_id, description, code = row
+    fixed_code, notes = generate_auto_fix(description or "", code)
+    return {"id": bug_id, "fixed_code": fixed_code, "ai_notes": notes}
+
+# -------------------------
+# Batch re-analysis
+# -------------------------
+def start_run(after_id=0):
+    base = Bug.query.filter(Bug.original_code_hash.isnot(None), Bug.id > after_id)
+    run = BatchRun(kind="reanalyze", last_id=after_id, total=base.count())
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+def reanalyze_bugs(run, chunk_size=500, workers=None, progress=None):
+    """
+    Re-run generate_auto_fix over every bug with code after ``run.last_id``.
+
+    Bugs are read in keyset-ordered chunks of (id, description, code) only,
+    fanned out to a process pool, and written back with one bulk UPDATE per
+    chunk. The checkpoint is committed with each chunk, so an interrupted run
+    resumes from the last written id.
+    """
+    workers = workers or os.cpu_count() or 1
+    # spawn keeps children independent of the web worker's threads and DB connections
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            while True:
+                rows = db.session.execute(
+                    db.select(Bug.id, Bug.description, Bug.original_code_hash, Bug.fixed_code_hash, Bug.created_by,
+                              Bug.project_id)
+                    .where(Bug.id > run.last_id, Bug.original_code_hash.isnot(None))
+                    .order_by(Bug.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+
+                codes = code_store.get_many(r.original_code_hash for r in rows)
+                tasks = [(r.id, r.description, codes[r.original_code_hash]) for r in rows]
+                per_task = max(1, len(rows) // (workers * 4))
+                results = list(pool.map(_analyze_row, tasks, chunksize=per_task))
+
+                # Bulk UPDATEs skip ORM events, so blob references are counted here
+                refs = Counter()
+                for row, result in zip(rows, results):
+                    result["fixed_code_hash"] = code_store.put(
+                        result.pop("fixed_code"), base_hash=row.original_code_hash
+                    )
+                    refs[row.fixed_code_hash] -= 1
+                    refs[result["fixed_code_hash"]] += 1
+                db.session.execute(db.update(Bug), results)
+                db.session.execute(
+                    db.update(Bug).where(Bug.id.in_([row.id for row in rows]))
+                    .values(version=Bug.version + 1, updated_at=datetime.utcnow())
+                )
+                stage_events(db.session, [bug_event("bug.updated", row.id, row.created_by, row.project_id)
+                                          for row in rows])
+                log_activity(db.session, [
+                    activity(row.id, "ai_fix", row.fixed_code_hash, result["fixed_code_hash"])
+                    for row, result in zip(rows, results)
+                    if result["fixed_code_hash"] != row.fixed_code_hash
+                ])
+                code_store.adjust_refs(db.session.connection(), {h: n for h, n in refs.items() if h and n})
+                run.last_id = rows[-1].id
+                run.processed += len(rows)
+                db.session.commit()
+                if progress:
+                    progress(run)
+
+        run.status = "done"
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        run = db.session.get(BatchRun, run.id)
+        run.status = "failed"
+        run.error = str(e)
+        db.session.commit()
+        raise
+    return run
+
+def start_background_run(app, after_id=0, resume_run=None, chunk_size=500, workers=None):
+    """Create or resume a run and process it on a daemon thread."""
+    if resume_run is not None:
+        run = resume_run
+        run.status = "running"
+        run.error = None
+        db.session.commit()
+    else:
+        run = start_run(after_id)
+    run_id = run.id
+
+    def target():
+        with app.app_context():
+            try:
+                reanalyze_bugs(db.session.get(BatchRun, run_id), chunk_size, workers)
+            except Exception as e:
+                print(f"Batch run {run_id} failed: {e}")
+                traceback.print_exc()
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=target, daemon=True, name=f"batch-run-{run_id}").start()
+    return run
+
+# -------------------------
+# CLI: flask batch ...
+# -------------------------
+batch_cli = AppGroup("batch", help="Bulk operations over existing bugs.")
+
+@batch_cli.command("reanalyze")
+@click.option("--chunk-size", default=500, show_default=True, help="Bugs per read/UPDATE chunk.")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: CPU count).")
+@click.option("--after-id", default=0, show_default=True, help="Start after this bug id.")
+@click.option("--resume", "resume_id", default=None, type=int, help="Resume a previous run by id.")
+@with_appcontext
+def reanalyze_command(chunk_size, workers, after_id, resume_id):
+    """Re-run the AI engine over all stored bug code."""
+    if resume_id is not None:
+        run = db.session.get(BatchRun, resume_id)
+        if run is None:
+            raise click.ClickException(f"No batch run with id {resume_id}.")
+        run.status = "running"
+        run.error = None
+        db.session.commit()
+    else:
+        run = start_run(after_id)
+
+    click.echo(f"Batch run {run.id}: {run.total} bug(s) after id {run.last_id}.")
+
+    def report(r):
+        click.echo(f"  {r.processed}/{r.total} processed (last id {r.last_id})")
+
+    run = reanalyze_bugs(run, chunk_size, workers, progress=report)
+    click.echo(f"Batch run {run.id} {run.status}: {run.processed} bug(s) updated.")
@@ -0,0 +1,263 @@
+# app/bug_log.py
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+
+# sha256 of the fixed code, the same digest code_store keys blobs on
+HASH_BYTES = 32
+# Descriptions are kept for display only; the full text lives on the Bug row
+DESCRIPTION_CHARS = 200
+
+def _code_digest(code):
+    return hashlib.sha256((code or "").encode("utf-8")).digest()
+
+# -------------------------
+# Interned labels
+# -------------------------
+class Codes:
+    """Small-integer codes for a set of labels that only ever grows (severities, categories)."""
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self._codes = {}
+        for label in labels:
+            self.code(label)
+
+    def code(self, label):
+        code = self._codes.get(label)
+        if code is None:
+            if len(self.labels) >= 255:
+                raise ValueError("more than 255 distinct labels")
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(sys.intern(label))
+        return code
+
+    def __len__(self):
+        return len(self.labels)
+
+# -------------------------
+# Ring buffer of analysed bugs
+# -------------------------
+class BugLog:
+    """
+    The most recent ``capacity`` results of ``log_bug``, stored as parallel
+    arrays (timestamps, severity and category codes, sha256 of the fixed
+    code) plus interned notes and truncated descriptions, so memory stays
+    flat however long a worker runs. Code bodies are not kept.
+
+    Counts by severity and category are updated on every append and
+    eviction, so ``counts`` costs the same for one record as for a full
+    buffer. With ``spill_path`` set, evicted records are appended to a
+    local SQLite file in batches instead of being dropped.
+    """
+
+    def __init__(self, capacity=10000, spill_path=None, spill_batch=256, severities=(), categories=()):
+        self.spill_path = spill_path
+        self.spill_batch = spill_batch
+        self.severities = Codes(severities)
+        self.categories = Codes(categories)
+        self._lock = threading.Lock()
+        # Guards the spill connection, so SQLite I/O never holds up appends
+        self._spill_lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._allocate(capacity)
+
+    def init_app(self, app):
+        capacity = app.config.get("BUG_LOG_SIZE", self.capacity)
+        self.spill_path = app.config.get("BUG_LOG_SPILL_DB", self.spill_path)
+        if capacity != self.capacity:
+            with self._lock:
+                self._allocate(capacity)
+        app.extensions["bug_log"] = self
+
+    def _allocate(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._severity = array("B", [0]) * capacity
+        self._category = array("B", [0]) * capacity
+        self._hashes = bytearray(HASH_BYTES * capacity)
+        self._descriptions = [None] * capacity
+        self._notes = [None] * capacity
+        self._next = 0      # slot the next record goes to
+        self._size = 0
+        self._severity_counts = array("q", [0]) * 256
+        self._category_counts = array("q", [0]) * 256
+        self._pending = []  # evicted records waiting for the spill file
+        self.appended = 0
+        self.evicted = 0
+        self.spilled = 0
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def append(self, description, severity, category, notes, fixed_code="", timestamp=None):
+        """Record one analysed bug; returns its sha256 code hash (hex)."""
+        digest = _code_digest(fixed_code)
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            severity_code = self.severities.code(severity)
+            category_code = self.categories.code(category)
+            slot = self._next
+            if self._size == self.capacity:
+                self._evict(slot)
+            else:
+                self._size += 1
+            self._timestamps[slot] = timestamp
+            self._severity[slot] = severity_code
+            self._category[slot] = category_code
+            self._hashes[slot * HASH_BYTES:(slot + 1) * HASH_BYTES] = digest
+            self._descriptions[slot] = (description or "")[:DESCRIPTION_CHARS]
+            self._notes[slot] = sys.intern(notes or "")
+            self._severity_counts[severity_code] += 1
+            self._category_counts[category_code] += 1
+            self._next = (slot + 1) % self.capacity
+            self.appended += 1
+            flush = self._pending if len(self._pending) >= self.spill_batch else None
+            if flush:
+                self._pending = []
+        if flush:
+            self._spill(flush)
+        return digest.hex()
+
+    def _evict(self, slot):
+        self._severity_counts[self._severity[slot]] -= 1
+        self._category_counts[self._category[slot]] -= 1
+        self.evicted += 1
+        if self.spill_path:
+            self._pending.append(self._row(slot))
+
+    def clear(self):
+        with self._lock:
+            pending = self._pending
+            self._allocate(self.capacity)
+        if pending:
+            self._spill(pending)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def _row(self, slot):
+        return (
+            self._timestamps[slot],
+            self.severities.labels[self._severity[slot]],
+            self.categories.labels[self._category[slot]],
+            self._hashes[slot * HASH_BYTES:(slot + 1) * HASH_BYTES].hex(),
+            self._descriptions[slot],
+            self._notes[slot],
+        )
+
+    @staticmethod
+    def _record(row):
+        timestamp, severity, category, code_hash, description, notes = row
+        return {
+            "description": description,
+            "severity": severity,
+            "category": category,
+            "auto_fix_notes": notes,
+            "code_hash": code_hash,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        }
+
+    def recent(self, limit=None):
+        """Buffered records as dicts, newest first."""
+        with self._lock:
+            count = self._size if limit is None else min(limit, self._size)
+            rows = [self._row((self._next - 1 - i) % self.capacity) for i in range(count)]
+        return [self._record(row) for row in rows]
+
+    def counts(self):
+        """Buffered records by severity and category."""
+        with self._lock:
+            return {
+                "total": self._size,
+                "severity": {label: self._severity_counts[code]
+                             for code, label in enumerate(self.severities.labels)
+                             if self._severity_counts[code]},
+                "category": {label: self._category_counts[code]
+                             for code, label in enumerate(self.categories.labels)
+                             if self._category_counts[code]},
+            }
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """Oldest first, like the list this replaces."""
+        return iter(reversed(self.recent()))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "records": self._size,
+                "capacity": self.capacity,
+                "appended": self.appended,
+                "evicted": self.evicted,
+                "spilled": self.spilled,
+                "pending_spill": len(self._pending),
+                "spill_path": self.spill_path,
+            }
+
+    # -------------------------
+    # Optional SQLite spill
+    # -------------------------
+    def _connection(self):
+        # Caller holds _spill_lock. Connections must not cross a gunicorn fork, so reopen per process
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.spill_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bug_log ("
+                "timestamp REAL, severity TEXT, category TEXT, code_hash TEXT, description TEXT, notes TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_bug_log_timestamp ON bug_log (timestamp)")
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _spill(self, rows):
+        if not self.spill_path:
+            return
+        try:
+            with self._spill_lock:
+                conn = self._connection()
+                conn.executemany("INSERT INTO bug_log VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Bug log spill failed: {e}")
+            return
+        with self._lock:
+            self.spilled += len(rows)
+
+    def flush(self):
+        """Write evicted records still waiting for a full batch."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            self._spill(pending)
+
+    def spilled_records(self, limit=100, before=None):
+        """Records evicted to the spill file, newest first; ``before`` is a Unix timestamp."""
+        if not self.spill_path:
+            return []
+        self.flush()
+        query = "SELECT * FROM bug_log"
+        params = []
+        if before is not None:
+            query += " WHERE timestamp < ?"
+            params.append(before)
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        try:
+            with self._spill_lock:
+                rows = self._connection().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Bug log read failed: {e}")
+            return []
+        return [self._record(row) for row in rows]
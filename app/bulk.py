@@ -0,0 +1,376 @@
+# app/bulk.py
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime, timezone
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+from app.models import AnalysisJob, Bug, Project, User
+from app.code_store import code_store
+from app.dedup import index_many
+from app.stats import count_inserted_bugs
+from app.events import bug_event, stage_events
+from app.activity import activity, log_activity
+from app.rollups import rollup_inserted_bugs
+from app.search import search_index
+
+FORMATS = ("ndjson", "csv")
+STATUSES = ("Open", "In Progress", "Fixed", "Closed")
+SEVERITIES = ("Low", "Medium", "High", "Critical")
+EXPORT_FIELDS = ["id", "title", "description", "severity", "status", "project_id", "created_by",
+                 "created_at", "ai_notes"]
+CODE_FIELDS = ["original_code", "fixed_code"]
+TITLE_MAX = Bug.__table__.c.title.type.length
+
+# -------------------------
+# Readers
+# -------------------------
+def read_ndjson(stream):
+    """Yield (line_number, record) from a text stream; a record is a dict or the error for that line."""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"invalid JSON: {e}")
+            continue
+        yield number, record if isinstance(record, dict) else ValueError("expected a JSON object")
+
+def read_csv(stream):
+    """Yield (line_number, record) from a text stream with a header row."""
+    reader = csv.DictReader(stream)
+    try:
+        for record in reader:
+            if None in record:
+                yield reader.line_num, ValueError("more values than header columns")
+                continue
+            yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}
+    except csv.Error as e:
+        yield reader.line_num, ValueError(f"invalid CSV: {e}")
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv}
+
+def guess_format(filename=None, mimetype=None):
+    if (filename or "").lower().endswith(".csv") or (mimetype or "").startswith("text/csv"):
+        return "csv"
+    return "ndjson"
+
+# -------------------------
+# Import
+# -------------------------
+def _int_or_none(value, field):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer")
+
+def _timestamp(value):
+    if value in (None, ""):
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("created_at must be an ISO 8601 timestamp")
+    # Stored as naive UTC, like datetime.utcnow()
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _text(value, field):
+    if value is None or isinstance(value, str):
+        return value
+    raise ValueError(f"{field} must be a string")
+
+def parse_record(record, owner_id, trust_owner):
+    """
+    Validate one input record and return the bug row (with code texts
+    under original_code / fixed_code). Raises ValueError with a message
+    for the row's error report.
+    """
+    title = (_text(record.get("title"), "title") or "").strip()
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > TITLE_MAX:
+        raise ValueError(f"title is longer than {TITLE_MAX} characters")
+    severity = record.get("severity") or "Medium"
+    if severity not in SEVERITIES:
+        raise ValueError(f"severity must be one of {', '.join(SEVERITIES)}")
+    status = record.get("status") or "Open"
+    if status not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+
+    created_by = owner_id
+    if trust_owner and record.get("created_by") not in (None, ""):
+        created_by = _int_or_none(record.get("created_by"), "created_by")
+    return {
+        "title": title,
+        "description": _text(record.get("description"), "description"),
+        "severity": severity,
+        "status": status,
+        "project_id": _int_or_none(record.get("project_id"), "project_id"),
+        "created_by": created_by,
+        "created_at": _timestamp(record.get("created_at")) or datetime.utcnow(),
+        "ai_notes": _text(record.get("ai_notes"), "ai_notes"),
+        "original_code": _text(record.get("original_code", record.get("code")), "original_code"),
+        "fixed_code": _text(record.get("fixed_code"), "fixed_code"),
+    }
+
+
+class ImportReport:
+    """Counts and per-row errors for one import; errors past ``max_errors`` are only counted."""
+
+    def __init__(self, max_errors=100):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.queued = 0
+        self.batches = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self):
+        return {
+            "rows": self.rows, "imported": self.imported, "failed": self.failed,
+            "queued_for_analysis": self.queued, "batches": self.batches,
+            "errors": self.errors, "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _missing_ids(model, ids):
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    found = db.session.execute(db.select(model.id).where(model.id.in_(ids))).scalars()
+    return ids - set(found)
+
+def _write_batch(batch, report, analyze):
+    """Insert one validated batch of (line, row) in a single transaction."""
+    # References are checked up front so one bad row does not fail the whole batch
+    missing_projects = _missing_ids(Project, (row["project_id"] for _, row in batch))
+    missing_users = _missing_ids(User, (row["created_by"] for _, row in batch))
+    rows, lines = [], []
+    for line, row in batch:
+        if row["project_id"] in missing_projects:
+            report.error(line, f"project {row['project_id']} does not exist")
+        elif row["created_by"] in missing_users:
+            report.error(line, f"user {row['created_by']} does not exist")
+        else:
+            rows.append(row)
+            lines.append(line)
+    if not rows:
+        return
+
+    try:
+        # Blobs are deduplicated within the batch; Core inserts skip the flush-time refcounts
+        hashes, refs = {}, Counter()
+        for row in rows:
+            original, fixed = row.pop("original_code"), row.pop("fixed_code")
+            if original and original not in hashes:
+                hashes[original] = code_store.put(original)
+            row["original_code_hash"] = hashes.get(original) if original else None
+            if fixed:
+                key = (row["original_code_hash"], fixed)
+                if key not in hashes:
+                    hashes[key] = code_store.put(fixed, base_hash=row["original_code_hash"])
+                row["fixed_code_hash"] = hashes[key]
+            else:
+                row["fixed_code_hash"] = None
+            refs[row["original_code_hash"]] += 1
+            refs[row["fixed_code_hash"]] += 1
+
+        ids = db.session.execute(
+            db.insert(Bug).returning(Bug.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        connection = db.session.connection()
+        code_store.adjust_refs(connection, {digest: n for digest, n in refs.items() if digest})
+        count_inserted_bugs(db.session, ((r["project_id"], r["status"], r["severity"]) for r in rows))
+        rollup_inserted_bugs(db.session, ((r["created_at"], r["project_id"], r["status"], r["severity"],
+                                           r["description"]) for r in rows))
+
+        codes = code_store.get_many(row["original_code_hash"] for row in rows)
+        index_many((bug_id, row["description"], codes.get(row["original_code_hash"]))
+                   for bug_id, row in zip(ids, rows))
+        search_index.index_code(db.session, ((bug_id, codes.get(row["original_code_hash"]))
+                                             for bug_id, row in zip(ids, rows) if row["original_code_hash"]))
+        stage_events(db.session, [
+            bug_event("bug.created", bug_id, row["created_by"], status=row["status"], project_id=row["project_id"])
+            for bug_id, row in zip(ids, rows)
+        ])
+        log_activity(db.session, [
+            activity(bug_id, kind, new=value, at=row["created_at"])
+            for bug_id, row in zip(ids, rows)
+            for kind, value in (("status", row["status"]), ("ai_fix", row["fixed_code_hash"]))
+            if value
+        ])
+        jobs = []
+        if analyze:
+            max_attempts = current_app.config.get("JOB_MAX_ATTEMPTS", 3)
+            jobs = [{"bug_id": bug_id, "max_attempts": max_attempts}
+                    for bug_id, row in zip(ids, rows)
+                    if row["original_code_hash"] and not row["fixed_code_hash"]]
+            if jobs:
+                db.session.execute(db.insert(AnalysisJob), jobs)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Bulk import batch failed: {e}")
+        for line in lines:
+            report.error(line, f"batch insert failed: {e}")
+        return
+    report.imported += len(rows)
+    report.queued += len(jobs)
+    report.batches += 1
+
+def import_bugs(records, owner_id=None, trust_owner=False, analyze=False, batch_size=None, max_errors=None):
+    """
+    Insert bugs from (line_number, record) pairs, as produced by the
+    readers above, and return an ImportReport.
+
+    Records are validated one at a time and written in batches of
+    ``batch_size`` with one multi-row INSERT each, committed per batch, so
+    memory use does not depend on the input size and a failed batch does
+    not undo earlier ones. Rows without an owner get ``owner_id``; a
+    record's own created_by is used only with ``trust_owner``. With
+    ``analyze``, bugs with code and no fix get a queued analysis job
+    instead of being analysed inline.
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get("BULK_BATCH_SIZE", 500)
+    report = ImportReport(max_errors if max_errors is not None else config.get("BULK_MAX_ERRORS", 100))
+    batch = []
+    for line, record in records:
+        report.rows += 1
+        if isinstance(record, Exception):
+            report.error(line, str(record))
+            continue
+        try:
+            batch.append((line, parse_record(record, owner_id, trust_owner)))
+        except ValueError as e:
+            report.error(line, str(e))
+            continue
+        if len(batch) >= batch_size:
+            _write_batch(batch, report, analyze)
+            batch = []
+    if batch:
+        _write_batch(batch, report, analyze)
+    return report
+
+# -------------------------
+# Export
+# -------------------------
+def export_query(scope=None, status=None, severity=None, project_id=None, include_code=False):
+    columns = [getattr(Bug, name) for name in EXPORT_FIELDS]
+    if include_code:
+        columns += [Bug.original_code_hash, Bug.fixed_code_hash]
+    query = db.select(*columns).order_by(Bug.id)
+    if scope is not None:
+        query = scope.apply(query)
+    if status:
+        query = query.where(Bug.status == status)
+    if severity:
+        query = query.where(Bug.severity == severity)
+    if project_id:
+        query = query.where(Bug.project_id == project_id)
+    return query
+
+def _export_rows(query, include_code, chunk_size):
+    # yield_per streams from a server-side cursor, one partition of rows at a time
+    result = db.session.execute(query, execution_options={"yield_per": chunk_size})
+    for partition in result.partitions():
+        codes = {}
+        if include_code:
+            codes = code_store.get_many(
+                digest for row in partition for digest in (row.original_code_hash, row.fixed_code_hash)
+            )
+        rows = []
+        for row in partition:
+            item = {name: getattr(row, name) for name in EXPORT_FIELDS}
+            if item["created_at"] is not None:
+                item["created_at"] = item["created_at"].isoformat()
+            if include_code:
+                item["original_code"] = codes.get(row.original_code_hash)
+                item["fixed_code"] = codes.get(row.fixed_code_hash)
+            rows.append(item)
+        yield rows
+
+def export_bugs(fmt="ndjson", include_code=False, chunk_size=None, **filters):
+    """
+    Yield the matching bugs as NDJSON or CSV text, one chunk per
+    ``chunk_size`` rows, in id order. Rows are read through a server-side
+    cursor, so memory stays flat whatever the table size.
+    """
+    chunk_size = chunk_size or current_app.config.get("BULK_BATCH_SIZE", 500)
+    query = export_query(include_code=include_code, **filters)
+    partitions = _export_rows(query, include_code, chunk_size)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, EXPORT_FIELDS + (CODE_FIELDS if include_code else []))
+        writer.writeheader()
+        for rows in partitions:
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+        return
+    for rows in partitions:
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+# -------------------------
+# CLI: flask bugs ...
+# -------------------------
+bulk_cli = AppGroup("bugs", help="Bulk bug import and export.")
+
+@bulk_cli.command("import")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), help="Input format (default: from the file name).")
+@click.option("--user", "username", help="Owner of rows without created_by.")
+@click.option("--batch-size", type=int, help="Rows per INSERT and commit (default: BULK_BATCH_SIZE).")
+@click.option("--analyze", is_flag=True, help="Queue AI analysis for imported bugs with code and no fix.")
+@with_appcontext
+def import_command(source, fmt, username, batch_size, analyze):
+    """Import bugs from an NDJSON or CSV file ('-' for stdin)."""
+    owner_id = None
+    if username:
+        owner_id = db.session.execute(db.select(User.id).where(User.username == username)).scalar()
+        if owner_id is None:
+            raise click.ClickException(f"No user named {username!r}.")
+    fmt = fmt or guess_format(source.name)
+    report = import_bugs(READERS[fmt](source), owner_id=owner_id, trust_owner=True,
+                         analyze=analyze, batch_size=batch_size)
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report.imported} of {report.rows} row(s) in {report.batches} batch(es); "
+               f"{report.failed} failed.")
+    if report.queued:
+        click.echo(f"Queued {report.queued} analysis job(s); run `flask jobs work` to process them.")
+
+@bulk_cli.command("export")
+@click.option("--output", "-o", type=click.File("w", encoding="utf-8"), default="-", help="Output file (default: stdout).")
+@click.option("--format", "fmt", type=click.Choice(FORMATS), help="Output format (default: from the file name).")
+@click.option("--include-code", is_flag=True, help="Include original and fixed code.")
+@click.option("--status", type=click.Choice(STATUSES))
+@click.option("--severity", type=click.Choice(SEVERITIES))
+@click.option("--project-id", type=int)
+@with_appcontext
+def export_command(output, fmt, include_code, status, severity, project_id):
+    """Export bugs as NDJSON or CSV."""
+    fmt = fmt or guess_format(output.name)
+    for chunk in export_bugs(fmt, include_code=include_code, status=status, severity=severity,
+                             project_id=project_id):
+        output.write(chunk)
@@ -0,0 +1,375 @@
+# app/code_store.py
+import hashlib
+import json
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+
+RAW = "raw"
+ZLIB = "zlib"
+DELTA = "delta"
+# Deltas are line diffs; above this size the diff costs more than it saves
+DELTA_MAX_CHARS = 512 * 1024
+
+# -------------------------
+# Encoding
+# -------------------------
+def blob_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress(text):
+    data = text.encode("utf-8")
+    packed = zlib.compress(data, 6)
+    return (ZLIB, packed) if len(packed) < len(data) else (RAW, data)
+
+def make_delta(base, text):
+    """zlib-compressed line delta: [start, end] copies base lines, strings are new text."""
+    old = base.splitlines(keepends=True)
+    new = text.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"), 6)
+
+def apply_delta(base, data):
+    old = base.splitlines(keepends=True)
+    return "".join(
+        "".join(old[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in json.loads(zlib.decompress(data))
+    )
+
+def inflate(codec, data, base_codec=None, base_data=None):
+    """Decode a stored blob; deltas also need their base blob's codec and data."""
+    if data is None:
+        return None
+    if codec == DELTA:
+        return apply_delta(inflate(base_codec, base_data), data)
+    if codec == ZLIB:
+        data = zlib.decompress(data)
+    return bytes(data).decode("utf-8")
+
+
+def register_sqlite_functions(dbapi_connection):
+    """
+    Define code_inflate() on one SQLite connection, so SQL can read compressed
+    code. Only migrations need it: a93e1f6c2b48's search view, which
+    b2f7c9e4a1d8 replaces with an index the application fills.
+    """
+    dbapi_connection.create_function("code_inflate", 4, inflate, deterministic=True)
+
+# -------------------------
+# Blob store
+# -------------------------
+class CodeStore:
+    """
+    Content-addressed, compressed storage for code bodies (the code_blob table).
+
+    Blobs are keyed by the SHA-256 of their text, so identical snippets are
+    stored once. Each blob counts the Bug columns and delta blobs that point
+    at it; counts are adjusted at flush time and a blob is deleted when its
+    count drops to zero. Decoded texts are immutable, so they are cached
+    in-process by hash without invalidation.
+    """
+
+    def __init__(self, cache_bytes=16 * 1024 * 1024):
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.cache_bytes = app.config.get("CODE_BLOB_CACHE_BYTES", self.cache_bytes)
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["code_store"] = self
+
+    # -------------------------
+    # Cache
+    # -------------------------
+    def _cache_get(self, digest):
+        with self._lock:
+            text = self._cache.get(digest)
+            if text is not None:
+                self._cache.move_to_end(digest)
+            return text
+
+    def _cache_put(self, digest, text):
+        size = len(text)
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            if digest in self._cache:
+                return
+            self._cache[digest] = text
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, old = self._cache.popitem(last=False)
+                self._cached_bytes -= len(old)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def get(self, digest):
+        if digest is None:
+            return None
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests):
+        """Map of hash -> text for the given hashes, in one query for cache misses."""
+        from app.models import CodeBlob
+
+        result = {}
+        missing = set()
+        for digest in digests:
+            if digest is None:
+                continue
+            text = self._cache_get(digest)
+            if text is None:
+                missing.add(digest)
+            else:
+                result[digest] = text
+        if not missing:
+            return result
+
+        base = db.aliased(CodeBlob)
+        # Through the connection: reads from property getters/setters must not autoflush
+        rows = db.session.connection().execute(
+            db.select(CodeBlob.hash, CodeBlob.codec, CodeBlob.data, base.codec, base.data)
+            .outerjoin(base, base.hash == CodeBlob.base_hash)
+            .where(CodeBlob.hash.in_(missing))
+        ).all()
+        for digest, codec, data, base_codec, base_data in rows:
+            text = inflate(codec, data, base_codec, base_data)
+            self._cache_put(digest, text)
+            result[digest] = text
+        return result
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def put(self, text, base_hash=None):
+        """
+        Store ``text`` if it is not stored yet and return its hash (None for
+        empty text). With ``base_hash``, the blob is kept as a line delta
+        against that blob when the delta is smaller. References are counted
+        when a Bug pointing at the hash is flushed.
+        """
+        from app.models import CodeBlob
+
+        if not text:
+            return None
+        digest = blob_hash(text)
+        connection = db.session.connection()
+        table = CodeBlob.__table__
+
+        # A no-op UPDATE confirms the blob exists and locks it against a concurrent delete
+        touched = connection.execute(
+            db.update(table).where(table.c.hash == digest).values(hash=table.c.hash)
+        ).rowcount
+        if touched:
+            return digest
+
+        codec, data = compress(text)
+        delta_base = None
+        if base_hash and base_hash != digest and len(text) <= DELTA_MAX_CHARS:
+            base_row = connection.execute(
+                db.select(table.c.codec).where(table.c.hash == base_hash)
+            ).first()
+            base_text = self.get(base_hash) if base_row and base_row.codec != DELTA else None
+            if base_text is not None and len(base_text) <= DELTA_MAX_CHARS:
+                delta = make_delta(base_text, text)
+                if len(delta) < len(data):
+                    codec, data, delta_base = DELTA, delta, base_hash
+
+        inserted = connection.execute(
+            _insert_ignore(connection, table),
+            {
+                "hash": digest, "codec": codec, "data": data, "base_hash": delta_base,
+                "size": len(text), "refcount": 0, "created_at": datetime.utcnow(),
+            },
+        ).rowcount
+        if inserted and delta_base:
+            # A delta keeps its base alive
+            self.adjust_refs(connection, {delta_base: 1})
+        self._cache_put(digest, text)
+        return digest
+
+    def adjust_refs(self, connection, deltas):
+        """Apply reference count changes and delete blobs that reach zero."""
+        from app.models import CodeBlob
+
+        table = CodeBlob.__table__
+        while deltas:
+            rows = [{"h": digest, "d": change} for digest, change in deltas.items() if digest and change]
+            if not rows:
+                return
+            connection.execute(
+                db.update(table)
+                .where(table.c.hash == db.bindparam("h"))
+                .values(refcount=table.c.refcount + db.bindparam("d")),
+                rows,
+            )
+            released = [row["h"] for row in rows if row["d"] < 0]
+            if not released:
+                return
+            dead = connection.execute(
+                db.select(table.c.hash, table.c.base_hash)
+                .where(table.c.hash.in_(released), table.c.refcount <= 0)
+            ).all()
+            if not dead:
+                return
+            connection.execute(db.delete(table).where(table.c.hash.in_([row.hash for row in dead])))
+            # Deleting a delta releases its base in turn
+            deltas = Counter()
+            for row in dead:
+                if row.base_hash:
+                    deltas[row.base_hash] -= 1
+
+    def recount_refs(self):
+        """
+        Recompute every reference count from the bug table and delta bases,
+        for use after bulk loads that bypass the ORM. Caller commits.
+        """
+        from app.models import Bug, CodeBlob
+
+        def refs(column):
+            return db.select(db.func.count()).select_from(Bug).where(column == CodeBlob.hash).scalar_subquery()
+
+        delta = db.aliased(CodeBlob)
+        children = (
+            db.select(db.func.count()).select_from(delta)
+            .where(delta.base_hash == CodeBlob.hash).scalar_subquery()
+        )
+        return db.session.execute(
+            db.update(CodeBlob).values(
+                refcount=refs(Bug.original_code_hash) + refs(Bug.fixed_code_hash) + children
+            )
+        ).rowcount
+
+    def collect_garbage(self, older_than=timedelta(hours=1)):
+        """
+        Delete unreferenced blobs, e.g. from values replaced before a flush.
+        Recent blobs are skipped since an open transaction may be about to
+        reference them.
+        """
+        from app.models import CodeBlob
+
+        cutoff = datetime.utcnow() - older_than
+        connection = db.session.connection()
+        dead = connection.execute(
+            db.select(CodeBlob.hash, CodeBlob.base_hash)
+            .where(CodeBlob.refcount <= 0, CodeBlob.created_at < cutoff)
+        ).all()
+        if dead:
+            connection.execute(db.delete(CodeBlob).where(CodeBlob.hash.in_([row.hash for row in dead])))
+            # Deleting a delta releases its base in turn
+            released = Counter()
+            for row in dead:
+                if row.base_hash:
+                    released[row.base_hash] -= 1
+            self.adjust_refs(connection, released)
+        db.session.commit()
+        return len(dead)
+
+
+def _insert_ignore(connection, table):
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing(index_elements=[table.c.hash])
+
+
+code_store = CodeStore()
+
+# -------------------------
+# Flush-time reference counting
+# -------------------------
+CODE_COLUMNS = ("original_code_hash", "fixed_code_hash")
+
+def _collect_refs(session, flush_context, instances):
+    from app.models import Bug
+    from app.stats import committed_value
+
+    deltas = session.info.setdefault("code_ref_deltas", Counter())
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Bug):
+                for column in CODE_COLUMNS:
+                    deltas[getattr(obj, column)] += 1
+        for obj in session.deleted:
+            if isinstance(obj, Bug):
+                for column in CODE_COLUMNS:
+                    deltas[committed_value(obj, column)] -= 1
+        for obj in session.dirty:
+            if not isinstance(obj, Bug):
+                continue
+            state = inspect(obj)
+            for column in CODE_COLUMNS:
+                if getattr(state.attrs, column).history.has_changes():
+                    deltas[committed_value(obj, column)] -= 1
+                    deltas[getattr(obj, column)] += 1
+
+def _apply_refs(session, flush_context):
+    deltas = session.info.pop("code_ref_deltas", None)
+    deltas = {digest: change for digest, change in (deltas or {}).items() if digest and change}
+    if deltas:
+        code_store.adjust_refs(session.connection(), deltas)
+
+def _discard_refs(session, previous_transaction):
+    session.info.pop("code_ref_deltas", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_refs),
+    ("after_flush", _apply_refs),
+    ("after_soft_rollback", _discard_refs),
+)
+
+# -------------------------
+# CLI: flask blobs ...
+# -------------------------
+blobs_cli = AppGroup("blobs", help="Compressed code blob storage.")
+
+@blobs_cli.command("gc")
+@with_appcontext
+def gc_command():
+    """Delete code blobs no bug refers to."""
+    count = code_store.collect_garbage()
+    click.echo(f"Deleted {count} unreferenced blob(s).")
+
+@blobs_cli.command("recount")
+@with_appcontext
+def recount_command():
+    """Recompute blob reference counts from the bug table."""
+    count = code_store.recount_refs()
+    db.session.commit()
+    click.echo(f"Recounted {count} blob(s).")
+
+@blobs_cli.command("stats")
+@with_appcontext
+def stats_command():
+    """Show stored vs. original code size."""
+    from app.models import CodeBlob
+
+    row = db.session.execute(
+        db.select(
+            db.func.count(CodeBlob.hash),
+            db.func.coalesce(db.func.sum(CodeBlob.size), 0),
+            db.func.coalesce(db.func.sum(db.func.length(CodeBlob.data)), 0),
+        )
+    ).one()
+    deltas = db.session.execute(
+        db.select(db.func.count(CodeBlob.hash)).where(CodeBlob.codec == DELTA)
+    ).scalar()
+    click.echo(f"Blobs: {row[0]} ({deltas} deltas)")
+    click.echo(f"Text size: {row[1]} chars, stored: {row[2]} bytes")
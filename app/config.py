@@ -6,3 +6,110 @@ class Config:
         'sqlite:///bugtracker.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Database engine tuning (app/engine_config.py); DB_TUNING=0 uses SQLAlchemy defaults
+    DB_TUNING = os.environ.get('DB_TUNING') or '1'
+    # Pool overrides; unset values use the backend's profile
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING')
+    # SQLite pragmas applied to each connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 15000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 64 * 1024)
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE') or 'MEMORY'
+    # Postgres connection settings
+    PG_CONNECT_TIMEOUT = int(os.environ.get('PG_CONNECT_TIMEOUT') or 10)
+    PG_STATEMENT_TIMEOUT_MS = int(os.environ.get('PG_STATEMENT_TIMEOUT_MS') or 0)  # 0 = no limit
+    PG_APPLICATION_NAME = os.environ.get('PG_APPLICATION_NAME') or 'bugtracker'
+
+    # AI analysis result cache
+    ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES') or 8 * 1024 * 1024)
+    ANALYSIS_CACHE_DB = os.environ.get('ANALYSIS_CACHE_DB')  # optional SQLite file for a shared second tier
+    ANALYSIS_CACHE_DB_MAX_ROWS = int(os.environ.get('ANALYSIS_CACHE_DB_MAX_ROWS') or 100000)  # oldest pruned first; 0 = no cap
+
+    # In-memory log_bug history (app/bug_log.py): ring buffer size; evicted records optionally go to a SQLite file
+    BUG_LOG_SIZE = int(os.environ.get('BUG_LOG_SIZE') or 10000)
+    BUG_LOG_SPILL_DB = os.environ.get('BUG_LOG_SPILL_DB')
+
+    # Background analysis jobs
+    JOB_INPROCESS_WORKERS = int(os.environ.get('JOB_INPROCESS_WORKERS') or 1)  # 0 = use `flask jobs work` only
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS') or 3)
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL') or 1.0)
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS') or 300)
+
+    # Threads per gunicorn worker (Procfile); each open /api/events stream holds one
+    WEB_THREADS = int(os.environ.get('WEB_THREADS') or 8)
+
+    # Live update events (app/events.py, /api/events); 'database' shares events between worker processes
+    EVENTS_ENABLED = (os.environ.get('EVENTS_ENABLED') or '1') != '0'
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND') or 'database'  # or 'memory' for a single process
+    EVENTS_POLL_INTERVAL = float(os.environ.get('EVENTS_POLL_INTERVAL') or 0.5)  # one poll per process, not per client
+    EVENTS_RETENTION_SECONDS = int(os.environ.get('EVENTS_RETENTION_SECONDS') or 300)  # replay window for reconnects
+    # Open streams per process; kept below WEB_THREADS so ordinary requests still get a thread
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS') or max(WEB_THREADS - 2, 0))
+    EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS') or 15)
+    EVENTS_STREAM_SECONDS = float(os.environ.get('EVENTS_STREAM_SECONDS') or 300)  # then the browser reconnects
+
+    # Append-only bug activity log (app/activity.py) behind timelines and MTTR
+    ACTIVITY_LOG_ENABLED = (os.environ.get('ACTIVITY_LOG_ENABLED') or '1') != '0'
+
+    # Trend rollups (app/rollups.py): hourly buckets are folded into days after this many hours
+    ROLLUP_HOURLY_RETENTION_HOURS = int(os.environ.get('ROLLUP_HOURLY_RETENTION_HOURS') or 48)
+    ROLLUP_COMPACT_INTERVAL = float(os.environ.get('ROLLUP_COMPACT_INTERVAL') or 3600)  # seconds; 0 = CLI only
+    ROLLUP_CACHE_TTL = float(os.environ.get('ROLLUP_CACHE_TTL') or 5)  # trend results; 0 = uncached
+
+    # HTTP caching (app/http_cache.py): gzip text responses from this size (0 = off); fingerprinted static max-age
+    HTTP_COMPRESS_MIN_BYTES = int(os.environ.get('HTTP_COMPRESS_MIN_BYTES') or 1024)
+    HTTP_COMPRESS_LEVEL = int(os.environ.get('HTTP_COMPRESS_LEVEL') or 6)
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE') or 365 * 24 * 3600)
+
+    # Bulk import / export (app/bulk.py): rows per INSERT and commit, and per export chunk
+    BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE') or 500)
+    BULK_MAX_ERRORS = int(os.environ.get('BULK_MAX_ERRORS') or 100)  # row errors listed in an import report
+
+    # Streaming analysis (/api/analyze_code/stream)
+    STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE') or 64 * 1024)
+    STREAM_SPOOL_MEMORY_LIMIT = int(os.environ.get('STREAM_SPOOL_MEMORY_LIMIT') or 1024 * 1024)  # spill to disk beyond this
+    STREAM_MAX_IDS = int(os.environ.get('STREAM_MAX_IDS') or 50000)  # id="..." values planned in memory per upload
+    STREAM_MAX_ID_LENGTH = int(os.environ.get('STREAM_MAX_ID_LENGTH') or 4096)  # characters per id="..." value
+    STREAM_MAX_BYTES = int(os.environ.get('STREAM_MAX_BYTES') or 64 * 1024 * 1024)  # request body; larger gets 413
+
+    # Incremental analysis sessions for the live code editor
+    INCREMENTAL_MAX_DOCUMENTS = int(os.environ.get('INCREMENTAL_MAX_DOCUMENTS') or 1000)
+    INCREMENTAL_IDLE_SECONDS = int(os.environ.get('INCREMENTAL_IDLE_SECONDS') or 300)
+
+    # Instrumentation and /metrics (app/metrics.py)
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or '1') != '0'
+    # When set, /metrics requires "Authorization: Bearer <token>"; unset, only admins and local scrapers
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_RULE_TIMINGS = (os.environ.get('METRICS_RULE_TIMINGS') or '1') != '0'
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS') or 1000)  # 0 = no slow-request log
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD') or 10)  # repeats of one statement per request
+
+    # Password hashing (app/passwords.py); hashes made with other parameters are upgraded at login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'  # or e.g. pbkdf2:sha256:600000
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 0)  # 0 = one per CPU
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE') or 16)  # waiting hashes before logins get 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT') or 10)
+
+    # Flask-Login user cache (app/user_cache.py); the TTL bounds how long other workers see a stale role
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL') or 30)  # 0 = per-request memo only
+    USER_CACHE_MAX_ENTRIES = int(os.environ.get('USER_CACHE_MAX_ENTRIES') or 10000)
+
+    # Visible project sets from team membership (app/access.py); the TTL bounds staleness in other workers
+    ACCESS_CACHE_TTL = float(os.environ.get('ACCESS_CACHE_TTL') or 60)  # 0 = per-request memo only
+    ACCESS_CACHE_MAX_ENTRIES = int(os.environ.get('ACCESS_CACHE_MAX_ENTRIES') or 10000)
+
+    # Decoded code blobs kept in memory (content-addressed, so never stale)
+    CODE_BLOB_CACHE_BYTES = int(os.environ.get('CODE_BLOB_CACHE_BYTES') or 16 * 1024 * 1024)
+
+    # Dashboard counters (bug_stat table), cached in-process for this many seconds
+    STATS_CACHE_TTL = float(os.environ.get('STATS_CACHE_TTL') or 5)
+
+    # Full-text search: terms matching more bugs than this rank only the newest ones (0 = rank all)
+    SEARCH_RANK_WINDOW = int(os.environ.get('SEARCH_RANK_WINDOW') or 2000)
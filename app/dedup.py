@@ -0,0 +1,234 @@
+# app/dedup.py
+import hashlib
+import random
+import re
+import struct
+
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+from app.ai_engine import RULESET_VERSION, classify_description
+from app.code_store import code_store
+from app.models import Bug, BugLSHBand, BugSignature
+
+# 16 bands of 4 rows: two bugs share a bucket with probability 1 - (1 - J^4)^16,
+# about 0.6 at Jaccard 0.5 and 0.99 at 0.7
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE), _rng.randrange(0, MERSENNE)) for _ in range(NUM_PERM)]
+
+# Signatures of very large snippets use their head only; cost grows with shingle count
+MAX_SIGNATURE_CHARS = 64 * 1024
+MAX_CANDIDATES = 50
+NO_FIX_NOTE = "No automated fix available."
+NOTE_SEPARATOR = "\n---\n"
+
+WORDS = re.compile(r"\w+")
+CODE_TOKENS = re.compile(r"\w+|[^\w\s]")
+
+# -------------------------
+# Signatures
+# -------------------------
+def _grams(tokens, k, prefix):
+    if len(tokens) < k:
+        return {prefix + " ".join(tokens)} if tokens else set()
+    return {prefix + " ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+def shingles(description, code):
+    """Word 3-grams of the description and token 4-grams of the code (whitespace-insensitive)."""
+    words = WORDS.findall((description or "")[:MAX_SIGNATURE_CHARS].lower())
+    tokens = CODE_TOKENS.findall((code or "")[:MAX_SIGNATURE_CHARS])
+    return _grams(words, 3, "d:") | _grams(tokens, 4, "c:")
+
+def minhash(description, code):
+    """Signature as a list of NUM_PERM ints, or None when there is nothing to hash."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingles(description, code)
+    ]
+    if not hashes:
+        return None
+    return [min((a * h + b) % MERSENNE for h in hashes) for a, b in PERMUTATIONS]
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack("<B%dQ" % ROWS, band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+def pack(signature):
+    return struct.pack("<%dQ" % NUM_PERM, *signature)
+
+def unpack(data):
+    return struct.unpack("<%dQ" % NUM_PERM, data)
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+def code_hash(code):
+    if not code:
+        return None
+    digest = hashlib.sha256(RULESET_VERSION.encode("utf-8") + b"\0" + code.encode("utf-8"))
+    return digest.hexdigest()
+
+# -------------------------
+# Index maintenance
+# -------------------------
+def index_bug(bug, signature=None):
+    """Store the signature and band buckets for a flushed bug. Caller commits."""
+    if signature is None:
+        signature = minhash(bug.description, bug.original_code)
+    if signature is None:
+        return None
+    db.session.add(BugSignature(bug_id=bug.id, minhash=pack(signature), code_hash=code_hash(bug.original_code)))
+    db.session.execute(
+        db.insert(BugLSHBand),
+        [{"band_key": key, "bug_id": bug.id} for key in band_keys(signature)],
+    )
+    return signature
+
+def index_many(rows):
+    """Bulk version of index_bug for (bug_id, description, code) rows. Returns the count indexed; caller commits."""
+    signatures, bands = [], []
+    for bug_id, description, code in rows:
+        signature = minhash(description, code)
+        if signature is None:
+            continue
+        signatures.append({"bug_id": bug_id, "minhash": pack(signature), "code_hash": code_hash(code)})
+        bands.extend({"band_key": key, "bug_id": bug_id} for key in band_keys(signature))
+    if signatures:
+        db.session.execute(db.insert(BugSignature), signatures)
+        db.session.execute(db.insert(BugLSHBand), bands)
+    return len(signatures)
+
+def reindex_all(chunk_size=1000):
+    """Rebuild signatures for every bug, in id order, committing per chunk."""
+    db.session.execute(db.delete(BugLSHBand))
+    db.session.execute(db.delete(BugSignature))
+    db.session.commit()
+
+    last_id = 0
+    indexed = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Bug.id, Bug.description, Bug.original_code_hash)
+            .where(Bug.id > last_id).order_by(Bug.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            return indexed
+        codes = code_store.get_many(row.original_code_hash for row in rows)
+        indexed += index_many(
+            (bug_id, description, codes.get(digest)) for bug_id, description, digest in rows
+        )
+        db.session.commit()
+        last_id = rows[-1].id
+
+# -------------------------
+# Lookups
+# -------------------------
+def find_duplicates(description, code, exclude_id=None, limit=5, threshold=0.5, signature=None, scope=None):
+    """
+    Likely duplicates of the given report, best first. Candidates come from
+    shared LSH buckets (an indexed IN lookup), then are scored by their
+    stored signatures, so the cost does not grow with the number of bugs.
+    With an AccessScope, only bugs visible in it are returned.
+    """
+    if signature is None:
+        signature = minhash(description, code)
+    if signature is None:
+        return []
+
+    shared = db.func.count().label("shared")
+    query = (
+        db.select(BugLSHBand.bug_id, shared)
+        .where(BugLSHBand.band_key.in_(band_keys(signature)))
+        .group_by(BugLSHBand.bug_id)
+        .order_by(shared.desc())
+        .limit(MAX_CANDIDATES)
+    )
+    if exclude_id is not None:
+        query = query.where(BugLSHBand.bug_id != exclude_id)
+    candidate_ids = [row.bug_id for row in db.session.execute(query)]
+    if not candidate_ids:
+        return []
+
+    query = (
+        db.select(
+            Bug.id, Bug.title, Bug.status, Bug.severity,
+            Bug.fixed_code_hash.isnot(None).label("has_fix"), BugSignature.minhash
+        )
+        .join(BugSignature, BugSignature.bug_id == Bug.id)
+        .where(Bug.id.in_(candidate_ids))
+    )
+    if scope is not None:
+        query = scope.apply(query)
+    rows = db.session.execute(query).all()
+
+    matches = []
+    for row in rows:
+        score = similarity(signature, unpack(row.minhash))
+        if score >= threshold:
+            matches.append({
+                "id": row.id,
+                "title": row.title,
+                "status": row.status,
+                "severity": row.severity,
+                "has_fix": bool(row.has_fix),
+                "similarity": round(score, 2),
+            })
+    matches.sort(key=lambda m: (-m["similarity"], -m["id"]))
+    return matches[:limit]
+
+def reuse_fix(bug):
+    """
+    (fixed_code, ai_notes) for ``bug`` taken from an already analysed bug with
+    identical code under the current rule set, or None. Rule output depends
+    only on the code, so the fixed code is reused as is; description
+    templates are recomputed, giving the same result as a fresh analysis.
+    """
+    digest = code_hash(bug.original_code)
+    if digest is None:
+        return None
+    donor = db.session.execute(
+        db.select(Bug.description, Bug.fixed_code_hash, Bug.ai_notes)
+        .join(BugSignature, BugSignature.bug_id == Bug.id)
+        .where(
+            BugSignature.code_hash == digest,
+            Bug.id != bug.id,
+            Bug.fixed_code_hash.isnot(None),
+            Bug.ai_notes.isnot(None),
+            Bug.original_code_hash == bug.original_code_hash
+        )
+        .order_by(Bug.id.desc())
+        .limit(1)
+    ).first()
+    if donor is None:
+        return None
+
+    # Split the donor's notes into its description templates and the rule notes
+    donor_templates = classify_description(donor.description or "")["templates"]
+    parts = [] if donor.ai_notes == NO_FIX_NOTE else donor.ai_notes.split(NOTE_SEPARATOR)
+    if parts[:len(donor_templates)] != donor_templates:
+        return None
+    fixes = classify_description(bug.description or "")["templates"] + parts[len(donor_templates):]
+    return code_store.get(donor.fixed_code_hash), NOTE_SEPARATOR.join(fixes) if fixes else NO_FIX_NOTE
+
+# -------------------------
+# CLI: flask dedup ...
+# -------------------------
+dedup_cli = AppGroup("dedup", help="Near-duplicate bug detection.")
+
+@dedup_cli.command("reindex")
+@click.option("--chunk-size", default=1000, show_default=True, help="Bugs per transaction.")
+@with_appcontext
+def reindex_command(chunk_size):
+    """Recompute MinHash signatures and LSH buckets for all bugs."""
+    count = reindex_all(chunk_size)
+    click.echo(f"Indexed {count} bug(s).")
@@ -0,0 +1,136 @@
+# app/engine_config.py
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app import db
+
+# -------------------------
+# Per-backend pool profiles (overridden by DB_POOL_* settings)
+# -------------------------
+POOL_PROFILES = {
+    # One writer at a time anyway; a small pool keeps file handles and page caches few
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+    },
+    # Recycle below typical server/proxy idle timeouts and drop dead connections early
+    "postgresql": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+}
+
+POOL_SETTINGS = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_recycle": "DB_POOL_RECYCLE",
+    "pool_pre_ping": "DB_POOL_PRE_PING",
+}
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off", "")
+    return bool(value)
+
+def _choice(value, allowed, name):
+    value = str(value).upper()
+    if value not in allowed:
+        raise ValueError(f"{name} must be one of {', '.join(sorted(allowed))}, got {value!r}")
+    return value
+
+def _is_memory_sqlite(url):
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+# -------------------------
+# Engine options
+# -------------------------
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database: the backend's pool
+    profile with any DB_POOL_* overrides, plus Postgres connect arguments.
+    Returns {} when DB_TUNING is off.
+    """
+    if not _flag(config.get("DB_TUNING", True)):
+        return {}
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    backend = url.get_backend_name()
+    # In-memory SQLite uses a single shared connection (StaticPool); pool sizes do not apply
+    if backend == "sqlite" and _is_memory_sqlite(url):
+        return {}
+
+    options = dict(POOL_PROFILES.get(backend, {}))
+    for option, key in POOL_SETTINGS.items():
+        value = config.get(key)
+        if value is None or value == "":
+            continue
+        options[option] = _flag(value) if option == "pool_pre_ping" else int(value)
+
+    if backend == "postgresql" and url.get_driver_name() in ("psycopg2", "psycopg"):
+        connect_args = {
+            "connect_timeout": int(config.get("PG_CONNECT_TIMEOUT") or 10),
+            "application_name": config.get("PG_APPLICATION_NAME") or "bugtracker",
+        }
+        statement_timeout = int(config.get("PG_STATEMENT_TIMEOUT_MS") or 0)
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+        options["connect_args"] = connect_args
+    return options
+
+def sqlite_pragmas(config, memory=False):
+    """(pragma, value) pairs run on every new SQLite connection, in order."""
+    pragmas = []
+    if not memory:
+        # WAL lets readers proceed while one writer commits; it persists in the file
+        pragmas.append(("journal_mode", _choice(config.get("SQLITE_JOURNAL_MODE") or "WAL",
+                                                JOURNAL_MODES, "SQLITE_JOURNAL_MODE")))
+        pragmas.append(("mmap_size", int(config.get("SQLITE_MMAP_SIZE") or 0)))
+    pragmas += [
+        # NORMAL is durable across application crashes in WAL mode; only power loss can drop the last commits
+        ("synchronous", _choice(config.get("SQLITE_SYNCHRONOUS") or "NORMAL",
+                                SYNCHRONOUS_MODES, "SQLITE_SYNCHRONOUS")),
+        # Wait for the write lock instead of failing with "database is locked"
+        ("busy_timeout", int(config.get("SQLITE_BUSY_TIMEOUT_MS") or 0)),
+        # Negative cache_size is in KiB, positive in pages
+        ("cache_size", -int(config.get("SQLITE_CACHE_SIZE_KB") or 2000)),
+        ("temp_store", _choice(config.get("SQLITE_TEMP_STORE") or "DEFAULT",
+                               TEMP_STORES, "SQLITE_TEMP_STORE")),
+    ]
+    return pragmas
+
+# -------------------------
+# Connection setup
+# -------------------------
+def init_app(app):
+    """
+    Apply SQLite pragmas to every connection of the app's engines. Call after
+    db.init_app(); engine_options() must already be in the app config.
+    """
+    if not _flag(app.config.get("DB_TUNING", True)):
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name != "sqlite":
+            continue
+        pragmas = sqlite_pragmas(app.config, memory=_is_memory_sqlite(engine.url))
+
+        def set_pragmas(dbapi_connection, connection_record, pragmas=pragmas):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas:
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+        event.listen(engine, "connect", set_pragmas)
@@ -0,0 +1,384 @@
+# app/events.py
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.models import AnalysisJob, Bug, BugHistory, Comment, LiveEvent
+
+# Sent to a subscriber whose queue overflowed; the client reloads instead of missing events
+RESYNC = object()
+
+# -------------------------
+# Change capture
+# -------------------------
+def bug_event(kind, bug_id, owner=None, project_id=None, **fields):
+    """One change notification; ``owner`` (the reporter) and ``project_id`` decide who sees the details."""
+    return dict(fields, type=kind, bug_id=bug_id, owner=owner, project_id=project_id)
+
+def _bug_scope(session, bug_id):
+    bug = session.get(Bug, bug_id)
+    return {"owner": bug.created_by, "project_id": bug.project_id} if bug is not None else {}
+
+def _status_change(obj):
+    history = inspect(obj).attrs.status.history
+    return bool(history.added) and history.added != history.deleted
+
+def _collect_events(session, flush_context):
+    # after_flush: new objects have ids and dirty ones still show this flush's changes
+    events = []
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Bug):
+                events.append(bug_event("bug.created", obj.id, obj.created_by,
+                                        status=obj.status, project_id=obj.project_id))
+            elif isinstance(obj, Comment):
+                events.append(bug_event("comment.created", obj.bug_id, **_bug_scope(session, obj.bug_id),
+                                        comment_id=obj.id))
+            elif isinstance(obj, BugHistory):
+                events.append(bug_event("history.created", obj.bug_id, **_bug_scope(session, obj.bug_id),
+                                        status=obj.new_status))
+            elif isinstance(obj, AnalysisJob):
+                events.append(bug_event("analysis.queued", obj.bug_id, **_bug_scope(session, obj.bug_id),
+                                        job_id=obj.id))
+        for obj in session.dirty:
+            if isinstance(obj, Bug) and session.is_modified(obj, include_collections=False):
+                events.append(bug_event("bug.updated", obj.id, obj.created_by,
+                                        status=obj.status, project_id=obj.project_id))
+            elif isinstance(obj, AnalysisJob) and _status_change(obj):
+                events.append(bug_event(f"analysis.{obj.status}", obj.bug_id, **_bug_scope(session, obj.bug_id),
+                                        job_id=obj.id))
+        for obj in session.deleted:
+            if isinstance(obj, Bug):
+                events.append(bug_event("bug.deleted", obj.id, obj.created_by, project_id=obj.project_id))
+    if events:
+        stage_events(session, events)
+
+def stage_events(session, events):
+    """
+    Queue events for delivery when the session commits. Also called
+    directly by bulk writers whose Core statements skip the flush hooks.
+    """
+    if not event_bus.enabled:
+        return
+    event_bus.backend.stage(session, events)
+    session.info.setdefault("live_events", []).extend(events)
+
+def _after_commit(session):
+    events = session.info.pop("live_events", None)
+    if events:
+        event_bus.dispatch(events)
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("live_events", None)
+
+_SESSION_LISTENERS = (
+    ("after_flush", _collect_events),
+    ("after_commit", _after_commit),
+    ("after_soft_rollback", _after_rollback),
+)
+
+# -------------------------
+# Cross-process backends
+# -------------------------
+class MemoryBackend:
+    """Events reach subscribers of this process only; for a single worker process."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def stage(self, session, events):
+        for item in events:
+            item["id"] = next(self._ids)
+
+    def start(self, bus, app):
+        pass
+
+    def replay(self, after_id):
+        return []
+
+
+class DatabaseBackend:
+    """
+    Events are written to the live_event table in the publishing
+    transaction (so they exist exactly when the change does) and one
+    thread per process polls the table for events of other processes.
+    Subscribers share that single poll, however many are connected.
+    """
+
+    # Rows committed out of id order (concurrent transactions) are still
+    # picked up if they commit within this window
+    GRACE = timedelta(seconds=5)
+
+    def __init__(self, poll_interval=0.5, retention=timedelta(minutes=5)):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def stage(self, session, events):
+        table = LiveEvent.__table__
+        now = datetime.utcnow()
+        rows = [{
+            "kind": item["type"], "bug_id": item.get("bug_id"), "origin": event_bus.origin,
+            "payload": json.dumps(item), "created_at": now,
+        } for item in events]
+        ids = session.connection().execute(
+            db.insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        for item, event_id in zip(events, ids):
+            item["id"] = event_id
+
+    def start(self, bus, app):
+        with self._lock:
+            # Threads do not survive a fork; each worker process polls for itself
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(bus, app), daemon=True, name="live-event-poller")
+            self._thread.start()
+
+    def replay(self, after_id):
+        rows = db.session.execute(
+            db.select(LiveEvent.id, LiveEvent.payload).where(LiveEvent.id > after_id).order_by(LiveEvent.id)
+        ).all()
+        return [dict(json.loads(row.payload), id=row.id) for row in rows]
+
+    def _run(self, bus, app):
+        last_id = None
+        seen = deque(maxlen=10000)
+        seen_set = set()
+        last_prune = time.monotonic()
+        while True:
+            time.sleep(self.poll_interval)
+            if not bus.subscriber_count():
+                last_id = None  # nobody listening; restart from the newest event later
+                continue
+            with app.app_context():
+                try:
+                    # The first poll only marks what is already there as seen
+                    priming = last_id is None
+                    last_id = last_id or 0
+                    rows = db.session.execute(
+                        db.select(LiveEvent.id, LiveEvent.payload, LiveEvent.origin)
+                        .where(db.or_(LiveEvent.id > last_id,
+                                      LiveEvent.created_at > datetime.utcnow() - self.GRACE))
+                        .order_by(LiveEvent.id)
+                    ).all()
+                    events = []
+                    for row in rows:
+                        last_id = max(last_id, row.id)
+                        if row.id in seen_set:
+                            continue
+                        if len(seen) == seen.maxlen:
+                            seen_set.discard(seen[0])
+                        seen.append(row.id)
+                        seen_set.add(row.id)
+                        if row.origin != bus.origin and not priming:
+                            events.append(dict(json.loads(row.payload), id=row.id))
+                    if events:
+                        bus.dispatch(events)
+                    if time.monotonic() - last_prune > 60:
+                        prune_events(self.retention)
+                        last_prune = time.monotonic()
+                    db.session.commit()
+                except Exception as e:
+                    print(f"Live event poller error: {e}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+BACKENDS = {"memory": MemoryBackend, "database": DatabaseBackend}
+
+def prune_events(older_than=timedelta(minutes=5)):
+    """Delete delivered events past the replay window. Caller commits."""
+    return db.session.execute(
+        db.delete(LiveEvent).where(LiveEvent.created_at < datetime.utcnow() - older_than)
+    ).rowcount
+
+# -------------------------
+# Subscribers
+# -------------------------
+class Subscriber:
+    """One open event stream: a bounded queue plus what its user may see."""
+
+    def __init__(self, scope, bug_id=None, max_queue=100):
+        self.scope = scope
+        self.bug_id = bug_id
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def visible(self, item):
+        """``item`` as this subscriber may see it, or None."""
+        if self.bug_id is not None and item.get("bug_id") != self.bug_id:
+            return None
+        if not self.scope.allows(item.get("owner"), item.get("project_id")):
+            if self.bug_id is not None:
+                return None
+            # Others' changes arrive as a bare signal that something changed, without details
+            return {"id": item.get("id"), "type": item["type"]}
+        return item
+
+    def offer(self, item):
+        item = self.visible(item)
+        if item is None:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if not self.overflowed:
+                self.overflowed = True
+                with self.queue.mutex:
+                    self.queue.queue.clear()
+                self.queue.put_nowait(RESYNC)
+
+
+class EventBus:
+    """
+    In-process pub/sub for live bug updates, fed by session hooks on
+    Bug, Comment, BugHistory and AnalysisJob writes, with a pluggable
+    backend that carries events between worker processes. Streams are
+    served by /api/events (app/routes/events.py) as Server-Sent Events.
+    """
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.max_subscribers = 100
+        self.max_queue = 100
+        self.heartbeat = 15.0
+        self.stream_seconds = 300.0
+        self.enabled = True
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._origin = None
+        self._origin_pid = None
+        self._app = None
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get("EVENTS_ENABLED", True))
+        name = app.config.get("EVENTS_BACKEND", "database")
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown EVENTS_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+        self.backend = BACKENDS[name]()
+        if isinstance(self.backend, DatabaseBackend):
+            self.backend.poll_interval = app.config.get("EVENTS_POLL_INTERVAL", self.backend.poll_interval)
+            self.backend.retention = timedelta(seconds=app.config.get("EVENTS_RETENTION_SECONDS", 300))
+        self.max_subscribers = app.config.get("EVENTS_MAX_SUBSCRIBERS", self.max_subscribers)
+        threads = app.config.get("WEB_THREADS")
+        if threads and self.max_subscribers > threads - 2:
+            # A stream holds a worker thread for up to stream_seconds; leave two for other requests
+            print(f"EVENTS_MAX_SUBSCRIBERS={self.max_subscribers} leaves too few of WEB_THREADS={threads} "
+                  f"for other requests; capping it at {max(threads - 2, 0)}")
+            self.max_subscribers = max(threads - 2, 0)
+        self.heartbeat = app.config.get("EVENTS_HEARTBEAT_SECONDS", self.heartbeat)
+        self.stream_seconds = app.config.get("EVENTS_STREAM_SECONDS", self.stream_seconds)
+        self._app = app
+        if self.enabled:
+            register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["event_bus"] = self
+
+    @property
+    def origin(self):
+        """Identifies this process in the live_event table; renewed after a fork."""
+        if self._origin_pid != os.getpid():
+            self._origin = f"{os.getpid()}-{uuid.uuid4().hex[:16]}"
+            self._origin_pid = os.getpid()
+        return self._origin
+
+    # -------------------------
+    # Publish / subscribe
+    # -------------------------
+    def dispatch(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            for item in events:
+                subscriber.offer(item)
+
+    def subscribe(self, scope, bug_id=None):
+        """
+        A new Subscriber seeing what ``scope`` (an AccessScope) allows, or
+        None when this process already serves max_subscribers streams.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(scope, bug_id, self.max_queue)
+            self._subscribers.add(subscriber)
+        self.backend.start(self, self._app)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def stream(self, subscriber, replay=()):
+        """
+        SSE text for one subscriber: replayed events, then live ones, with
+        comment heartbeats. Ends after stream_seconds so sync workers are
+        released; the browser reconnects with Last-Event-ID.
+        """
+        try:
+            yield "retry: 3000\n\n"
+            last_id = 0
+            for item in replay:
+                item = subscriber.visible(item)
+                if item is not None:
+                    last_id = max(last_id, item["id"])
+                    yield f"id: {item['id']}\ndata: {json.dumps(item)}\n\n"
+            deadline = time.monotonic() + self.stream_seconds
+            while time.monotonic() < deadline:
+                try:
+                    item = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                event_id = item.get("id") or 0
+                if event_id and event_id <= last_id:
+                    continue  # already sent by the replay
+                last_id = max(last_id, event_id)
+                yield f"id: {event_id}\ndata: {json.dumps(item)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": self.subscriber_count(),
+            "max_subscribers": self.max_subscribers,
+        }
+
+
+event_bus = EventBus()
+
+# -------------------------
+# CLI: flask events ...
+# -------------------------
+events_cli = AppGroup("events", help="Live update events.")
+
+@events_cli.command("prune")
+@click.option("--minutes", default=5, show_default=True, help="Keep events newer than this.")
+@with_appcontext
+def prune_command(minutes):
+    """Delete old rows from the live_event table."""
+    count = prune_events(timedelta(minutes=minutes))
+    db.session.commit()
+    click.echo(f"Deleted {count} event(s).")
@@ -0,0 +1,219 @@
+# app/http_cache.py
+import gzip
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import quote
+
+from flask import Response, request, session as flask_session
+from sqlalchemy import event
+from werkzeug.http import dump_options_header
+
+from app import db
+from app.models import Bug, BugHistory, Comment
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+YEAR = 365 * 24 * 3600
+
+# -------------------------
+# Bug versions
+# -------------------------
+def _bump_versions(session, flush_context, instances):
+    """Bump version / updated_at of every bug changed in this flush, or whose comments or history changed."""
+    touched = set()
+    with session.no_autoflush:
+        for obj in list(session.dirty) + list(session.new) + list(session.deleted):
+            if isinstance(obj, Bug):
+                if obj in session.dirty and session.is_modified(obj, include_collections=False):
+                    touched.add(obj)
+            elif isinstance(obj, (Comment, BugHistory)):
+                bug = obj.bug or (obj.bug_id and session.get(Bug, obj.bug_id))
+                if bug is not None and bug not in session.new and bug not in session.deleted:
+                    touched.add(bug)
+    now = datetime.utcnow()
+    for bug in touched:
+        # A SQL expression, so concurrent writers never hand out the same version twice
+        bug.version = Bug.version + 1
+        bug.updated_at = now
+
+# -------------------------
+# Conditional responses
+# -------------------------
+def set_validators(response, etag, last_modified=None, weak=False):
+    response.set_etag(etag, weak=weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+def not_modified(etag, last_modified=None, weak=False):
+    """
+    A 304 response when the request's If-None-Match / If-Modified-Since
+    match these validators, else None. Lets views skip loading and
+    rendering for unchanged resources.
+    """
+    if not request.if_none_match and not request.if_modified_since:
+        return None
+    response = set_validators(Response(), etag, last_modified, weak)
+    response.make_conditional(request)
+    return response if response.status_code == 304 else None
+
+def attachment(filename):
+    """Content-Disposition value for a download, encoded the way send_file does it."""
+    try:
+        filename.encode("ascii")
+        options = {"filename": filename}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+        options = {"filename": simple, "filename*": f"UTF-8''{quote(filename, safe='')}"}
+    return dump_options_header("attachment", options)
+
+# -------------------------
+# Static assets and compression
+# -------------------------
+class HTTPCache:
+    """
+    Response-level caching: bug version bookkeeping, content-hashed static
+    URLs (``?v=<hash>``) served with a long-lived immutable Cache-Control,
+    and gzip for compressible responses above a size threshold.
+    """
+
+    def __init__(self):
+        self.compress_min_bytes = 1024
+        self.compress_level = 6
+        self.static_max_age = YEAR
+        self.build_id = ""
+        self._assets = {}
+        self._gzipped = OrderedDict()
+        self._lock = threading.Lock()
+        self._app = None
+
+    def init_app(self, app):
+        self.compress_min_bytes = app.config.get("HTTP_COMPRESS_MIN_BYTES", self.compress_min_bytes)
+        self.compress_level = app.config.get("HTTP_COMPRESS_LEVEL", self.compress_level)
+        self.static_max_age = app.config.get("STATIC_MAX_AGE", self.static_max_age)
+        self.build_id = self._hash_tree(app.template_folder and os.path.join(app.root_path, app.template_folder),
+                                        app.static_folder)
+        self._app = app
+        # db.session is shared by every app instance; register the listener once
+        if not event.contains(db.session, "before_flush", _bump_versions):
+            event.listen(db.session, "before_flush", _bump_versions)
+        app.url_defaults(self._static_url_defaults)
+        app.after_request(self._after_request)
+        app.extensions["http_cache"] = self
+
+    @staticmethod
+    def _hash_tree(*folders):
+        """Digest of every template and static file, so page ETags change on deploy."""
+        digest = hashlib.sha1()
+        for folder in folders:
+            if not folder or not os.path.isdir(folder):
+                continue
+            for root, dirs, files in os.walk(folder):
+                dirs.sort()
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, folder).encode("utf-8"))
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def asset_hash(self, filename):
+        """Short content hash of a static file, or None if it does not exist."""
+        path = os.path.join(self._app.static_folder, filename)
+        try:
+            stamp = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._assets.get(filename)
+        # Rehash when the file changes during development; in production mtimes are stable
+        if cached is None or cached[0] != stamp:
+            with open(path, "rb") as f:
+                cached = (stamp, hashlib.sha256(f.read()).hexdigest()[:12])
+            self._assets[filename] = cached
+        return cached[1]
+
+    def _static_url_defaults(self, endpoint, values):
+        if endpoint == "static" and "filename" in values and "v" not in values:
+            digest = self.asset_hash(values["filename"])
+            if digest:
+                values["v"] = digest
+
+    def _after_request(self, response):
+        if request.endpoint == "static" and response.status_code in (200, 304):
+            filename = (request.view_args or {}).get("filename")
+            version = request.args.get("v")
+            if version and filename and version == self.asset_hash(filename):
+                response.cache_control.no_cache = None
+                response.cache_control.public = True
+                response.cache_control.max_age = self.static_max_age
+                response.cache_control.immutable = True
+        return self._compress(response)
+
+    def _compress(self, response):
+        if not self.compress_min_bytes or response.status_code != 200:
+            return response
+        if not (response.mimetype or "").startswith(COMPRESSIBLE):
+            return response
+        if "Content-Encoding" in response.headers or "Content-Range" in response.headers:
+            return response
+        static = request.endpoint == "static"
+        # Streamed bodies (exports, event streams) are left alone; static files are read once
+        if response.is_streamed and not static:
+            return response
+        if response.content_length is not None and response.content_length < self.compress_min_bytes:
+            return response
+        response.vary.add("Accept-Encoding")
+        if not request.accept_encodings["gzip"]:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (request.path, etag) if static and etag else None
+        data = self._gzipped.get(key) if key else None
+        if data is None:
+            response.direct_passthrough = False
+            body = response.get_data()
+            if len(body) < self.compress_min_bytes:
+                return response
+            data = gzip.compress(body, self.compress_level, mtime=0)
+            if key:
+                with self._lock:
+                    self._gzipped[key] = data
+                    while len(self._gzipped) > 256:
+                        self._gzipped.popitem(last=False)
+        elif hasattr(response.response, "close"):
+            # The unread file is replaced by the cached body
+            response.response.close()
+        response.set_data(data)
+        response.headers["Content-Encoding"] = "gzip"
+        if etag and not weak:
+            # The compressed body is a different representation of the same resource
+            response.set_etag(etag, weak=True)
+        return response
+
+
+http_cache = HTTPCache()
+
+def bug_page_validators(bug, job=None):
+    """
+    Weak ETag and Last-Modified for pages showing ``bug`` to the current
+    user: the bug version, its latest analysis job state, the viewer and
+    the deployed templates and assets.
+    """
+    from flask_login import current_user
+
+    parts = [bug.id, bug.version, current_user.id, current_user.username, current_user.is_admin,
+             http_cache.build_id]
+    moments = [bug.updated_at or bug.created_at]
+    if job is not None:
+        parts += [job.id, job.status, job.attempts]
+        moments += [job.created_at, job.locked_at, job.finished_at]
+    etag = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    moments = [moment for moment in moments if moment is not None]
+    return etag, max(moments) if moments else None
+
+def has_pending_flashes():
+    """Flashed messages render once; a page that would show them must not answer 304."""
+    return bool(flask_session.get("_flashes"))
@@ -0,0 +1,308 @@
+# app/incremental.py
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from app.ai_engine import classify_description
+from app.rewrite_engine import ANY_RULE, DEFAULT_ENGINE, AppendRule, DuplicateIdRule, TokenRule, apply_edits
+
+ID_VALUE = re.compile(r'id="(.*?)"')
+COLON_NEWLINE = ":\n"
+
+# -------------------------
+# Per-line facts
+# -------------------------
+class LineFacts:
+    """Rule tokens and id values found on one line (scanned with its newline)."""
+
+    __slots__ = ("text", "tokens", "ids")
+
+    def __init__(self, text, scanner):
+        self.text = text
+        self.tokens = Counter()
+        for match in scanner.pattern.finditer(text + "\n"):
+            token = match.group(1)
+            self.tokens[token] += 1
+            for prefix in scanner.prefixes[token]:
+                self.tokens[prefix] += 1
+        # '.' never crosses a newline, so per-line matches equal whole-text matches
+        self.ids = ID_VALUE.findall(text)
+
+
+def _add(counter, items, sign):
+    for key, count in items:
+        total = counter.get(key, 0) + sign * count
+        if total > 0:
+            counter[key] = total
+        else:
+            counter.pop(key, None)
+
+# -------------------------
+# Line index
+# -------------------------
+class LineIndex:
+    """LineFacts for every line plus token and id counters over all of them."""
+
+    def __init__(self):
+        self.lines = []
+        self.tokens = Counter()
+        self.ids = Counter()
+        self.duplicates = set()
+
+    def splice(self, start, end, fresh):
+        """Replace lines[start:end] with the ``fresh`` LineFacts."""
+        for old in self.lines[start:end]:
+            _add(self.tokens, old.tokens.items(), -1)
+            self._count_ids(old.ids, -1)
+        for facts in fresh:
+            _add(self.tokens, facts.tokens.items(), 1)
+            self._count_ids(facts.ids, 1)
+        self.lines[start:end] = fresh
+
+    def _count_ids(self, values, sign):
+        for value in values:
+            total = self.ids.get(value, 0) + sign
+            if total > 0:
+                self.ids[value] = total
+            else:
+                self.ids.pop(value, None)
+            if total > 1:
+                self.duplicates.add(value)
+            else:
+                self.duplicates.discard(value)
+
+    def has(self, token):
+        return self.tokens.get(token, 0) > 0
+
+
+class RewrittenView(LineIndex):
+    """
+    The lines as a rule that runs after an engine flush sees them: each
+    line with the edits of the earlier passes applied. ``passes`` holds
+    the rules that had edits in each pass, as decided for the whole
+    document; a different decision needs a new view.
+    """
+
+    def __init__(self, engine, passes):
+        super().__init__()
+        self.engine = engine
+        self.passes = passes
+
+    def rewrite(self, text):
+        scanner = self.engine.scanner
+        for rules in self.passes:
+            scan = scanner.scan(text)
+            # No token spans a newline and none is removed, so each line rewrites on its
+            # own. Appends come after every flush that changes text; renames are left
+            # to firing_rules
+            edits = [
+                edit for rule in rules if not isinstance(rule, (AppendRule, DuplicateIdRule))
+                for edit in rule.edits(scan)
+            ]
+            if edits:
+                text = apply_edits(text, edits)
+        return text
+
+    def facts(self, texts):
+        return [LineFacts(self.rewrite(text), self.engine.scanner) for text in texts]
+
+# -------------------------
+# Document state
+# -------------------------
+class DocumentState(LineIndex):
+    """
+    Line-level analysis state for one editor document.
+    Edits splice lines and adjust aggregate counters for only those lines,
+    so an update costs O(changed lines), not O(document). Rules that run
+    after a flush are decided on a RewrittenView, since removing
+    'disabled' can join text into new tokens; views are updated the same
+    way and only rebuilt when the earlier rules' decisions change.
+    """
+
+    def __init__(self, engine=DEFAULT_ENGINE):
+        super().__init__()
+        self.engine = engine
+        self.version = 0
+        self.views = []
+        self.last_seen = time.monotonic()
+
+    def set_text(self, text, version):
+        LineIndex.__init__(self)
+        self.views = []
+        return self.replace_lines(0, 0, text.split("\n"), version)
+
+    def replace_lines(self, start, end, new_lines, version):
+        """Replace lines[start:end] with ``new_lines``; returns the new LineFacts."""
+        if not (0 <= start <= end <= len(self.lines)):
+            raise ValueError("Line range out of bounds")
+
+        if len(self.lines) - (end - start) + len(new_lines) == 0:
+            new_lines = [""]
+        fresh = [LineFacts(text, self.engine.scanner) for text in new_lines]
+        self.splice(start, end, fresh)
+        for view in self.views:
+            view.splice(start, end, view.facts(new_lines))
+        self.version = version
+        return fresh
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def has(self, token):
+        count = self.tokens.get(token, 0)
+        if token == COLON_NEWLINE and self.lines and self.lines[-1].text.endswith(":"):
+            # The last line was scanned with a newline it does not have
+            count -= 1
+        return count > 0
+
+    def _view(self, depth, passes):
+        if depth < len(self.views) and self.views[depth].passes == passes:
+            return self.views[depth]
+        view = RewrittenView(self.engine, passes)
+        view.splice(0, 0, view.facts(facts.text for facts in self.lines))
+        del self.views[depth:]
+        self.views.append(view)
+        return view
+
+    @staticmethod
+    def _renames_split_tokens(view, later_rules):
+        """
+        Whether renaming duplicate ids can break a later rule's token. A
+        rename inserts '_N' before a value's closing quote, which only
+        matters when that quote is part of a token: the value then ends
+        with the token's text up to one of its quotes.
+        """
+        prefixes = {
+            token[:i] for rule in later_rules for token in rule.tokens
+            for i, ch in enumerate(token) if ch == '"' and i
+        }
+        return any(value.endswith(prefix) for value in view.duplicates for prefix in prefixes)
+
+    def _renamed_scan(self, view, rule, fired):
+        # Rare, so the renames are replayed over the whole text
+        text = "\n".join(facts.text for facts in view.lines)
+        scanner = self.engine.scanner
+        edits, _ = rule.rewrite(scanner.scan(text), fired)
+        return scanner.scan(apply_edits(text, edits))
+
+    def firing_rules(self):
+        """Rules that would fire on the current text, in engine order."""
+        fired = []
+        names = set()
+        view = self
+        passes = ()
+        depth = 0
+        pending = []
+        for index, rule in enumerate(self.engine.rules):
+            # Mirrors RewriteEngine.apply: flush pending edits before a rule that must see them
+            if pending and (rule.fresh_after == ANY_RULE or {r.name for r in pending}.intersection(rule.fresh_after)):
+                passes += (tuple(pending),)
+                pending = []
+                if any(not isinstance(r, DuplicateIdRule) for r in passes[-1]):
+                    view = self._view(depth, passes)
+                    depth += 1
+                elif self._renames_split_tokens(view, self.engine.rules[index:]):
+                    view = self._renamed_scan(view, passes[-1][0], names)
+            if isinstance(rule, DuplicateIdRule):
+                if view.duplicates:
+                    fired.append(rule)
+                    names.add(rule.name)
+                    pending.append(rule)
+            elif isinstance(rule, TokenRule) and rule.applies(view, names):
+                fired.append(rule)
+                names.add(rule.name)
+                if isinstance(rule, AppendRule) or view.has(rule.token):
+                    pending.append(rule)
+        return fired
+
+    def line_issues(self, start, facts_list):
+        """Rule names triggered on each of the given lines (only lines with issues)."""
+        issues = []
+        for offset, facts in enumerate(facts_list):
+            rules = [
+                rule.name for rule in self.engine.rules
+                if isinstance(rule, TokenRule) and facts.tokens.get(rule.token)
+            ]
+            if any(value in self.duplicates for value in facts.ids):
+                rules.append(DuplicateIdRule.name)
+            if rules:
+                issues.append({"line": start + offset, "rules": rules})
+        return issues
+
+# -------------------------
+# Session store
+# -------------------------
+class VersionConflict(Exception):
+    """The client's base version does not match the server state; resend the full text."""
+
+
+class DocumentStore:
+    """Per-process map of (user, document id) to DocumentState with LRU and idle expiry."""
+
+    def __init__(self, max_documents=1000, idle_seconds=300):
+        self.max_documents = max_documents
+        self.idle_seconds = idle_seconds
+        self._docs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_documents = app.config.get("INCREMENTAL_MAX_DOCUMENTS", self.max_documents)
+        self.idle_seconds = app.config.get("INCREMENTAL_IDLE_SECONDS", self.idle_seconds)
+        app.extensions["document_store"] = self
+
+    def _expire(self, now):
+        while self._docs:
+            key, doc = next(iter(self._docs.items()))
+            if now - doc.last_seen <= self.idle_seconds and len(self._docs) <= self.max_documents:
+                break
+            del self._docs[key]
+
+    def apply(self, key, payload):
+        """
+        Apply one client update and return (document, changed_start, changed_facts).
+        ``payload`` carries ``version`` and either ``text`` (full sync) or
+        ``base_version`` with ``start``, ``end`` and ``lines`` (line splice).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            doc = self._docs.get(key)
+            if "text" in payload:
+                doc = doc or DocumentState()
+                self._docs[key] = doc
+                start, facts = 0, doc.set_text(payload["text"], payload["version"])
+            else:
+                if doc is None or doc.version != payload.get("base_version"):
+                    raise VersionConflict()
+                start = payload["start"]
+                facts = doc.replace_lines(start, payload["end"], payload["lines"], payload["version"])
+            doc.last_seen = now
+            self._docs.move_to_end(key)
+            return doc, start, facts
+
+    def discard(self, key):
+        with self._lock:
+            self._docs.pop(key, None)
+
+
+document_store = DocumentStore()
+
+def analyze_update(user_id, payload):
+    """Apply an editor update and summarise the document's analysis state."""
+    doc, start, facts = document_store.apply((user_id, payload["doc_id"]), payload)
+    rules = doc.firing_rules()
+    matches = classify_description(payload.get("description") or "")
+    return {
+        "doc_id": payload["doc_id"],
+        "version": doc.version,
+        "line_count": len(doc.lines),
+        "rules": [rule.name for rule in rules],
+        "notes": [
+            f"Duplicate IDs: {len(doc.duplicates)}" if isinstance(rule, DuplicateIdRule) else rule.note
+            for rule in rules
+        ],
+        "duplicate_ids": len(doc.duplicates),
+        "severity": matches["severity"],
+        "issues": doc.line_issues(start, facts),
+    }
@@ -0,0 +1,238 @@
+# app/jobs.py
+import os
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from app import db
+from app.models import AnalysisJob, Bug
+from app.analysis_cache import cached_analyze_and_fix_code
+from app.dedup import reuse_fix
+from app.rollups import bug_rollups
+
+# -------------------------
+# Enqueue
+# -------------------------
+def enqueue_analysis(bug, mark_fixed=False):
+    """
+    Add an analysis job for ``bug`` to the current session.
+    The caller commits, so the job lands in the same transaction as the bug.
+    """
+    job = AnalysisJob(
+        bug=bug,
+        mark_fixed=mark_fixed,
+        max_attempts=current_app.config.get("JOB_MAX_ATTEMPTS", 3),
+    )
+    db.session.add(job)
+    return job
+
+def latest_job_for(bug_id):
+    return (AnalysisJob.query.filter_by(bug_id=bug_id)
+            .order_by(AnalysisJob.id.desc()).first())
+
+# -------------------------
+# Claim and run
+# -------------------------
+def claim_next_job():
+    """
+    Atomically move one due job to 'running' and return it, or None.
+    Jobs stuck in 'running' past the lease are considered abandoned by a
+    crashed worker and are claimed again, unless they have used up their
+    attempts: a job that kills or hangs its worker every time is failed.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=current_app.config.get("JOB_LEASE_SECONDS", 300))
+    expired = db.and_(AnalysisJob.status == "running", AnalysisJob.locked_at < now - lease)
+    due = db.or_(
+        db.and_(AnalysisJob.status == "queued", AnalysisJob.run_after <= now),
+        expired,
+    )
+    while True:
+        candidate = db.session.execute(
+            db.select(AnalysisJob.id, AnalysisJob.status, AnalysisJob.attempts, AnalysisJob.max_attempts)
+            .where(due).order_by(AnalysisJob.run_after, AnalysisJob.id).limit(1)
+        ).first()
+        if candidate is None:
+            db.session.rollback()
+            return None
+        if candidate.status == "running" and candidate.attempts >= candidate.max_attempts:
+            db.session.execute(
+                db.update(AnalysisJob)
+                .where(AnalysisJob.id == candidate.id, expired)
+                .values(status="failed", finished_at=now,
+                        last_error=f"Worker lease expired on attempt {candidate.attempts} of {candidate.max_attempts}")
+            )
+            db.session.commit()
+            continue
+        claimed = db.session.execute(
+            db.update(AnalysisJob)
+            .where(AnalysisJob.id == candidate.id, AnalysisJob.status == candidate.status)
+            .values(status="running", locked_at=now, attempts=AnalysisJob.attempts + 1)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(AnalysisJob, candidate.id)
+        # Another worker won the race; try the next one
+
+def run_job(job):
+    try:
+        bug = db.session.get(Bug, job.bug_id)
+        if bug is not None and bug.original_code:
+            # Reuse the fix of an already analysed bug with identical code when there is one
+            reused = reuse_fix(bug)
+            if reused:
+                fixed_code, ai_notes = reused
+            else:
+                fixed_code, ai_notes, _ = cached_analyze_and_fix_code(bug.original_code, bug.description or "")
+            bug.fixed_code = fixed_code
+            bug.ai_notes = ai_notes
+            if job.mark_fixed:
+                bug.status = "Fixed"
+        job.status = "done"
+        job.last_error = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Analysis job {job.id} failed: {e}")
+        traceback.print_exc()
+        job = db.session.get(AnalysisJob, job.id)
+        job.last_error = str(e)
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+        else:
+            # Exponential backoff: 2s, 4s, 8s, ...
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=2 ** job.attempts)
+        db.session.commit()
+
+def work_once():
+    """Run a single due job. Returns False when the queue is empty."""
+    job = claim_next_job()
+    if job is None:
+        return False
+    run_job(job)
+    return True
+
+# -------------------------
+# Worker pool
+# -------------------------
+class JobWorkerPool:
+    """
+    Threads that drain the job table inside an app context.
+    Used in-process by web workers (started by the first request of each
+    process, so queued and retried jobs run without waiting for an
+    enqueue) and by the ``flask jobs work`` command.
+    """
+
+    def __init__(self):
+        self._threads = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def init_app(self, app):
+        size = app.config.get("JOB_INPROCESS_WORKERS", 1)
+        if size <= 0:
+            return
+
+        # Not at import: CLI commands and a preloading gunicorn master must not run jobs
+        @app.before_request
+        def _start_job_workers():
+            if self._pid != os.getpid():
+                self.start(app, size)
+
+    def start(self, app, size):
+        with self._lock:
+            # Threads do not survive a fork; each worker process runs its own
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._threads = []
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < size:
+                thread = threading.Thread(
+                    target=self._run, args=(app,), daemon=True,
+                    name=f"analysis-worker-{len(self._threads)}",
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self, app):
+        interval = app.config.get("JOB_POLL_INTERVAL", 1.0)
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    busy = work_once()
+                    if not busy:
+                        # Idle workers also fold old hourly rollups into days, at most once an interval
+                        bug_rollups.maybe_compact()
+                except Exception as e:
+                    print(f"Analysis worker error: {e}")
+                    db.session.rollback()
+                    busy = False
+                finally:
+                    db.session.remove()
+            if not busy:
+                self._wake.wait(interval)
+                self._wake.clear()
+
+
+worker_pool = JobWorkerPool()
+
+def wake_workers():
+    """Start in-process workers if configured and nudge them to poll now."""
+    size = current_app.config.get("JOB_INPROCESS_WORKERS", 1)
+    if size > 0:
+        worker_pool.start(current_app._get_current_object(), size)
+        worker_pool.notify()
+
+# -------------------------
+# CLI: flask jobs ...
+# -------------------------
+jobs_cli = AppGroup("jobs", help="Background analysis jobs.")
+
+@jobs_cli.command("work")
+@click.option("--workers", default=1, show_default=True, help="Worker threads to run.")
+@click.option("--once", is_flag=True, help="Drain the queue and exit.")
+@with_appcontext
+def work_command(workers, once):
+    """Process queued analysis jobs."""
+    if once:
+        count = 0
+        while work_once():
+            count += 1
+        click.echo(f"Processed {count} job(s).")
+        return
+    click.echo(f"Starting {workers} analysis worker(s). Press Ctrl+C to stop.")
+    worker_pool.start(current_app._get_current_object(), workers)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker_pool.stop()
+
+@jobs_cli.command("status")
+@with_appcontext
+def status_command():
+    """Show job counts by status."""
+    rows = db.session.execute(
+        db.select(AnalysisJob.status, db.func.count()).group_by(AnalysisJob.status)
+    ).all()
+    for status, count in rows:
+        click.echo(f"{status}: {count}")
@@ -0,0 +1,297 @@
+# app/metrics.py
+import bisect
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+
+# Request latency buckets in seconds; statement-count buckets for the SQL histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+RULE_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+# -------------------------
+# Metric types
+# -------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterMetric:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[tuple(labels)] += amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class HistogramMetric:
+    """Cumulative-bucket histogram; each label set keeps per-bucket counts, a sum and a count."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        labels = tuple(labels)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {count}"
+
+
+class GaugeCallback:
+    """Gauge read from a callable at scrape time, e.g. cache sizes."""
+
+    type = "gauge"
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        try:
+            value = self.read()
+        except Exception as e:
+            print(f"Metric {self.name} failed: {e}")
+            return
+        yield f"{self.name} {_number(value)}"
+
+# -------------------------
+# Instrumentation
+# -------------------------
+class Instrumentation:
+    """
+    Per-process request, SQL and rule metrics, rendered in the Prometheus
+    text format by /metrics.
+
+    Each request records its latency by endpoint, how many SQL statements
+    it ran and how long they took. A statement repeated at least
+    N_PLUS_ONE_THRESHOLD times in one request is counted as a likely N+1.
+    Requests slower than SLOW_REQUEST_MS are logged with their SQL summary.
+    Metrics are kept per process; with several gunicorn workers each
+    scrape sees the worker that served it.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_request_ms = 0
+        self.n_plus_one_threshold = 10
+        self.request_latency = HistogramMetric(
+            "http_request_duration_seconds", "Request latency by endpoint.",
+            ("endpoint", "method", "status"),
+        )
+        self.request_sql_count = HistogramMetric(
+            "http_request_sql_statements", "SQL statements run per request.",
+            ("endpoint",), SQL_COUNT_BUCKETS,
+        )
+        self.request_sql_time = HistogramMetric(
+            "http_request_sql_duration_seconds", "Time spent in SQL per request.",
+            ("endpoint",),
+        )
+        self.n_plus_one = CounterMetric(
+            "http_request_n_plus_one_total", "Requests repeating one SQL statement past the threshold.",
+            ("endpoint",),
+        )
+        self.slow_requests = CounterMetric(
+            "http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS.", ("endpoint",),
+        )
+        self.rule_time = HistogramMetric(
+            "ai_engine_rule_duration_seconds", "Time per rewrite rule application.",
+            ("rule",), RULE_BUCKETS,
+        )
+        self.metrics = [
+            self.request_latency, self.request_sql_count, self.request_sql_time,
+            self.n_plus_one, self.slow_requests, self.rule_time,
+        ]
+
+    def init_app(self, app):
+        self.enabled = bool(app.config.get("METRICS_ENABLED", True))
+        if not self.enabled:
+            return
+        self.slow_request_ms = app.config.get("SLOW_REQUEST_MS", self.slow_request_ms)
+        self.n_plus_one_threshold = app.config.get("N_PLUS_ONE_THRESHOLD", self.n_plus_one_threshold)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+                event.listen(engine, "handle_error", _handle_cursor_error)
+
+        if app.config.get("METRICS_RULE_TIMINGS", True):
+            from app.rewrite_engine import DEFAULT_ENGINE
+            DEFAULT_ENGINE.rule_timer = lambda name, seconds: self.rule_time.observe((name,), seconds)
+
+        self._register_cache_gauges()
+        app.extensions["metrics"] = self
+
+    def _register_cache_gauges(self):
+        from app.access import access_cache
+        from app.ai_engine import bug_history
+        from app.analysis_cache import analysis_cache
+        from app.passwords import password_hasher
+        from app.user_cache import user_cache
+
+        known = {metric.name for metric in self.metrics}
+        gauges = [
+            ("analysis_cache_hit_rate", "Analysis cache hit rate.", lambda: analysis_cache.stats()["hit_rate"]),
+            ("analysis_cache_bytes", "Analysis cache memory use.", lambda: analysis_cache.stats()["bytes"]),
+            ("bug_log_records", "Records in the in-memory bug log.", lambda: len(bug_history)),
+            ("user_cache_hit_rate", "Flask-Login user cache hit rate.", lambda: user_cache.stats()["hit_rate"]),
+            ("user_cache_entries", "Flask-Login user cache entries.", lambda: user_cache.stats()["entries"]),
+            ("access_cache_hit_rate", "Visible project set cache hit rate.", lambda: access_cache.stats()["hit_rate"]),
+            ("password_hash_rejected", "Logins rejected by a saturated hashing pool.",
+             lambda: password_hasher.rejected),
+        ]
+        for name, help, read in gauges:
+            if name not in known:
+                self.metrics.append(GaugeCallback(name, help, read))
+
+    # -------------------------
+    # Request hooks
+    # -------------------------
+    def _before_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_sql = RequestSQL()
+
+    def _after_request(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        started = g.pop("_metrics_started", None)
+        sql = g.pop("_metrics_sql", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        status = g.pop("_metrics_status", 500)
+
+        self.request_latency.observe((endpoint, request.method, str(status)), elapsed)
+        self.request_sql_count.observe((endpoint,), sql.count)
+        self.request_sql_time.observe((endpoint,), sql.seconds)
+
+        repeated, repeats = sql.most_repeated()
+        n_plus_one = repeats >= self.n_plus_one_threshold
+        if n_plus_one:
+            self.n_plus_one.inc((endpoint,))
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            self.slow_requests.inc((endpoint,))
+            message = (
+                f"Slow request: {request.method} {request.path} -> {status} in {elapsed * 1000:.0f}ms "
+                f"({sql.count} SQL statements, {sql.seconds * 1000:.0f}ms in SQL)"
+            )
+            if n_plus_one:
+                message += f"; possible N+1, {repeats}x: {' '.join(repeated.split())[:200]}"
+            current_app.logger.warning(message)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RequestSQL:
+    """SQL statements run during one request."""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_metrics_query_start")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    if has_request_context():
+        sql = g.get("_metrics_sql")
+        if sql is not None:
+            # Statements are parameterized, so one text per query shape
+            sql.record(statement, elapsed)
+
+def _handle_cursor_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.connection is not None and context.execution_context is not None:
+        stack = context.connection.info.get("_metrics_query_start")
+        if stack:
+            stack.pop()
+
+
+metrics = Instrumentation()
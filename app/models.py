@@ -1,6 +1,5 @@
 from . import db
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
 # ==========================
@@ -15,11 +14,22 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(50), default="User")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @property
+    def is_admin(self):
+        return self.role == "Admin"
+
+    # Hashing runs on a bounded pool and may raise PasswordHashingBusy (see app/passwords.py)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.passwords import password_hasher
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.passwords import password_hasher
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        from app.passwords import password_hasher
+        return password_hasher.needs_rehash(self.password_hash)
 
 
 # ==========================
@@ -27,7 +37,7 @@ class User(UserMixin, db.Model):
 # ==========================
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(150), nullable=False)
+    name = db.Column(db.String(150), nullable=False, index=True)  # project pickers sort by name
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -45,17 +55,51 @@ class Bug(db.Model):
     description = db.Column(db.Text)
     severity = db.Column(db.String(50), default="Medium")
     status = db.Column(db.String(50), default="Open")
-    original_code = db.Column(db.Text)
-    fixed_code = db.Column(db.Text)
+    # Code bodies live in code_blob (see app/code_store.py); use original_code / fixed_code
+    original_code_hash = db.Column(db.String(64), db.ForeignKey('code_blob.hash'), index=True)
+    fixed_code_hash = db.Column(db.String(64), db.ForeignKey('code_blob.hash'), index=True)
     ai_notes = db.Column(db.Text)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every change to the bug (see app/http_cache.py); feeds ETag / Last-Modified
+    version = db.Column(db.Integer, default=1, server_default="1", nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Keyset indexes for the bug list: sort on (created_at, id), filter on a leading column
+    __table_args__ = (
+        db.Index('ix_bug_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bug_created_by_created_at', 'created_by', 'created_at', 'id'),
+        db.Index('ix_bug_status_created_at', 'status', 'created_at', 'id'),
+        db.Index('ix_bug_severity_created_at', 'severity', 'created_at', 'id'),
+        db.Index('ix_bug_project_created_at', 'project_id', 'created_at', 'id'),
+    )
 
     # Relationships
     histories = db.relationship('BugHistory', backref='bug', lazy=True)
     comments = db.relationship('Comment', backref='bug', lazy=True)
 
+    @property
+    def original_code(self):
+        from app.code_store import code_store
+        return code_store.get(self.original_code_hash)
+
+    @original_code.setter
+    def original_code(self, text):
+        from app.code_store import code_store
+        self.original_code_hash = code_store.put(text)
+
+    @property
+    def fixed_code(self):
+        from app.code_store import code_store
+        return code_store.get(self.fixed_code_hash)
+
+    @fixed_code.setter
+    def fixed_code(self, text):
+        # Stored as a delta against the original when that is smaller
+        from app.code_store import code_store
+        self.fixed_code_hash = code_store.put(text, base_hash=self.original_code_hash)
+
 
 # ==========================
 # Bug History Model
@@ -67,6 +111,11 @@ class BugHistory(db.Model):
     new_status = db.Column(db.String(50))
     changed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # A bug's history in time order (Bug.histories and timelines)
+    __table_args__ = (
+        db.Index('ix_bug_history_bug_id_changed_at', 'bug_id', 'changed_at', 'id'),
+    )
+
 
 # ==========================
 # Comment Model
@@ -78,6 +127,42 @@ class Comment(db.Model):
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # A bug's comments in time order (Bug.comments)
+    __table_args__ = (
+        db.Index('ix_comment_bug_id_created_at', 'bug_id', 'created_at', 'id'),
+    )
+
+
+# ==========================
+# Bug Activity Log
+# ==========================
+class BugActivity(db.Model):
+    """One change to a bug. Rows are only ever inserted (see app/activity.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    bug_id = db.Column(db.Integer, db.ForeignKey('bug.id'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # status, severity, project, ai_fix, comment
+    old_value = db.Column(db.String(64))             # None on the status row written when the bug is reported
+    new_value = db.Column(db.String(64))
+    actor_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # None for workers and CLI commands
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Per-bug timelines, and per-kind scans already in (bug, time) order for the window queries
+    __table_args__ = (
+        db.Index('ix_bug_activity_bug_id_created_at', 'bug_id', 'created_at', 'id'),
+        db.Index('ix_bug_activity_kind_bug_id_created_at', 'kind', 'bug_id', 'created_at', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "bug_id": self.bug_id,
+            "kind": self.kind,
+            "old_value": self.old_value,
+            "new_value": self.new_value,
+            "actor_id": self.actor_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
 
 # ==========================
 # Team Model
@@ -85,7 +170,7 @@ class Comment(db.Model):
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
 
     # Many-to-Many relationship with Users
     members = db.relationship('User', secondary='team_members', backref='teams')
@@ -94,6 +179,132 @@ class Team(db.Model):
 # Association table for Team Members
 team_members = db.Table('team_members',
     db.Column('team_id', db.Integer, db.ForeignKey('team.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    # The primary key leads with team_id; access checks look teams up by user
+    db.Index('ix_team_members_user_id', 'user_id', 'team_id')
 )
 
+
+
+# ==========================
+# Analysis Job Model
+# ==========================
+class AnalysisJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    bug_id = db.Column(db.Integer, db.ForeignKey('bug.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), default="queued", nullable=False)  # queued, running, done, failed
+    mark_fixed = db.Column(db.Boolean, default=False, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=3, nullable=False)
+    last_error = db.Column(db.Text)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_analysis_job_status_run_after', 'status', 'run_after'),
+    )
+
+    bug = db.relationship('Bug', backref=db.backref('analysis_jobs', lazy='dynamic'))
+
+
+# ==========================
+# Batch Run Model
+# ==========================
+class BatchRun(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), default="reanalyze", nullable=False)
+    status = db.Column(db.String(20), default="running", nullable=False)  # running, done, failed
+    last_id = db.Column(db.Integer, default=0, nullable=False)  # checkpoint for resume
+    processed = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "last_id": self.last_id,
+            "processed": self.processed,
+            "total": self.total,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# ==========================
+# Bug Statistics Model
+# ==========================
+class BugStat(db.Model):
+    """Materialized bug counters, maintained in the same transaction as Bug writes."""
+    scope = db.Column(db.String(40), primary_key=True)      # "global" or "project:<id>"
+    dimension = db.Column(db.String(20), primary_key=True)  # total, status, severity, projects
+    value = db.Column(db.String(50), primary_key=True, default="")
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# ==========================
+# Bug Trend Rollups
+# ==========================
+class BugRollup(db.Model):
+    """Bugs opened and fixed per time bucket, maintained in the same transaction as Bug writes."""
+    # Clustered on the primary key so a trend query reads one contiguous range
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    grain = db.Column(db.String(4), primary_key=True)       # hour, folded into day by compaction
+    bucket = db.Column(db.DateTime, primary_key=True)       # bucket start (UTC)
+    project_id = db.Column(db.Integer, primary_key=True, autoincrement=False, default=0)  # 0 = no project
+    severity = db.Column(db.String(50), primary_key=True, default="")
+    category = db.Column(db.String(50), primary_key=True, default="")  # ai_engine.detect_category
+    opened = db.Column(db.Integer, nullable=False, default=0)
+    fixed = db.Column(db.Integer, nullable=False, default=0)
+
+
+# ==========================
+# Duplicate Detection Models
+# ==========================
+class BugSignature(db.Model):
+    """MinHash signature of a bug's description and code (see app/dedup.py)."""
+    bug_id = db.Column(db.Integer, db.ForeignKey('bug.id'), primary_key=True)
+    minhash = db.Column(db.LargeBinary, nullable=False)
+    code_hash = db.Column(db.String(64), index=True)  # exact code + rule-set version, for fix reuse
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class BugLSHBand(db.Model):
+    """One LSH band bucket per signature band; bugs sharing a bucket are duplicate candidates."""
+    band_key = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    bug_id = db.Column(db.Integer, db.ForeignKey('bug.id'), primary_key=True, index=True)
+
+
+# ==========================
+# Code Blob Model
+# ==========================
+class CodeBlob(db.Model):
+    """Content-addressed code text, compressed or stored as a delta (see app/code_store.py)."""
+    hash = db.Column(db.String(64), primary_key=True)  # SHA-256 of the text
+    codec = db.Column(db.String(10), nullable=False)   # raw, zlib or delta
+    data = db.Column(db.LargeBinary, nullable=False)
+    base_hash = db.Column(db.String(64), db.ForeignKey('code_blob.hash'))  # delta base
+    size = db.Column(db.Integer, nullable=False)       # length of the text
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ==========================
+# Live Event Model
+# ==========================
+class LiveEvent(db.Model):
+    """Change notifications shared between worker processes (see app/events.py); pruned after minutes."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)     # bug.created, bug.updated, comment.created, ...
+    bug_id = db.Column(db.Integer)                      # no foreign key: deleted bugs still notify
+    payload = db.Column(db.Text, nullable=False)        # JSON sent to subscribers
+    origin = db.Column(db.String(48))                   # publishing process, which dispatches its own events
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
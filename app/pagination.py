@@ -0,0 +1,50 @@
+# app/pagination.py
+import base64
+from datetime import datetime
+
+from app import db
+
+# -------------------------
+# Keyset (cursor) pagination on (created_at, id)
+# -------------------------
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor string, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        stamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(stamp), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def keyset_page(query, created_col, id_col, cursor=None, limit=50, newest_first=True):
+    """
+    Apply a (created_at, id) keyset window to ``query`` and run it.
+    Returns (rows, next_cursor); rows must expose ``created_at`` and ``id``.
+    One extra row is fetched to know whether another page exists.
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        stamp, row_id = position
+        if newest_first:
+            query = query.where(db.tuple_(created_col, id_col) < (stamp, row_id))
+        else:
+            query = query.where(db.tuple_(created_col, id_col) > (stamp, row_id))
+
+    if newest_first:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,120 @@
+# app/passwords.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should answer 503."""
+
+
+# -------------------------
+# Hashing policy with a bounded executor
+# -------------------------
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with the configured werkzeug method
+    (algorithm and cost, e.g. ``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``).
+
+    Key derivation runs on a small thread pool (hashlib's scrypt and pbkdf2
+    release the GIL). At most ``workers + queue_depth`` calls may be running
+    or waiting per process; beyond that calls fail fast with
+    PasswordHashingBusy instead of tying up every request worker on KDF CPU.
+    """
+
+    def __init__(self, method="scrypt", salt_length=16, workers=None, queue_depth=16, timeout=10.0):
+        self.workers = workers or os.cpu_count() or 2
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.salt_length = salt_length
+        self._set_method(method)
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.salt_length = app.config.get("PASSWORD_SALT_LENGTH", self.salt_length)
+        self._set_method(app.config.get("PASSWORD_HASH_METHOD", self.method))
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS") or self.workers
+        self.queue_depth = app.config.get("PASSWORD_HASH_QUEUE", self.queue_depth)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", self.timeout)
+        with self._lock:
+            self._shutdown()
+        app.extensions["password_hasher"] = self
+
+    def _set_method(self, method):
+        self.method = method
+        self._method_prefix = None
+
+    @property
+    def method_prefix(self):
+        # werkzeug fills in default costs ("scrypt" -> "scrypt:32768:8:1");
+        # hash once so needs_rehash() compares against the full parameter string
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash("", method=self.method, salt_length=1).split("$", 1)[0]
+        return self._method_prefix
+
+    # -------------------------
+    # Executor
+    # -------------------------
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            # Threads do not survive fork (e.g. gunicorn --preload); start a pool per process
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                self._executor_pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+            executor, slots = self._executor, self._slots
+
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashingBusy("Password hashing is saturated")
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHashingBusy("Password hashing timed out") from None
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._submit(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with another algorithm or cost."""
+        return bool(password_hash) and password_hash.split("$", 1)[0] != self.method_prefix
+
+    def stats(self):
+        method = self.method_prefix
+        with self._lock:
+            return {
+                "method": method,
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,342 @@
+# app/rewrite_engine.py
+import abc
+import heapq
+import re
+import time
+from collections import defaultdict
+
+# -------------------------
+# Token scanning
+# -------------------------
+def trie_pattern(words):
+    """Build a regex alternation factored like a trie over ``words``."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+        return "(?:%s)?" % body if "" in node else body
+
+    return build(trie)
+
+
+class TokenScanner:
+    """Compiled lookahead pattern that reports every occurrence of every token."""
+
+    def __init__(self, tokens):
+        self.tokens = list(dict.fromkeys(tokens))
+        self.pattern = re.compile("(?=(%s))" % trie_pattern(self.tokens))
+        self.prefixes = {
+            t: [p for p in self.tokens if p != t and t.startswith(p)]
+            for t in self.tokens
+        }
+
+    def scan(self, text):
+        return TokenScan(text, self)
+
+
+class TokenScan:
+    """Offsets of all token occurrences in one text, collected in a single pass."""
+
+    def __init__(self, text, scanner):
+        self.text = text
+        self.positions = defaultdict(list)
+        for match in scanner.pattern.finditer(text):
+            start = match.start()
+            token = match.group(1)
+            self.positions[token].append(start)
+            for prefix in scanner.prefixes[token]:
+                self.positions[prefix].append(start)
+
+    def has(self, token):
+        return bool(self.positions.get(token))
+
+    def spans(self, token):
+        """Leftmost non-overlapping occurrences, as ``str.replace`` finds them."""
+        result = []
+        end = 0
+        for start in self.positions.get(token, ()):
+            if start >= end:
+                result.append(start)
+                end = start + len(token)
+        return result
+
+# -------------------------
+# Rules
+# -------------------------
+ANY_RULE = "*"
+
+class RewriteRule(abc.ABC):
+    """
+    One ordered step of the auto-fix pipeline.
+
+    ``rewrite(scan, fired)`` returns ``(edits, notes)`` or None when the rule
+    does not apply. Edits are ``(start, end, replacement, rank)`` spans against
+    ``scan.text``, which is the snippet as of the engine's last flush. A rule
+    whose view would be changed by an earlier rule's pending edits names that
+    rule in ``fresh_after`` (or uses ANY_RULE) and the engine flushes first.
+    """
+
+    name = ""
+    tokens = ()
+    fresh_after = ()
+    rank = 0
+
+    @abc.abstractmethod
+    def rewrite(self, scan, fired):
+        """Return ``(edits, notes)``, or None when the rule does not apply."""
+
+    def signature(self):
+        """Class name and parameters, so a change to either changes RULESET_VERSION."""
+        params = {"name": self.name, "tokens": self.tokens, "fresh_after": self.fresh_after, "rank": self.rank}
+        params.update(vars(self))
+        return type(self).__name__, sorted(params.items())
+
+
+class TokenRule(RewriteRule):
+    """Base for rules triggered by a literal token, unless another token is present."""
+
+    def __init__(self, name, token, note, unless=None, unless_fired=(), also_fired=(),
+                 fresh_after=(), rank=0):
+        self.name = name
+        self.token = token
+        self.note = note
+        self.unless = unless
+        self.unless_fired = tuple(unless_fired)
+        self.also_fired = tuple(also_fired)
+        self.fresh_after = fresh_after
+        self.rank = rank
+        self.tokens = (token, unless) if unless else (token,)
+
+    def applies(self, scan, fired):
+        if not (scan.has(self.token) or any(n in fired for n in self.also_fired)):
+            return False
+        if self.unless and scan.has(self.unless):
+            return False
+        return not any(n in fired for n in self.unless_fired)
+
+    def rewrite(self, scan, fired):
+        if not self.applies(scan, fired):
+            return None
+        return self.edits(scan), [self.note]
+
+    def edits(self, scan):
+        return [self.edit_at(p) for p in scan.spans(self.token)]
+
+
+class ReplaceRule(TokenRule):
+    """Replace every occurrence of the token, like ``str.replace``."""
+
+    def __init__(self, name, token, replacement, note, **kwargs):
+        super().__init__(name, token, note, **kwargs)
+        self.replacement = replacement
+
+    def edit_at(self, p):
+        return (p, p + len(self.token), self.replacement, self.rank)
+
+
+class InsertAfterRule(TokenRule):
+    """Insert text right after every occurrence of the token."""
+
+    def __init__(self, name, token, insertion, note, **kwargs):
+        super().__init__(name, token, note, **kwargs)
+        self.insertion = insertion
+
+    def edit_at(self, p):
+        end = p + len(self.token)
+        return (end, end, self.insertion, self.rank)
+
+
+class AppendRule(TokenRule):
+    """Append text once at the end of the snippet."""
+
+    def __init__(self, name, token, suffix, note, **kwargs):
+        super().__init__(name, token, note, **kwargs)
+        self.suffix = suffix
+
+    def edit_at(self, end):
+        return (end, end, self.suffix, self.rank)
+
+    def edits(self, scan):
+        return [self.edit_at(len(scan.text))]
+
+
+class DuplicateIdRule(RewriteRule):
+    """
+    Rename repeated ``id="..."`` values exactly as the original loop did:
+    the i-th value, if already seen, renames the leftmost remaining
+    occurrence of that id to ``{id}_{i}``. Occurrences are tracked in
+    per-name heaps, so each rename is O(log n) instead of a rescan.
+    """
+
+    name = "duplicate_ids"
+    tokens = ('id="',)
+    fresh_after = ANY_RULE
+
+    def _values(self, text, positions):
+        # Same matches as re.findall(r'id="(.*?)"', text)
+        values = []
+        resume = 0
+        for p in positions:
+            if p < resume:
+                continue
+            q = text.find('"', p + 4)
+            if q == -1:
+                break
+            newline = text.find("\n", p + 4, q)
+            if newline != -1:
+                resume = newline - 3
+                continue
+            values.append((p, q))
+            resume = q + 1
+        return values
+
+    def rewrite(self, scan, fired):
+        text = scan.text
+        values = self._values(text, scan.positions.get('id="', ()))
+        if not values:
+            return None
+        if any(text.endswith("id=", p + 4, q) for p, q in values):
+            # A value ending in 'id=' overlaps the next attribute; replay literally
+            return self._sequential(text, [text[p + 4:q] for p, q in values])
+
+        renamed, notes = self.plan([text[p + 4:q] for p, q in values])
+        edits = [(values[i][0] + 4, values[i][1], new_name, self.rank) for i, new_name in renamed.items()]
+        return edits, notes
+
+    def plan(self, names):
+        """Map match index -> final id for the given id values, plus notes."""
+        occurrences = defaultdict(list)
+        for index, name in enumerate(names):
+            occurrences[name].append(index)
+
+        renamed = {}
+        notes = []
+        seen = set()
+        for i, name in enumerate(names):
+            if name in seen:
+                new_name = f"{name}_{i}"
+                heap = occurrences[name]
+                if heap:
+                    index = heapq.heappop(heap)
+                    renamed[index] = new_name
+                    heapq.heappush(occurrences[new_name], index)
+                notes.append(f"Fixed duplicate button ID: {name} → {new_name}")
+            seen.add(name)
+        return renamed, notes
+
+    def _sequential(self, text, ids):
+        notes = []
+        seen = set()
+        code = text
+        for i, id_name in enumerate(ids):
+            if id_name in seen:
+                new_id = f"{id_name}_{i}"
+                code = code.replace(f'id="{id_name}"', f'id="{new_id}"', 1)
+                notes.append(f"Fixed duplicate button ID: {id_name} → {new_id}")
+            seen.add(id_name)
+        return [(0, len(text), code, self.rank)], notes
+
+# -------------------------
+# Engine
+# -------------------------
+def apply_edits(text, edits):
+    """Apply non-overlapping edits in one join; ties at an offset go by rank."""
+    edits.sort(key=lambda e: (e[0], e[3]))
+    parts = []
+    pos = 0
+    for start, end, replacement, _ in edits:
+        parts.append(text[pos:start])
+        parts.append(replacement)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+class RewriteEngine:
+    """
+    Runs ordered rules over a snippet, collecting their edits as spans.
+    Rules share one token scan and one join per pass; a new pass starts only
+    when a rule has to observe pending edits (see ``RewriteRule.fresh_after``).
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.scanner = TokenScanner(t for rule in self.rules for t in rule.tokens)
+        # Optional callable(rule_name, seconds) for timing each rule (see app/metrics.py)
+        self.rule_timer = None
+
+    def apply(self, text):
+        notes = []
+        fired = set()
+        pending = []
+        pending_rules = set()
+        scan = None
+        timer = self.rule_timer
+
+        for rule in self.rules:
+            if pending and (rule.fresh_after == ANY_RULE or pending_rules.intersection(rule.fresh_after)):
+                text = apply_edits(text, pending)
+                pending, pending_rules, scan = [], set(), None
+            if scan is None:
+                scan = self.scanner.scan(text)
+
+            if timer is None:
+                result = rule.rewrite(scan, fired)
+            else:
+                started = time.perf_counter()
+                result = rule.rewrite(scan, fired)
+                timer(rule.name, time.perf_counter() - started)
+            if result is None:
+                continue
+            edits, rule_notes = result
+            fired.add(rule.name)
+            notes.extend(rule_notes)
+            if edits:
+                pending.extend(edits)
+                pending_rules.add(rule.name)
+
+        if pending:
+            text = apply_edits(text, pending)
+        return text, notes
+
+# -------------------------
+# Default auto-fix rules (order matters)
+# -------------------------
+DEFAULT_RULES = [
+    # Python code auto-fixes
+    ReplaceRule("todo_placeholder", "TODO_BUG", "FIXED_PART", "Replaced TODO_BUG with FIXED_PART"),
+    ReplaceRule("print_format", "print(", "print (", "Fixed print formatting", unless="print ("),
+    ReplaceRule("if_format", "if ", "if:\n    ", "Fixed if statement formatting", unless=":\n"),
+    # if_format inserts ':\n', which suppresses the for-loop rule
+    ReplaceRule("for_format", "for ", "for:\n    ", "Fixed for loop formatting", unless=":\n",
+                unless_fired=("if_format",)),
+
+    # Frontend button/HTML fixes
+    InsertAfterRule("button_onclick", "<button", ' onclick="defaultClick()"', "Added default onclick handler",
+                    unless="onclick", rank=-1),
+    # Removing 'disabled' can join text into new tokens, so later rules rescan
+    ReplaceRule("enable_buttons", "disabled", "", "Enabled button automatically"),
+    InsertAfterRule("button_tooltip", "<button", ' title="Click me"', "Added tooltip to button",
+                    unless="title=", fresh_after=("enable_buttons",), rank=-2),
+    DuplicateIdRule(),
+
+    # Modal and form fixes
+    AppendRule("modal_close", '<div class="modal"', "\n<!-- Added close button -->", "Added close button to modal",
+               unless="close", fresh_after=("enable_buttons", "duplicate_ids")),
+    AppendRule("form_submit", "<form", '\n<input type="submit" value="Submit">', "Added submit button to form",
+               unless="submit", fresh_after=("enable_buttons", "duplicate_ids")),
+    # The submit input appended above counts as 'input'
+    AppendRule("input_validation", "input", "\n<!-- Added basic input validation -->",
+               "Added input validation to form fields", unless="pattern", also_fired=("form_submit",),
+               fresh_after=("enable_buttons", "duplicate_ids")),
+]
+
+DEFAULT_ENGINE = RewriteEngine(DEFAULT_RULES)
@@ -0,0 +1,447 @@
+# app/rollups.py
+import math
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.activity import RESOLVED
+from app.ai_engine import detect_category
+from app.models import Bug, BugActivity, BugRollup, Project
+from app.stats import committed_value
+
+# Bucket width in days, per interval a trend query can ask for
+INTERVALS = {"hour": 1 / 24, "day": 1, "week": 7}
+DIMENSIONS = {"project": BugRollup.project_id, "severity": BugRollup.severity, "category": BugRollup.category}
+MAX_BUCKETS = 10000
+
+def hour_of(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def day_of(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _default(column):
+    default = Bug.__table__.c[column].default
+    return default.arg if default is not None else None
+
+def _key(moment, project_id, severity, description):
+    return (hour_of(moment), project_id or 0, severity or "", detect_category(description or ""))
+
+# -------------------------
+# Flush-time maintenance
+# -------------------------
+def _collect_rollups(session, flush_context, instances):
+    deltas = session.info.setdefault("bug_rollup_deltas", Counter())
+    now = datetime.utcnow()
+
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Bug):
+                key = _key(obj.created_at or now, obj.project_id, obj.severity or _default("severity"),
+                           obj.description)
+                deltas[key + ("opened",)] += 1
+                if (obj.status or _default("status")) in RESOLVED:
+                    deltas[key + ("fixed",)] += 1
+
+        for obj in session.dirty:
+            if not isinstance(obj, Bug) or obj in session.deleted:
+                continue
+            if not inspect(obj).attrs.status.history.has_changes():
+                continue
+            # A fix is counted when it happens, under the bug's project and severity at that time
+            if obj.status in RESOLVED and committed_value(obj, "status") not in RESOLVED:
+                deltas[_key(now, obj.project_id, obj.severity, obj.description) + ("fixed",)] += 1
+
+def _rows(grain, deltas):
+    rows = {}
+    for (bucket, project_id, severity, category, metric), count in deltas.items():
+        if not count:
+            continue
+        row = rows.setdefault((bucket, project_id, severity, category), {
+            "grain": grain, "bucket": bucket, "project_id": project_id, "severity": severity,
+            "category": category, "opened": 0, "fixed": 0,
+        })
+        row[metric] += count
+    return list(rows.values())
+
+def _apply_rollups(session, flush_context):
+    rows = _rows("hour", session.info.pop("bug_rollup_deltas", None) or {})
+    if rows:
+        upsert_rollups(session.connection(), rows)
+        session.info["bug_rollups_changed"] = True
+
+def upsert_rollups(connection, rows):
+    """Upsert ``opened / fixed += delta`` for each row in one executemany."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = BugRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.grain, table.c.bucket, table.c.project_id, table.c.severity, table.c.category],
+        set_={"opened": table.c.opened + stmt.excluded.opened, "fixed": table.c.fixed + stmt.excluded.fixed},
+    )
+    connection.execute(stmt, rows)
+
+def rollup_inserted_bugs(session, bugs):
+    """
+    Count bugs inserted with Core statements, which bypass the flush
+    hooks. ``bugs`` are (created_at, project_id, status, severity,
+    description) tuples.
+    """
+    deltas = Counter()
+    now = datetime.utcnow()
+    for created_at, project_id, status, severity, description in bugs:
+        key = _key(created_at or now, project_id, severity or _default("severity"), description)
+        deltas[key + ("opened",)] += 1
+        if (status or _default("status")) in RESOLVED:
+            deltas[key + ("fixed",)] += 1
+    rows = _rows("hour", deltas)
+    if rows:
+        upsert_rollups(session.connection(), rows)
+        session.info["bug_rollups_changed"] = True
+
+def _after_commit(session):
+    if session.info.pop("bug_rollups_changed", False):
+        bug_rollups.invalidate()
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("bug_rollup_deltas", None)
+    session.info.pop("bug_rollups_changed", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_rollups),
+    ("after_flush", _apply_rollups),
+    ("after_commit", _after_commit),
+    ("after_soft_rollback", _after_rollback),
+)
+
+# -------------------------
+# Compaction
+# -------------------------
+def compact_rollups(older_than=timedelta(hours=48)):
+    """
+    Fold the hourly rows of every day that ended before ``older_than``
+    ago into daily rows, one transaction per day. The hourly rows are
+    claimed with DELETE ... RETURNING, so concurrent compactions never
+    count a row twice. Returns the number of hourly rows folded.
+    """
+    table = BugRollup.__table__
+    cutoff = day_of(datetime.utcnow() - older_than)
+    folded = 0
+    while True:
+        first = db.session.execute(
+            db.select(db.func.min(BugRollup.bucket)).where(BugRollup.grain == "hour", BugRollup.bucket < cutoff)
+        ).scalar()
+        if first is None:
+            return folded
+        day = day_of(first)
+        claimed = db.session.execute(
+            db.delete(table)
+            .where(table.c.grain == "hour", table.c.bucket >= day, table.c.bucket < day + timedelta(days=1))
+            .returning(table.c.project_id, table.c.severity, table.c.category, table.c.opened, table.c.fixed)
+        ).all()
+        deltas = Counter()
+        for project_id, severity, category, opened, fixed in claimed:
+            deltas[(day, project_id, severity, category, "opened")] += opened
+            deltas[(day, project_id, severity, category, "fixed")] += fixed
+        rows = _rows("day", deltas)
+        if rows:
+            upsert_rollups(db.session.connection(), rows)
+        db.session.info["bug_rollups_changed"] = True
+        db.session.commit()
+        folded += len(claimed)
+
+def rebuild_rollups(hourly=timedelta(hours=48), chunk_size=5000):
+    """
+    Recalculate every rollup: bugs opened from the bug table, fixes from
+    the activity log. Buckets older than ``hourly`` are written as daily
+    rows directly. Runs in one transaction.
+    """
+    cutoff = day_of(datetime.utcnow() - hourly)
+    deltas = Counter()
+    categories = {}
+
+    def bucket(moment):
+        return hour_of(moment) if moment >= cutoff else day_of(moment)
+
+    last_id = 0
+    while True:
+        bugs = db.session.execute(
+            db.select(Bug.id, Bug.created_at, Bug.project_id, Bug.status, Bug.severity, Bug.description)
+            .where(Bug.id > last_id).order_by(Bug.id).limit(chunk_size)
+        ).all()
+        if not bugs:
+            break
+        for bug in bugs:
+            categories[bug.id] = category = detect_category(bug.description or "")
+            deltas[(bucket(bug.created_at or datetime.utcnow()), bug.project_id or 0, bug.severity or "",
+                    category, "opened")] += 1
+        last_id = bugs[-1].id
+
+    # Same transitions mttr() counts: into a resolved status from an unresolved one
+    fixes = db.session.execute(
+        db.select(BugActivity.bug_id, BugActivity.created_at, Bug.project_id, Bug.severity)
+        .join(Bug, Bug.id == BugActivity.bug_id)
+        .where(
+            BugActivity.kind == "status",
+            BugActivity.new_value.in_(RESOLVED),
+            db.or_(BugActivity.old_value.is_(None), BugActivity.old_value.not_in(RESOLVED)),
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+    for bug_id, created_at, project_id, severity in fixes:
+        deltas[(bucket(created_at), project_id or 0, severity or "", categories.get(bug_id, "General"),
+                "fixed")] += 1
+
+    db.session.execute(db.delete(BugRollup))
+    connection = db.session.connection()
+    for grain in ("hour", "day"):
+        rows = _rows(grain, {key: n for key, n in deltas.items() if (key[0] >= cutoff) == (grain == "hour")})
+        if rows:
+            upsert_rollups(connection, rows)
+    db.session.info["bug_rollups_changed"] = True
+    db.session.commit()
+    return len(deltas)
+
+# -------------------------
+# Trend queries
+# -------------------------
+def _days_since(start, column):
+    if db.session.get_bind().dialect.name == "sqlite":
+        return db.func.julianday(column) - db.func.julianday(start)
+    return db.extract("epoch", column - start) / 86400.0
+
+def _visible_projects(scope):
+    """Project ids ``scope`` may count, or None for all of them."""
+    if scope is None or scope.is_admin:
+        return None
+    return scope.project_ids
+
+def _reported_elsewhere(scope, visible, since, until, project_id=None, severity=None):
+    """
+    (moment, project_id, severity, category, metric) for the bugs ``scope``'s
+    user reported outside ``visible``. Rollups are counted per project, not
+    per reporter, so these come from the bug table (via
+    ix_bug_created_by_created_at) and the activity log instead.
+    """
+    filters = [Bug.created_by == scope.user_id]
+    if visible:
+        filters.append(db.or_(Bug.project_id.is_(None), Bug.project_id.not_in(sorted(visible))))
+    if project_id is not None:
+        filters.append(Bug.project_id == project_id)
+    if severity:
+        filters.append(Bug.severity == severity)
+
+    opened = db.session.execute(
+        db.select(Bug.created_at, Bug.project_id, Bug.severity, Bug.description)
+        .where(*filters, Bug.created_at >= since, Bug.created_at < until)
+    )
+    for created_at, project, bug_severity, description in opened:
+        yield created_at, project or 0, bug_severity or "", detect_category(description or ""), "opened"
+
+    # Same transitions rebuild_rollups counts: into a resolved status from an unresolved one.
+    # The IN keeps the activity lookup on (kind, bug_id) for this user's bugs only.
+    fixed = db.session.execute(
+        db.select(BugActivity.created_at, Bug.project_id, Bug.severity, Bug.description)
+        .join(Bug, Bug.id == BugActivity.bug_id)
+        .where(
+            *filters,
+            BugActivity.bug_id.in_(db.select(Bug.id).where(*filters)),
+            BugActivity.kind == "status",
+            BugActivity.new_value.in_(RESOLVED),
+            db.or_(BugActivity.old_value.is_(None), BugActivity.old_value.not_in(RESOLVED)),
+            BugActivity.created_at >= since,
+            BugActivity.created_at < until,
+        )
+    )
+    for created_at, project, bug_severity, description in fixed:
+        yield created_at, project or 0, bug_severity or "", detect_category(description or ""), "fixed"
+
+def trends(since, until, interval="day", by=None, project_id=None, severity=None, category=None, scope=None):
+    """
+    Bugs opened and fixed per ``interval`` bucket in [since, until), from
+    the rollup table. The database sums the rows of each stored bucket in
+    primary key order and the sums land in dense arrays, one per series.
+    ``by`` splits the series by project, severity or category.
+
+    A non-admin ``scope`` sees the rollups of their teams' projects plus
+    the bugs they reported anywhere else, read with one indexed query per
+    metric; that part costs one row per such bug in the range.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    if by is not None and by not in DIMENSIONS:
+        raise ValueError(f"by must be one of {', '.join(DIMENSIONS)}")
+    step = timedelta(days=INTERVALS[interval])
+    since = hour_of(since) if interval == "hour" else day_of(since)
+    count = math.ceil((until - since) / step) if until > since else 0
+    if count > MAX_BUCKETS:
+        raise ValueError(f"more than {MAX_BUCKETS} buckets; use a wider interval or a shorter range")
+
+    grains = ("hour",) if interval == "hour" else ("hour", "day")
+    # Grouping by the stored bucket follows the clustered key; only the grouped rows get an interval index
+    groups = [BugRollup.grain, BugRollup.bucket] + ([DIMENSIONS[by]] if by else [])
+    grouped = (
+        db.select(BugRollup.bucket, (DIMENSIONS[by] if by else db.literal("all")).label("key"),
+                  db.func.sum(BugRollup.opened).label("opened"), db.func.sum(BugRollup.fixed).label("fixed"))
+        .where(BugRollup.grain.in_(grains), BugRollup.bucket >= since, BugRollup.bucket < until)
+        .group_by(*groups)
+    )
+    if project_id is not None:
+        grouped = grouped.where(BugRollup.project_id == project_id)
+    visible = _visible_projects(scope)
+    if visible is not None:
+        grouped = grouped.where(BugRollup.project_id.in_(sorted(visible)))
+    if severity:
+        grouped = grouped.where(BugRollup.severity == severity)
+    if category:
+        grouped = grouped.where(BugRollup.category == category)
+    grouped = grouped.subquery()
+    # Bucket starts are whole hours, so the nudge only absorbs floating-point error
+    index = db.cast(_days_since(since, grouped.c.bucket) / INTERVALS[interval] + 1e-6, db.Integer)
+    query = db.select(index, grouped.c.key, grouped.c.opened, grouped.c.fixed)
+
+    series = {}
+    # Plain tuples: a year split by project is thousands of rows
+    for i, key, opened, fixed in db.session.connection().execute(query):
+        if key not in series:
+            series[key] = (array("q", [0]) * count, array("q", [0]) * count)
+        series[key][0][i] += opened
+        series[key][1][i] += fixed
+
+    own_projects = set()
+    if visible is not None:
+        dimension = {"project": 1, "severity": 2, "category": 3}.get(by)
+        for row in _reported_elsewhere(scope, visible, since, until, project_id, severity):
+            if category and row[3] != category:
+                continue
+            own_projects.add(row[1])
+            key = row[dimension] if dimension else "all"
+            if key not in series:
+                series[key] = (array("q", [0]) * count, array("q", [0]) * count)
+            series[key][0 if row[4] == "opened" else 1][int((row[0] - since) / step)] += 1
+
+    labels = {}
+    if by == "project":
+        labels = dict(db.session.execute(
+            db.select(Project.id, Project.name)
+            .where(Project.id.in_([k for k in series if k and (visible is None or k in visible or k in own_projects)]))
+        ).all())
+    result = [
+        {
+            "key": key,
+            "label": labels.get(key, "No project" if by == "project" and not key else key),
+            "opened": opened.tolist(),
+            "fixed": fixed.tolist(),
+            "total_opened": sum(opened),
+            "total_fixed": sum(fixed),
+        }
+        for key, (opened, fixed) in sorted(series.items(), key=lambda item: -sum(item[1][0]))
+    ]
+    return {
+        "interval": interval,
+        "by": by,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "buckets": [(since + step * i).isoformat() for i in range(count)],
+        "series": result,
+        "totals": {
+            "opened": sum(s["total_opened"] for s in result),
+            "fixed": sum(s["total_fixed"] for s in result),
+        },
+    }
+
+# -------------------------
+# Background compaction
+# -------------------------
+class BugRollups:
+    """
+    Keeps the bug_rollup table current: session hooks add each write to
+    its hourly bucket, and ``maybe_compact`` (called by idle job workers)
+    folds hourly rows older than the retention window into days. Trend
+    results are cached in-process for a few seconds, like bug_stats.
+    """
+
+    def __init__(self, cache_ttl=5.0, cache_max_entries=256):
+        self.hourly_retention = timedelta(hours=48)
+        self.compact_interval = 3600.0
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache = OrderedDict()
+        self._last_compact = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.hourly_retention = timedelta(hours=app.config.get("ROLLUP_HOURLY_RETENTION_HOURS", 48))
+        self.compact_interval = app.config.get("ROLLUP_COMPACT_INTERVAL", self.compact_interval)
+        self.cache_ttl = app.config.get("ROLLUP_CACHE_TTL", self.cache_ttl)
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["bug_rollups"] = self
+
+    def maybe_compact(self):
+        """Compact when compact_interval has passed since the last run in this process."""
+        if not self.compact_interval:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            if self._last_compact is not None and now - self._last_compact < self.compact_interval:
+                return 0
+            self._last_compact = now
+        return compact_rollups(self.hourly_retention)
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def trends(self, since, until, interval="day", by=None, project_id=None, severity=None, category=None,
+               scope=None):
+        """``trends()``, cached for cache_ttl seconds per distinct set of arguments and non-admin user."""
+        visible = _visible_projects(scope)
+        key = (since, until, interval, by, project_id, severity, category,
+               None if visible is None else (scope.user_id, visible))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        result = trends(since, until, interval, by, project_id, severity, category, scope)
+        if self.cache_ttl > 0:
+            with self._lock:
+                self._cache[key] = (now, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_max_entries:
+                    self._cache.popitem(last=False)
+        return result
+
+
+bug_rollups = BugRollups()
+
+# -------------------------
+# CLI: flask rollups ...
+# -------------------------
+rollups_cli = AppGroup("rollups", help="Bug trend rollups.")
+
+@rollups_cli.command("compact")
+@with_appcontext
+def compact_command():
+    """Fold hourly rollups past the retention window into daily ones."""
+    count = compact_rollups(bug_rollups.hourly_retention)
+    click.echo(f"Folded {count} hourly row(s).")
+
+@rollups_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Recalculate rollups from the bug table and the activity log."""
+    count = rebuild_rollups(bug_rollups.hourly_retention)
+    click.echo(f"Rebuilt {count} rollup counter(s).")
@@ -0,0 +1,89 @@
+# app/routes/activity.py
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+from app.models import Bug
+from app.activity import KINDS, mttr, time_in_status, timeline
+from app.access import current_scope
+from app import db
+
+# Blueprint definition
+activity_bp = Blueprint("activity", __name__)
+
+def _window_from_args():
+    """(since, until) from ISO 8601 query parameters; raises ValueError."""
+    since, until = request.args.get("since"), request.args.get("until")
+    return (datetime.fromisoformat(since) if since else None,
+            datetime.fromisoformat(until) if until else None)
+
+# -------------------------
+# Per-bug timeline
+# -------------------------
+@activity_bp.route("/api/bugs/<int:bug_id>/activity")
+@login_required
+def bug_activity(bug_id):
+    """
+    A bug's activity, oldest first, ``limit`` rows per page; pass the
+    returned ``next_after`` as ``?after=`` for the next page. ``?kind=``
+    (repeatable) limits the kinds.
+    """
+    bug = db.session.execute(db.select(Bug.created_by, Bug.project_id).where(Bug.id == bug_id)).first()
+    if bug is None:
+        return jsonify({"error": "Bug not found"}), 404
+    if not current_scope().can_view(bug):
+        return jsonify({"error": "Permission denied"}), 403
+
+    kinds = request.args.getlist("kind")
+    if any(kind not in KINDS for kind in kinds):
+        return jsonify({"error": f"kind must be one of {', '.join(KINDS)}"}), 400
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+    rows = timeline(bug_id, after_id=request.args.get("after", type=int), limit=limit, kinds=kinds or None)
+    return jsonify({
+        "bug_id": bug_id,
+        "activity": [row.to_dict() for row in rows],
+        "next_after": rows[-1].id if len(rows) == limit else None,
+    })
+
+# -------------------------
+# Resolution metrics
+# -------------------------
+@activity_bp.route("/api/activity/time_in_status")
+@login_required
+def time_in_status_api():
+    """Time spent per status over the bugs the user can see; ``project_id``, ``since``, ``until``."""
+    try:
+        since, until = _window_from_args()
+        return jsonify(time_in_status(
+            project_id=request.args.get("project_id", type=int),
+            scope=current_scope(),
+            since=since,
+            until=until,
+        ))
+    except ValueError:
+        return jsonify({"error": "since and until must be ISO 8601 dates"}), 400
+    except Exception as e:
+        print(f"Error in time_in_status_api: {e}")
+        return jsonify({"error": "Query failed"}), 500
+
+@activity_bp.route("/api/activity/mttr")
+@login_required
+def mttr_api():
+    """Mean time to resolve over the bugs the user can see; ``group_by`` is project or severity."""
+    group_by = request.args.get("group_by") or None
+    if group_by not in (None, "project", "severity"):
+        return jsonify({"error": "group_by must be project or severity"}), 400
+    try:
+        since, until = _window_from_args()
+        return jsonify({"group_by": group_by, "results": mttr(
+            project_id=request.args.get("project_id", type=int),
+            scope=current_scope(),
+            since=since,
+            until=until,
+            group_by=group_by,
+        )})
+    except ValueError:
+        return jsonify({"error": "since and until must be ISO 8601 dates"}), 400
+    except Exception as e:
+        print(f"Error in mttr_api: {e}")
+        return jsonify({"error": "Query failed"}), 500
@@ -0,0 +1,102 @@
+# app/routes/admin.py
+from functools import wraps
+
+from flask import Blueprint, request, jsonify, current_app
+from flask_login import login_required, current_user
+from app.models import BatchRun
+from app import db
+from app.batch import start_background_run
+from app.user_cache import user_cache
+from app.access import access_cache
+
+# Blueprint definition
+admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+def admin_required(view):
+    @wraps(view)
+    @login_required
+    def wrapped(*args, **kwargs):
+        if not current_user.is_admin:
+            return jsonify({"error": "Admin access required"}), 403
+        return view(*args, **kwargs)
+    return wrapped
+
+# -------------------------
+# Start or resume a batch re-analysis
+# -------------------------
+def _int_field(data, field, default=None, minimum=0):
+    """Integer ``field`` of a JSON body (numbers or numeric strings); raises ValueError."""
+    value = data.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{field} must be an integer")
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be an integer") from None
+    if value < minimum:
+        raise ValueError(f"{field} must be at least {minimum}")
+    return value
+
+@admin_bp.route("/batch/reanalyze", methods=["POST"])
+@admin_required
+def start_reanalyze():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    try:
+        resume_id = _int_field(data, "resume", minimum=1)
+        after_id = _int_field(data, "after_id", 0)
+        chunk_size = _int_field(data, "chunk_size", 500, minimum=1)
+        workers = _int_field(data, "workers", minimum=1)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    resume_run = None
+    if resume_id is not None:
+        resume_run = db.session.get(BatchRun, resume_id)
+        if resume_run is None:
+            return jsonify({"error": "Batch run not found"}), 404
+        if resume_run.status == "running":
+            return jsonify({"error": "Batch run is already running"}), 409
+
+    run = start_background_run(
+        current_app._get_current_object(),
+        after_id=after_id,
+        resume_run=resume_run,
+        chunk_size=chunk_size,
+        workers=workers,
+    )
+    return jsonify(run.to_dict()), 202
+
+# -------------------------
+# Batch run progress
+# -------------------------
+@admin_bp.route("/batch/<int:run_id>")
+@admin_required
+def batch_status(run_id):
+    run = BatchRun.query.get_or_404(run_id)
+    return jsonify(run.to_dict())
+
+@admin_bp.route("/batch")
+@admin_required
+def batch_list():
+    runs = BatchRun.query.order_by(BatchRun.id.desc()).limit(20).all()
+    return jsonify([run.to_dict() for run in runs])
+
+# -------------------------
+# User cache counters
+# -------------------------
+@admin_bp.route("/user_cache")
+@admin_required
+def user_cache_stats():
+    return jsonify(user_cache.stats())
+
+# -------------------------
+# Access cache counters
+# -------------------------
+@admin_bp.route("/access_cache")
+@admin_required
+def access_cache_stats():
+    return jsonify(access_cache.stats())
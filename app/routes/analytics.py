@@ -0,0 +1,49 @@
+# app/routes/analytics.py
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+from app.access import current_scope
+from app.rollups import bug_rollups, day_of
+
+# Blueprint definition
+analytics_bp = Blueprint("analytics", __name__)
+
+# -------------------------
+# Bug trends from the rollup tables
+# -------------------------
+@analytics_bp.route("/api/analytics/trends")
+@login_required
+def trends_api():
+    """
+    Bugs opened and fixed per ``interval`` (hour, day or week) between
+    ``since`` and ``until`` (ISO 8601; default the last 30 days), split
+    ``by`` project, severity or category and filtered by ``project_id``,
+    ``severity`` or ``category``. Non-admins see the projects of their
+    teams plus the bugs they reported. Hourly buckets cover the retention window only; older
+    hours are folded into days.
+    """
+    try:
+        until = request.args.get("until")
+        until = datetime.fromisoformat(until) if until else day_of(datetime.utcnow()) + timedelta(days=1)
+        since = request.args.get("since")
+        since = datetime.fromisoformat(since) if since else until - timedelta(days=30)
+    except ValueError:
+        return jsonify({"error": "since and until must be ISO 8601 dates"}), 400
+
+    try:
+        return jsonify(bug_rollups.trends(
+            since,
+            until,
+            interval=request.args.get("interval", "day"),
+            by=request.args.get("by") or None,
+            project_id=request.args.get("project_id", type=int),
+            severity=request.args.get("severity") or None,
+            category=request.args.get("category") or None,
+            scope=current_scope(),
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error in trends_api: {e}")
+        return jsonify({"error": "Query failed"}), 500
@@ -3,6 +3,10 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required
 from app.models import User
 from app import db, login_manager
+from app.passwords import PasswordHashingBusy
+from app.user_cache import user_cache
+
+BUSY_MESSAGE = "The server is busy. Please try again in a few seconds."
 
 # Blueprint definition
 auth_bp = Blueprint("auth", __name__)
@@ -16,7 +20,19 @@ def login():
         username = request.form.get("username")
         password = request.form.get("password")
         user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
+        try:
+            valid = bool(user) and user.check_password(password)
+        except PasswordHashingBusy:
+            flash(BUSY_MESSAGE, "danger")
+            return render_template("login.html"), 503, {"Retry-After": "5"}
+        if valid:
+            if user.password_needs_rehash():
+                # Hashing policy changed since this hash was made; upgrade it while we have the password
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except PasswordHashingBusy:
+                    pass  # upgrade on a later login
             login_user(user)
             flash("Logged in successfully.", "success")
             return redirect(url_for("dashboard.index"))
@@ -46,7 +62,11 @@ def register():
             email=email,
             role="User"
         )
-        new_user.set_password(password)
+        try:
+            new_user.set_password(password)
+        except PasswordHashingBusy:
+            flash(BUSY_MESSAGE, "danger")
+            return render_template("register.html"), 503, {"Retry-After": "5"}
         db.session.add(new_user)
         db.session.commit()
 
@@ -70,5 +90,6 @@ def logout():
 # -------------------------
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cached slim record instead of a User query on every request
+    return user_cache.get(int(user_id))
 
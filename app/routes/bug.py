@@ -1,10 +1,18 @@
 # app/routes/bug.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, current_app, stream_with_context, make_response
 from flask_login import login_required, current_user
 from app.models import Bug, Project
 from app import db
-from app.ai_engine import analyze_and_fix_code
-from io import BytesIO
+from app.analysis_cache import analysis_cache, cached_analyze_and_fix_code
+from app.jobs import enqueue_analysis, latest_job_for, wake_workers
+from app.streaming import StreamLimitError, analyze_stream, iter_decoded
+from app.incremental import analyze_update, VersionConflict
+from app.pagination import keyset_page
+from app.dedup import find_duplicates, index_bug, reuse_fix
+from app.code_store import code_store
+from app.http_cache import attachment, bug_page_validators, has_pending_flashes, not_modified, set_validators
+from app.access import current_scope
+import json
 import traceback
 
 # Blueprint definition
@@ -20,8 +28,9 @@ def report_bug():
         if request.method == "POST":
             title = request.form.get("title")
             description = request.form.get("description")
-            code = request.form.get("code")
-            project_id = request.form.get("project_id")
+            code = request.form.get("code_snippet")
+            project_id = request.form.get("project_id") or None
+            severity = request.form.get("severity") or "Medium"
             
             # Basic validation
             if not title or not description:
@@ -32,30 +41,31 @@ def report_bug():
             new_bug = Bug(
                 title=title,
                 description=description,
-                code_snippet=code,
-                user_id=current_user.id,
+                severity=severity,
+                original_code=code,
+                created_by=current_user.id,
                 project_id=project_id
             )
-            
             db.session.add(new_bug)
-            db.session.commit()
+            db.session.flush()
+            index_bug(new_bug)
             
-            # Try to generate AI fix if code is provided
-            if code:
-                try:
-                    ai_result = analyze_and_fix_code(code, description)
-                    new_bug.fixed_code = ai_result.get('fixed_code', '')
-                    new_bug.ai_notes = ai_result.get('ai_notes', 'AI analysis failed')
-                    db.session.commit()
-                except Exception as ai_error:
-                    print(f"AI analysis failed: {ai_error}")
-                    # Continue even if AI fails
+            # Identical code was analysed before: reuse its fix instead of queueing a job
+            reused = reuse_fix(new_bug) if code else None
+            if reused:
+                new_bug.fixed_code, new_bug.ai_notes = reused
+            elif code:
+                # Queue AI analysis in the same transaction; workers fill in the fix
+                enqueue_analysis(new_bug)
+            db.session.commit()
+            if code and not reused:
+                wake_workers()
             
             flash("Bug reported successfully.", "success")
             return redirect(url_for("bug.bug_detail", bug_id=new_bug.id))
         
         # GET request - show form with projects
-        projects = Project.query.filter_by(creator_id=current_user.id).all()
+        projects = Project.query.all()
         return render_template("report_bug.html", projects=projects)
     
     except Exception as e:
@@ -74,11 +84,25 @@ def bug_detail(bug_id):
         bug = Bug.query.get_or_404(bug_id)
         
         # Verify user has access to this bug
-        if bug.user_id != current_user.id and not current_user.is_admin:
+        if not current_scope().can_view(bug):
             flash("You don't have permission to view this bug.", "error")
             return redirect(url_for("bug.bug_list"))
         
-        return render_template("bug_detail.html", bug=bug)
+        # Unchanged bug, job state and viewer: answer 304 without loading code or rendering
+        job = latest_job_for(bug.id)
+        etag, last_modified = bug_page_validators(bug, job)
+        if not has_pending_flashes():
+            cached = not_modified(etag, last_modified, weak=True)
+            if cached is not None:
+                cached.cache_control.private = True
+                cached.cache_control.no_cache = True
+                return cached
+        
+        response = make_response(render_template("bug_detail.html", bug=bug, job=job))
+        set_validators(response, etag, last_modified, weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
     
     except Exception as e:
         print(f"Error in bug_detail: {e}")
@@ -92,12 +116,49 @@ def bug_detail(bug_id):
 @login_required
 def bug_list():
     try:
-        if current_user.is_admin:
-            bugs = Bug.query.all()
-        else:
-            bugs = Bug.query.filter_by(user_id=current_user.id).all()
+        # Only the listed columns; code blobs stay in the database
+        query = (
+            db.select(
+                Bug.id, Bug.title, Bug.status, Bug.severity, Bug.created_at,
+                Project.name.label("project_name"),
+                Bug.fixed_code_hash.isnot(None).label("has_fix")
+            )
+            .outerjoin(Project, Bug.project_id == Project.id)
+        )
+        # Own bugs plus those of the user's team projects, as an indexed IN filter
+        query = current_scope().apply(query)
         
-        return render_template("bug_list.html", bugs=bugs)
+        # Filters (each backed by a (column, created_at, id) index)
+        filters = {
+            "status": request.args.get("status") or None,
+            "severity": request.args.get("severity") or None,
+            "project_id": request.args.get("project_id", type=int)
+        }
+        if filters["status"]:
+            query = query.where(Bug.status == filters["status"])
+        if filters["severity"]:
+            query = query.where(Bug.severity == filters["severity"])
+        if filters["project_id"]:
+            query = query.where(Bug.project_id == filters["project_id"])
+        
+        sort = request.args.get("sort", "newest")
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+        bugs, next_cursor = keyset_page(
+            query, Bug.created_at, Bug.id,
+            cursor=request.args.get("cursor"),
+            limit=limit,
+            newest_first=(sort != "oldest")
+        )
+        
+        args = {k: v for k, v in request.args.items() if k != "cursor"}
+        next_url = url_for("bug.bug_list", cursor=next_cursor, **args) if next_cursor else None
+        first_url = url_for("bug.bug_list", **args) if request.args.get("cursor") else None
+        
+        projects = db.session.execute(db.select(Project.id, Project.name).order_by(Project.name)).all()
+        return render_template(
+            "bug_list.html", bugs=bugs, next_url=next_url, first_url=first_url,
+            filters=filters, sort=sort, projects=projects
+        )
     
     except Exception as e:
         print(f"Error in bug_list: {e}")
@@ -114,25 +175,23 @@ def ai_fix(bug_id):
         bug = Bug.query.get_or_404(bug_id)
         
         # Verify user has access to this bug
-        if bug.user_id != current_user.id and not current_user.is_admin:
+        if not current_scope().can_modify(bug):
             flash("You don't have permission to modify this bug.", "error")
             return redirect(url_for("bug.bug_list"))
         
         # Check if there's code to analyze
-        if not bug.code_snippet:
+        if not bug.original_code:
             flash("No code available to analyze.", "warning")
             return redirect(url_for("bug.bug_detail", bug_id=bug_id))
         
-        # Analyze and fix code using AI
-        ai_result = analyze_and_fix_code(bug.code_snippet, bug.description)
-        
-        # Update bug with AI results
-        bug.fixed_code = ai_result.get('fixed_code', '')
-        bug.ai_notes = ai_result.get('ai_notes', 'AI analysis completed')
-        bug.status = "Fixed"
-        db.session.commit()
+        # Queue the analysis; the job marks the bug Fixed when it completes
+        job = latest_job_for(bug.id)
+        if job is None or job.status not in ("queued", "running"):
+            enqueue_analysis(bug, mark_fixed=True)
+            db.session.commit()
+        wake_workers()
         
-        flash("AI attempted a fix for this bug.", "success")
+        flash("AI fix queued for this bug.", "success")
         return redirect(url_for("bug.bug_detail", bug_id=bug_id))
     
     except Exception as e:
@@ -141,6 +200,26 @@ def ai_fix(bug_id):
         flash("An error occurred during AI analysis.", "error")
         return redirect(url_for("bug.bug_detail", bug_id=bug_id))
 
+# -------------------------
+# AI analysis job status (polled by the detail page)
+# -------------------------
+@bug_bp.route("/<int:bug_id>/analysis_status")
+@login_required
+def analysis_status(bug_id):
+    bug = Bug.query.get_or_404(bug_id)
+    if not current_scope().can_view(bug):
+        return jsonify({"error": "Permission denied"}), 403
+    
+    job = latest_job_for(bug.id)
+    return jsonify({
+        "bug_id": bug.id,
+        "bug_status": bug.status,
+        "job_status": job.status if job else None,
+        "attempts": job.attempts if job else 0,
+        "error": job.last_error if job else None,
+        "has_fix": bug.fixed_code_hash is not None
+    })
+
 # -------------------------
 # Download bug code
 # -------------------------
@@ -151,26 +230,28 @@ def download_bug_code(bug_id):
         bug = Bug.query.get_or_404(bug_id)
         
         # Verify user has access to this bug
-        if bug.user_id != current_user.id and not current_user.is_admin:
+        if not current_scope().can_view(bug):
             flash("You don't have permission to download this code.", "error")
             return redirect(url_for("bug.bug_list"))
         
         # Use fixed code if available, otherwise original code
-        code = bug.fixed_code or bug.code_snippet or ""
-        
-        if not code:
+        digest = bug.fixed_code_hash or bug.original_code_hash
+        if not digest:
             flash("No code available to download.", "warning")
             return redirect(url_for("bug.bug_detail", bug_id=bug_id))
         
-        # Create in-memory file
-        data = BytesIO(code.encode("utf-8"))
+        # Blobs are content-addressed, so the hash is a strong ETag for the body
+        headers = {"Content-Disposition": attachment(f"bug_{bug.id}_{bug.title.replace(' ', '_')}.py")}
+        cached = not_modified(digest, bug.updated_at)
+        if cached is not None:
+            cached.headers.update(headers)
+            return cached
         
-        return send_file(
-            data,
-            download_name=f"bug_{bug.id}_{bug.title.replace(' ', '_')}.py",
-            as_attachment=True,
-            mimetype="text/x-python"
-        )
+        response = Response(code_store.get(digest), mimetype="text/x-python", headers=headers)
+        set_validators(response, digest, bug.updated_at)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
     
     except Exception as e:
         print(f"Error in download_bug_code: {e}")
@@ -183,13 +264,18 @@ def download_bug_code(bug_id):
 @bug_bp.route("/api/analyze_code", methods=["POST"])
 @login_required
 def analyze_code_api():
+    code = ""
     try:
         data = request.get_json()
         code = data.get("code", "")
         description = data.get("description", "")
         
-        result = analyze_and_fix_code(code, description)
-        return jsonify(result)
+        fixed_code, ai_notes, severity = cached_analyze_and_fix_code(code, description)
+        return jsonify({
+            "fixed_code": fixed_code,
+            "ai_notes": ai_notes,
+            "severity": severity
+        })
     
     except Exception as e:
         print(f"Error in analyze_code_api: {e}")
@@ -197,4 +283,118 @@ def analyze_code_api():
             "fixed_code": code,
             "ai_notes": "Error in AI analysis",
             "error": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+# -------------------------
+# Near-duplicate lookup for the report form
+# -------------------------
+@bug_bp.route("/api/bugs/duplicates", methods=["POST"])
+@login_required
+def duplicates_api():
+    try:
+        data = request.get_json(silent=True) or {}
+        limit = min(max(int(data.get("limit") or 5), 1), 20)
+        duplicates = find_duplicates(data.get("description", ""), data.get("code", ""), limit=limit,
+                                     scope=current_scope())
+        for match in duplicates:
+            match["url"] = url_for("bug.bug_detail", bug_id=match["id"])
+        return jsonify({"duplicates": duplicates})
+    
+    except Exception as e:
+        print(f"Error in duplicates_api: {e}")
+        return jsonify({"duplicates": [], "error": str(e)}), 500
+
+# -------------------------
+# Incremental analysis for the live code editor
+# -------------------------
+@bug_bp.route("/api/analyze_code/incremental", methods=["POST"])
+@login_required
+def analyze_code_incremental():
+    """
+    Applies a line-range edit to the server's copy of an editor document and
+    returns the rules that would fire plus issues on the changed lines only.
+    Replies 409 when the server has no matching state; the client then
+    resends the full text.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        payload = {
+            "doc_id": str(data["doc_id"])[:64],
+            "version": int(data["version"]),
+            "description": data.get("description", "")
+        }
+        if "text" in data:
+            payload["text"] = str(data["text"])
+        else:
+            payload["base_version"] = int(data["base_version"])
+            payload["start"] = int(data["start"])
+            payload["end"] = int(data["end"])
+            payload["lines"] = [str(line) for line in data["lines"]]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Invalid incremental update"}), 400
+    
+    try:
+        return jsonify(analyze_update(current_user.id, payload))
+    except VersionConflict:
+        return jsonify({"resync": True}), 409
+    except ValueError as e:
+        return jsonify({"resync": True, "error": str(e)}), 409
+
+# -------------------------
+# Streaming analysis for large uploads
+# -------------------------
+@bug_bp.route("/api/analyze_code/stream", methods=["POST"])
+@login_required
+def analyze_code_stream():
+    """
+    Accepts the code as the raw (optionally chunked) request body and streams
+    the fixed code back. ``?format=ndjson`` (default) yields a meta line with
+    notes and severity followed by chunk lines; ``?format=plain`` streams the
+    code as text with notes and severity in response headers.
+    """
+    description = request.args.get("description", "")
+    output_format = request.args.get("format", "ndjson")
+    chunk_size = current_app.config.get("STREAM_CHUNK_SIZE", 64 * 1024)
+    max_bytes = current_app.config.get("STREAM_MAX_BYTES", 64 * 1024 * 1024)
+    
+    # Chunked uploads have no length up front; iter_decoded enforces the cap while reading
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify({"ai_notes": "Upload too large to analyse",
+                        "error": f"upload larger than {max_bytes} bytes"}), 413
+    
+    try:
+        chunks, ai_notes, severity = analyze_stream(
+            iter_decoded(request.stream, chunk_size, max_bytes),
+            description,
+            memory_limit=current_app.config.get("STREAM_SPOOL_MEMORY_LIMIT", 1024 * 1024),
+            chunk_size=chunk_size,
+            max_ids=current_app.config.get("STREAM_MAX_IDS", 50000),
+            max_id_length=current_app.config.get("STREAM_MAX_ID_LENGTH", 4096)
+        )
+    except StreamLimitError as e:
+        return jsonify({"ai_notes": "Upload too large to analyse", "error": str(e)}), 413
+    except Exception as e:
+        print(f"Error in analyze_code_stream: {e}")
+        return jsonify({"ai_notes": "Error in AI analysis", "error": str(e)}), 500
+    
+    if output_format == "plain":
+        headers = {"X-AI-Severity": severity, "X-AI-Notes": json.dumps(ai_notes)}
+        return Response(stream_with_context(chunks), mimetype="text/plain", headers=headers)
+    
+    def ndjson():
+        yield json.dumps({"type": "meta", "ai_notes": ai_notes, "severity": severity}) + "\n"
+        for chunk in chunks:
+            yield json.dumps({"type": "chunk", "data": chunk}) + "\n"
+        yield json.dumps({"type": "end"}) + "\n"
+    
+    return Response(stream_with_context(ndjson()), mimetype="application/x-ndjson")
+
+# -------------------------
+# Analysis cache counters (admin only)
+# -------------------------
+@bug_bp.route("/api/analyze_code/cache_stats")
+@login_required
+def analysis_cache_stats():
+    if not current_user.is_admin:
+        return jsonify({"error": "Admin access required"}), 403
+    return jsonify(analysis_cache.stats())
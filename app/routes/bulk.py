@@ -0,0 +1,87 @@
+# app/routes/bulk.py
+import io
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_login import login_required, current_user
+from app.bulk import FORMATS, READERS, SEVERITIES, STATUSES, export_bugs, guess_format, import_bugs
+from app.jobs import wake_workers
+from app.access import current_scope
+
+# Blueprint definition
+bulk_bp = Blueprint("bulk", __name__)
+
+MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# -------------------------
+# Bulk import
+# -------------------------
+@bulk_bp.route("/api/bugs/import", methods=["POST"])
+@login_required
+def import_bugs_api():
+    """
+    Import bugs from an NDJSON or CSV upload: a multipart ``file`` field or
+    the raw request body. ``?format=`` overrides the format guessed from the
+    file name or content type; ``?analyze=1`` queues AI analysis for bugs
+    with code. Admins may set created_by per row; everyone else imports as
+    themselves. Returns counts and per-row errors.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        stream, filename, mimetype = upload.stream, upload.filename, upload.mimetype
+    else:
+        stream, filename, mimetype = request.stream, None, request.mimetype
+    fmt = request.args.get("format") or guess_format(filename, mimetype)
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)}"}), 400
+
+    try:
+        text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+        report = import_bugs(
+            READERS[fmt](text),
+            owner_id=current_user.id,
+            trust_owner=current_user.is_admin,
+            analyze=request.args.get("analyze") in ("1", "true", "yes"),
+        )
+    except Exception as e:
+        print(f"Error in import_bugs_api: {e}")
+        return jsonify({"error": "Import failed", "detail": str(e)}), 500
+
+    if report.queued:
+        wake_workers()
+    return jsonify(report.to_dict()), 200 if report.imported or not report.rows else 422
+
+# -------------------------
+# Bulk export
+# -------------------------
+@bulk_bp.route("/api/bugs/export")
+@login_required
+def export_bugs_api():
+    """
+    Stream bugs as ``?format=ndjson`` (default) or ``csv``, optionally with
+    ``?include_code=1`` and status / severity / project_id filters. Users
+    who are not admins get the bugs they reported and those of their
+    teams' projects.
+    """
+    fmt = request.args.get("format", "ndjson")
+    status = request.args.get("status") or None
+    severity = request.args.get("severity") or None
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)}"}), 400
+    if status and status not in STATUSES or severity and severity not in SEVERITIES:
+        return jsonify({"error": "Unknown status or severity"}), 400
+
+    chunks = export_bugs(
+        fmt,
+        include_code=request.args.get("include_code") in ("1", "true", "yes"),
+        scope=current_scope(),
+        status=status,
+        severity=severity,
+        project_id=request.args.get("project_id", type=int),
+    )
+    filename = f"bugs-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -1,8 +1,10 @@
 # app/routes/dashboard.py
 from flask import Blueprint, render_template
 from flask_login import login_required
-from app.models import Bug    # use absolute import
-from app import db            # use absolute import
+from app.models import Bug, Project    # use absolute import
+from app.stats import bug_stats        # use absolute import
+from app import db                     # use absolute import
+from app.access import current_scope
 
 # Blueprint definition
 dashboard_bp = Blueprint("dashboard", __name__)
@@ -13,7 +15,25 @@ dashboard_bp = Blueprint("dashboard", __name__)
 @dashboard_bp.route("/dashboard")
 @login_required
 def index():
-    # Fetch latest 20 bugs
-    bugs = Bug.query.order_by(Bug.created_at.desc()).limit(20).all()
-    return render_template("dashboard.html", bugs=bugs)
+    # Counters come from the bug_stat table; non-admins see their teams' projects plus their own bugs
+    scope = current_scope()
+    stats = bug_stats.scope_snapshot(scope)
 
+    # Latest 20 bugs the user may open, only the columns the template shows
+    recent_bugs = db.session.execute(
+        scope.apply(
+            db.select(Bug.id, Bug.title, Bug.status, Project.name.label("project_name"))
+            .outerjoin(Project, Bug.project_id == Project.id)
+        )
+        .order_by(Bug.created_at.desc(), Bug.id.desc())
+        .limit(20)
+    ).all()
+
+    return render_template(
+        "dashboard.html",
+        total_bugs=stats["total"],
+        open_bugs=stats["status"].get("Open", 0),
+        fixed_bugs=stats["status"].get("Fixed", 0),
+        total_projects=stats["projects"],
+        recent_bugs=recent_bugs,
+    )
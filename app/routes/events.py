@@ -0,0 +1,57 @@
+# app/routes/events.py
+from flask import Blueprint, Response, jsonify, request
+from flask_login import login_required
+from app.models import Bug
+from app.events import event_bus
+from app.access import current_scope
+from app import db
+
+# Blueprint definition
+events_bp = Blueprint("events", __name__)
+
+# -------------------------
+# Server-Sent Events stream
+# -------------------------
+@events_bp.route("/api/events")
+@login_required
+def event_stream():
+    """
+    Live bug changes as Server-Sent Events. ``?bug_id=`` limits the stream
+    to one bug. Users get full events for bugs they can open (admins for
+    all) and only the event type for the rest; team membership is read
+    when the stream opens. A reconnecting browser sends
+    Last-Event-ID and receives the events it missed, while they are kept.
+    """
+    if not event_bus.enabled:
+        return jsonify({"error": "Live events are disabled"}), 404
+
+    scope = current_scope()
+    bug_id = request.args.get("bug_id", type=int)
+    if bug_id is not None:
+        bug = db.session.execute(db.select(Bug.created_by, Bug.project_id).where(Bug.id == bug_id)).first()
+        if bug is None:
+            return jsonify({"error": "Bug not found"}), 404
+        if not scope.can_view(bug):
+            return jsonify({"error": "Permission denied"}), 403
+
+    subscriber = event_bus.subscribe(scope, bug_id)
+    if subscriber is None:
+        return jsonify({"error": "Too many open event streams"}), 503, {"Retry-After": "10"}
+
+    try:
+        last_event_id = request.headers.get("Last-Event-ID", type=int)
+        replay = event_bus.backend.replay(last_event_id) if last_event_id is not None else []
+    except Exception as e:
+        print(f"Error replaying events: {e}")
+        replay = []
+    # The stream can stay open for minutes; do not hold a database connection for it
+    db.session.remove()
+
+    response = Response(
+        event_bus.stream(subscriber, replay),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Also covers clients that disconnect before the stream starts
+    response.call_on_close(lambda: event_bus.unsubscribe(subscriber))
+    return response
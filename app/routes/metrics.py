@@ -0,0 +1,36 @@
+# app/routes/metrics.py
+import hmac
+
+from flask import Blueprint, Response, current_app, request
+from flask_login import current_user
+from app.metrics import metrics
+
+# Blueprint definition
+metrics_bp = Blueprint("metrics", __name__)
+
+# -------------------------
+# Prometheus scrape endpoint
+# -------------------------
+LOOPBACK = {"127.0.0.1", "::1"}
+
+def _allowed():
+    """
+    With METRICS_TOKEN set, scrapers must send it as a bearer token.
+    Without one, only logged-in admins and direct (not proxied) loopback
+    requests may read metrics, which expose routes, SQL and cache internals.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+    if current_user.is_authenticated and current_user.is_admin:
+        return True
+    return request.remote_addr in LOOPBACK and "X-Forwarded-For" not in request.headers
+
+@metrics_bp.route("/metrics")
+def prometheus_metrics():
+    if not _allowed():
+        return Response("Forbidden\n", status=403, mimetype="text/plain")
+    if not metrics.enabled:
+        return Response("Metrics are disabled\n", status=404, mimetype="text/plain")
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -30,3 +30,13 @@ def list_projects():
     return render_template("projects.html", projects=projects)
 
 
+
+# -------------------------
+# Create project form
+# -------------------------
+@project_bp.route("/new", methods=["GET", "POST"])
+@login_required
+def create_project():
+    if request.method == "POST":
+        return list_projects()
+    return render_template("create_project.html")
@@ -0,0 +1,82 @@
+# app/routes/search.py
+from flask import Blueprint, render_template, request, jsonify
+from flask_login import login_required
+from app.models import Project
+from app.search import search_bugs, render_snippet
+from app.access import current_scope
+from app import db
+
+# Blueprint definition
+search_bp = Blueprint("search", __name__)
+
+def _search_from_args():
+    """Run a search from the request's query string; returns (query, filters, page, limit, rows)."""
+    text = (request.args.get("q") or "").strip()
+    filters = {
+        "status": request.args.get("status") or None,
+        "severity": request.args.get("severity") or None,
+        "project_id": request.args.get("project_id", type=int)
+    }
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+
+    rows = []
+    if text:
+        rows = search_bugs(
+            text,
+            scope=current_scope(),
+            limit=limit + 1,
+            offset=(page - 1) * limit,
+            **filters
+        )
+    return text, filters, page, limit, rows
+
+# -------------------------
+# Search page
+# -------------------------
+@search_bp.route("/search")
+@login_required
+def search_page():
+    try:
+        text, filters, page, limit, rows = _search_from_args()
+    except Exception as e:
+        print(f"Error in search_page: {e}")
+        text, filters, page, limit, rows = request.args.get("q", ""), {}, 1, 20, []
+
+    args = {k: v for k, v in request.args.items() if k != "page"}
+    results = [dict(row._asdict(), snippet=render_snippet(row.snippet)) for row in rows[:limit]]
+    projects = db.session.execute(db.select(Project.id, Project.name).order_by(Project.name)).all()
+    return render_template(
+        "search.html", q=text, results=results, filters=filters, projects=projects,
+        page=page, has_next=len(rows) > limit, args=args
+    )
+
+# -------------------------
+# Search API
+# -------------------------
+@search_bp.route("/api/search")
+@login_required
+def search_api():
+    try:
+        text, filters, page, limit, rows = _search_from_args()
+        return jsonify({
+            "q": text,
+            "page": page,
+            "has_next": len(rows) > limit,
+            "results": [
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "status": row.status,
+                    "severity": row.severity,
+                    "project_name": row.project_name,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "snippet_html": str(render_snippet(row.snippet))
+                }
+                for row in rows[:limit]
+            ]
+        })
+
+    except Exception as e:
+        print(f"Error in search_api: {e}")
+        return jsonify({"error": "Search failed"}), 500
@@ -0,0 +1,542 @@
+# app/search.py
+import re
+import sqlite3
+from collections import namedtuple
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from markupsafe import Markup, escape
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.code_store import inflate
+from app.models import Bug, CodeBlob, Project
+
+# Control characters mark highlights in snippets; content is escaped before they become <mark>
+MARK_START = "\x02"
+MARK_END = "\x03"
+WORD = re.compile(r"\w+", re.UNICODE)
+
+def render_snippet(snippet):
+    """Escape a backend snippet and turn its highlight markers into <mark> tags."""
+    if not snippet:
+        return Markup("")
+    html = str(escape(snippet))
+    return Markup(html.replace(MARK_START, "<mark>").replace(MARK_END, "</mark>"))
+
+def make_snippet(words, *texts, size=16):
+    """
+    Snippet for an index that keeps no text: the ``size``-word window of
+    ``texts`` with the most query ``words`` (casefolded; the last one is a
+    prefix, as in the MATCH expression), hits between highlight markers.
+    """
+    exact = set(words[:-1])
+    prefix = words[-1] if words else None
+
+    def is_hit(token):
+        token = token.casefold()
+        return token in exact or (prefix is not None and token.startswith(prefix))
+
+    best = None
+    for text in texts:
+        tokens = list(WORD.finditer(text or ""))
+        if not tokens:
+            continue
+        hits = [i for i, token in enumerate(tokens) if is_hit(token.group())]
+        count, start, first = 0, 0, 0
+        for last in range(len(hits)):
+            while hits[last] - hits[first] >= size:
+                first += 1
+            if last - first + 1 > count:
+                count, start = last - first + 1, hits[first]
+        if best is None or count > best[0]:
+            best = (count, text, tokens, set(hits), min(start, max(0, len(tokens) - size)))
+    if best is None:
+        return ""
+
+    _, text, tokens, hits, start = best
+    end = min(len(tokens), start + size)
+    parts = ["…"] if start else []
+    position = tokens[start].start()
+    for i in range(start, end):
+        token = tokens[i]
+        parts.append(text[position:token.start()])
+        parts.append(f"{MARK_START}{token.group()}{MARK_END}" if i in hits else token.group())
+        position = token.end()
+    if end < len(tokens):
+        parts.append("…")
+    return "".join(parts)
+
+# -------------------------
+# Backend interface
+# -------------------------
+class SearchBackend:
+    """
+    Full-text index over bug title, description, ai_notes and (on SQLite) original_code.
+    The text columns are maintained by the database itself (triggers or a
+    generated column), so ORM writes, bulk updates and raw SQL all stay in
+    sync; backends that index code also implement ``index_code`` and
+    ``unindex_code``.
+    """
+
+    name = ""
+    indexes_code = False
+
+    def __init__(self, rank_window=0):
+        # Terms matching more bugs than this rank only the newest ``rank_window`` matches
+        self.rank_window = rank_window
+
+    @staticmethod
+    def installed(connection):
+        """Whether the index exists in this database."""
+        raise NotImplementedError
+
+    def install(self, connection):
+        """Create the index if missing. Returns True when it was just created."""
+        raise NotImplementedError
+
+    def reindex(self, connection):
+        """Rebuild the index from the bug table."""
+        raise NotImplementedError
+
+    def index_code(self, connection, rows):
+        """Index the code of (bug_id, code) rows; a no-op for backends that do not search code."""
+
+    def unindex_code(self, connection, rows):
+        """Remove (bug_id, old code) rows from the index; a no-op for backends that do not search code."""
+
+    @staticmethod
+    def needs_old_code(connection):
+        """Whether ``unindex_code`` needs the old code, so the session must read it before the flush."""
+        return False
+
+    def match(self, query, text):
+        """
+        Restrict ``query`` (a filtered select over Bug) to bugs matching
+        ``text``, add a ``snippet`` column (or what ``add_snippets`` needs)
+        and order best match first. Returns None when ``text`` has nothing
+        searchable.
+        """
+        raise NotImplementedError
+
+    def add_snippets(self, rows, text):
+        """Result rows of a ``match`` query, each with a ``snippet``."""
+        return rows
+
+
+def _sqlite_ddl(contentless_delete):
+    """
+    Statements creating the SQLite index. Both tables are contentless: they
+    keep tokens only, the text stays in bug and code_blob. Without
+    contentless_delete (SQLite < 3.43) rows are removed with the 'delete'
+    command and the old values, which the triggers have for the text
+    columns and the application has for code.
+    """
+    options = "content='', contentless_delete=1" if contentless_delete else "content=''"
+    if contentless_delete:
+        remove_text = "DELETE FROM bug_fts WHERE rowid = old.id;"
+    else:
+        remove_text = """INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes);"""
+    ddl = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, {options},
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )""",
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts_code USING fts5(
+            original_code, {options},
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            {remove_text}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes ON bug BEGIN
+            {remove_text}
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END""",
+    ]
+    if contentless_delete:
+        ddl += [
+            """CREATE TRIGGER IF NOT EXISTS bug_fts_code_ad AFTER DELETE ON bug BEGIN
+                DELETE FROM bug_fts_code WHERE rowid = old.id;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS bug_fts_code_au AFTER UPDATE OF original_code_hash ON bug BEGIN
+                DELETE FROM bug_fts_code WHERE rowid = old.id;
+            END""",
+        ]
+    return ddl
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Two contentless FTS5 tables ranked with bm25: bug_fts over title,
+    description and ai_notes, kept current by plain SQL triggers for any
+    connection (the sqlite3 shell, scripts, backups), and bug_fts_code over
+    original_code, written by the application because code is stored
+    compressed (app/code_store.py): the session hooks below, ``index_code``
+    for Core inserts, and ``reindex``. Neither keeps a copy of the text, so
+    snippets are cut from the bug row by ``add_snippets``.
+
+    On SQLite before 3.43, removing a bug's code from the index needs the
+    old code; bugs deleted outside the application leave their code tokens
+    behind until ``flask search reindex``.
+    """
+
+    name = "sqlite-fts5"
+    indexes_code = True
+    # Column weights for bm25(): title, description, ai_notes; code ranks with plain bm25
+    WEIGHTS = "bm25(10.0, 4.0, 2.0)"
+    SNIPPET_COLUMNS = ("fts_title", "fts_description", "fts_ai_notes")
+
+    @staticmethod
+    def installed(connection):
+        return connection.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bug_fts_code'")
+        ).first() is not None
+
+    @staticmethod
+    def needs_old_code(connection):
+        # Decided by how the table was created, not by the library in use now
+        sql = connection.execute(
+            db.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'bug_fts_code'")
+        ).scalar()
+        return sql is not None and "contentless_delete" not in sql
+
+    def install(self, connection):
+        exists = self.installed(connection)
+        for statement in _sqlite_ddl(sqlite3.sqlite_version_info >= (3, 43, 0)):
+            connection.execute(db.text(statement))
+        return not exists
+
+    def reindex(self, connection, chunk_size=500):
+        connection.execute(db.text("INSERT INTO bug_fts(bug_fts) VALUES ('delete-all')"))
+        connection.execute(db.text("INSERT INTO bug_fts_code(bug_fts_code) VALUES ('delete-all')"))
+        connection.execute(db.text(
+            "INSERT INTO bug_fts(rowid, title, description, ai_notes) SELECT id, title, description, ai_notes FROM bug"
+        ))
+        last_id = 0
+        while True:
+            rows = code_rows(connection, last_id, chunk_size)
+            if not rows:
+                break
+            self.index_code(connection, rows)
+            last_id = rows[-1][0]
+        connection.execute(db.text("INSERT INTO bug_fts(bug_fts) VALUES ('optimize')"))
+        connection.execute(db.text("INSERT INTO bug_fts_code(bug_fts_code) VALUES ('optimize')"))
+
+    def index_code(self, connection, rows):
+        """Index the code of (bug_id, code) rows not in the index yet."""
+        connection.execute(
+            db.text("INSERT INTO bug_fts_code(rowid, original_code) VALUES (:id, :code)"),
+            [{"id": bug_id, "code": code} for bug_id, code in rows],
+        )
+
+    def unindex_code(self, connection, rows):
+        """Remove (bug_id, old code) rows; the triggers do it when the table supports DELETE."""
+        if self.needs_old_code(connection):
+            connection.execute(
+                db.text("INSERT INTO bug_fts_code(bug_fts_code, rowid, original_code) VALUES ('delete', :id, :code)"),
+                [{"id": bug_id, "code": code} for bug_id, code in rows],
+            )
+
+    @staticmethod
+    def match_expression(text):
+        """Quote each word so user input cannot inject FTS5 syntax; the last word is a prefix."""
+        words = WORD.findall(text or "")
+        if not words:
+            return None
+        terms = ['"%s"' % w for w in words]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def _hits(self, expression, ranked=True, cutoff=None):
+        """Ids of bugs whose text or code matches, with their bm25 rank when ``ranked``."""
+        selects = []
+        for name, weights in (("bug_fts", self.WEIGHTS), ("bug_fts_code", None)):
+            fts = db.table(name, db.column("rowid"), db.column("rank"))
+            select = db.select(fts.c.rowid.label("id"), *([fts.c.rank.label("rank")] if ranked else []))
+            select = select.where(db.literal_column(name).op("MATCH")(expression))
+            if ranked and weights:
+                # Setting rank lets FTS5 compute weighted bm25 inside the virtual table
+                select = select.where(fts.c.rank.op("MATCH")(weights))
+            if cutoff is not None:
+                select = select.where(fts.c.rowid >= cutoff)
+            selects.append(select)
+        return (db.union_all if ranked else db.union)(*selects).subquery("hits")
+
+    def match(self, query, text):
+        expression = self.match_expression(text)
+        if expression is None:
+            return None
+
+        cutoff = None
+        if self.rank_window:
+            # bm25 is computed for every match before sorting; for very common terms
+            # rank only the newest matches. Walking rowids newest-first is cheap in FTS5.
+            hits = self._hits(expression, ranked=False)
+            cutoff = db.session.execute(
+                query.join(hits, hits.c.id == Bug.id)
+                .with_only_columns(hits.c.id)
+                .order_by(hits.c.id.desc())
+                .offset(self.rank_window - 1)
+                .limit(1)
+            ).scalar()
+
+        hits = self._hits(expression, cutoff=cutoff)
+        best = db.select(hits.c.id, db.func.min(hits.c.rank).label("rank")).group_by(hits.c.id).subquery("best")
+        return (
+            query.join(best, best.c.id == Bug.id)
+            .add_columns(*(column.label(label) for column, label in zip(
+                (Bug.title, Bug.description, Bug.ai_notes), self.SNIPPET_COLUMNS)))
+            .order_by(best.c.rank, Bug.id.desc())
+        )
+
+    def add_snippets(self, rows, text):
+        words = [w.casefold() for w in WORD.findall(text or "")]
+        results = []
+        for row in rows:
+            fields = row._asdict()
+            texts = [fields.pop(column) for column in self.SNIPPET_COLUMNS]
+            fields["snippet"] = make_snippet(words, *texts)
+            results.append(fields)
+        if not results:
+            return []
+        result_type = namedtuple("SearchResult", list(results[0]))
+        return [result_type(**fields) for fields in results]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Weighted tsvector generated column with a GIN index."""
+
+    name = "postgres-tsvector"
+    CONFIG = "english"
+
+    DDL = [
+        # Code is compressed in code_blob, which a generated column cannot read
+        """ALTER TABLE bug ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(ai_notes, '')), 'C')
+        ) STORED""",
+        "CREATE INDEX IF NOT EXISTS ix_bug_search_vector ON bug USING GIN (search_vector)",
+    ]
+
+    @staticmethod
+    def installed(connection):
+        return connection.execute(db.text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'bug' AND column_name = 'search_vector'"
+        )).first() is not None
+
+    def install(self, connection):
+        exists = self.installed(connection)
+        for statement in self.DDL:
+            connection.execute(db.text(statement))
+        return not exists
+
+    def reindex(self, connection):
+        # The generated column is always current; rebuilding the index compacts it
+        connection.execute(db.text("REINDEX INDEX ix_bug_search_vector"))
+
+    def match(self, query, text):
+        if not WORD.search(text or ""):
+            return None
+        vector = db.literal_column("bug.search_vector")
+        tsquery = db.func.websearch_to_tsquery(self.CONFIG, text)
+        document = db.func.concat_ws(" ", Bug.title, Bug.description, Bug.ai_notes)
+        if self.rank_window:
+            newest = (
+                query.with_only_columns(Bug.id)
+                .where(vector.op("@@")(tsquery))
+                .order_by(Bug.id.desc())
+                .offset(self.rank_window - 1)
+                .limit(1)
+                .correlate(None)
+                .scalar_subquery()
+            )
+            query = query.where(Bug.id >= db.func.coalesce(newest, 0))
+        snippet = db.func.ts_headline(
+            self.CONFIG, document, tsquery,
+            f"StartSel={MARK_START}, StopSel={MARK_END}, MaxFragments=1, MaxWords=24, MinWords=8",
+        )
+        return (
+            query.add_columns(snippet.label("snippet"))
+            .where(vector.op("@@")(tsquery))
+            .order_by(db.func.ts_rank_cd(vector, tsquery).desc(), Bug.id.desc())
+        )
+
+
+# Backends by SQLAlchemy dialect name; register others here
+BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+_installed = set()
+
+def get_backend(engine=None):
+    """Backend for the current database, installing its index on first use in this process."""
+    engine = engine or db.engine
+    backend_cls = BACKENDS.get(engine.dialect.name)
+    if backend_cls is None:
+        raise RuntimeError(f"No search backend for database '{engine.dialect.name}'")
+    backend = backend_cls(current_app.config.get("SEARCH_RANK_WINDOW", 0))
+    key = (engine.url.render_as_string(), backend.name)
+    if key not in _installed:
+        # Tables made with db.create_all() have no index yet; migrations create it
+        with engine.begin() as connection:
+            if backend.install(connection):
+                backend.reindex(connection)
+        _installed.add(key)
+    return backend
+
+# -------------------------
+# Code column of the index
+# -------------------------
+def code_rows(connection, after_id=0, limit=500):
+    """(bug_id, original code) for the next ``limit`` bugs with code after ``after_id``, in id order."""
+    blob = db.aliased(CodeBlob, name="blob")
+    base = db.aliased(CodeBlob, name="base")
+    rows = connection.execute(
+        db.select(Bug.id, blob.codec, blob.data, base.codec, base.data)
+        .join(blob, blob.hash == Bug.original_code_hash)
+        .outerjoin(base, base.hash == blob.base_hash)
+        .where(Bug.id > after_id)
+        .order_by(Bug.id)
+        .limit(limit)
+    ).all()
+    return [(bug_id, inflate(*encoded)) for bug_id, *encoded in rows]
+
+class SearchIndex:
+    """
+    Writes bug code into the search index from the session, for backends
+    whose database cannot read compressed code itself. ORM writes are
+    picked up at flush time; Core inserts call ``index_code``.
+    """
+
+    def init_app(self, app):
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["search_index"] = self
+
+    @staticmethod
+    def backend_for(connection):
+        """The code-indexing backend installed on ``connection``, or None."""
+        backend_cls = BACKENDS.get(connection.dialect.name)
+        if backend_cls is None or not backend_cls.indexes_code or not backend_cls.installed(connection):
+            return None
+        return backend_cls()
+
+    def index_code(self, session, rows):
+        """Index (bug_id, code) rows for bugs inserted in this transaction."""
+        rows = list(rows)
+        backend = self.backend_for(session.connection()) if rows else None
+        if backend is not None:
+            backend.index_code(session.connection(), rows)
+
+
+search_index = SearchIndex()
+
+def _collect_code_changes(session, flush_context, instances):
+    from app.code_store import code_store
+    from app.stats import committed_value
+
+    added = session.info.setdefault("search_code_added", [])
+    removed = session.info.setdefault("search_code_removed", [])
+    old_hashes = []
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Bug) and obj.original_code_hash:
+                added.append(obj)
+        for obj in session.deleted:
+            if isinstance(obj, Bug):
+                old_hashes.append((obj.id, committed_value(obj, "original_code_hash")))
+        for obj in session.dirty:
+            if isinstance(obj, Bug) and obj not in session.deleted \
+                    and inspect(obj).attrs.original_code_hash.history.has_changes():
+                old_hashes.append((obj.id, committed_value(obj, "original_code_hash")))
+                if obj.original_code_hash:
+                    added.append(obj)
+        old_hashes = [(bug_id, digest) for bug_id, digest in old_hashes if digest]
+        if old_hashes:
+            backend = search_index.backend_for(session.connection())
+            if backend is not None and backend.needs_old_code(session.connection()):
+                # Read now: the flush may delete blobs nothing refers to any more
+                codes = code_store.get_many(digest for _, digest in old_hashes)
+                removed.extend((bug_id, codes[digest]) for bug_id, digest in old_hashes if digest in codes)
+
+def _index_code_changes(session, flush_context):
+    removed = session.info.pop("search_code_removed", None)
+    added = session.info.pop("search_code_added", None)
+    if not removed and not added:
+        return
+    backend = search_index.backend_for(session.connection())
+    if backend is None:
+        return
+    if removed:
+        backend.unindex_code(session.connection(), removed)
+    if added:
+        backend.index_code(session.connection(), [(bug.id, bug.original_code) for bug in added])
+
+def _discard_code_changes(session, previous_transaction):
+    session.info.pop("search_code_added", None)
+    session.info.pop("search_code_removed", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_code_changes),
+    ("after_flush", _index_code_changes),
+    ("after_soft_rollback", _discard_code_changes),
+)
+
+# -------------------------
+# Search entry point
+# -------------------------
+def search_bugs(text, project_id=None, status=None, severity=None, scope=None, limit=20, offset=0):
+    """
+    Ranked bugs matching ``text`` as a list of rows (id, title, status,
+    severity, created_at, project_name, snippet). ``scope`` (an
+    AccessScope) limits the results to bugs its user may see.
+    """
+    query = (
+        db.select(
+            Bug.id, Bug.title, Bug.status, Bug.severity, Bug.created_at,
+            Project.name.label("project_name"),
+        )
+        .select_from(Bug)
+        .outerjoin(Project, Bug.project_id == Project.id)
+    )
+    if scope is not None:
+        query = scope.apply(query)
+    if project_id:
+        query = query.where(Bug.project_id == project_id)
+    if status:
+        query = query.where(Bug.status == status)
+    if severity:
+        query = query.where(Bug.severity == severity)
+
+    backend = get_backend()
+    query = backend.match(query, text)
+    if query is None:
+        return []
+    return backend.add_snippets(db.session.execute(query.limit(limit).offset(offset)).all(), text)
+
+# -------------------------
+# CLI: flask search ...
+# -------------------------
+search_cli = AppGroup("search", help="Full-text search index.")
+
+@search_cli.command("reindex")
+@with_appcontext
+def reindex_command():
+    """Create the search index if needed and rebuild it from the bug table."""
+    backend = get_backend()
+    with db.engine.begin() as connection:
+        backend.install(connection)
+        backend.reindex(connection)
+    count = db.session.execute(db.select(db.func.count(Bug.id))).scalar()
+    click.echo(f"Reindexed {count} bug(s) with {backend.name}.")
@@ -29,6 +29,33 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Suggest existing near-duplicate bugs while a report is written
+    const duplicatePanel = document.getElementById('duplicate-candidates');
+    if (duplicatePanel) {
+        let duplicateTimeout;
+        ['description', 'code_snippet'].forEach(function(id) {
+            const field = document.getElementById(id);
+            if (!field) {
+                return;
+            }
+            field.addEventListener('input', function() {
+                clearTimeout(duplicateTimeout);
+                duplicateTimeout = setTimeout(function() {
+                    checkDuplicates(duplicatePanel);
+                }, 1000);
+            });
+        });
+    }
+
+    // Live updates over Server-Sent Events; AI analysis status is polled without them
+    const liveEvents = document.querySelector('[data-events-url]');
+    const analysisStatus = document.getElementById('analysis-status');
+    if (liveEvents && window.EventSource) {
+        subscribeLiveEvents(liveEvents, analysisStatus);
+    } else if (analysisStatus) {
+        pollAnalysisStatus(analysisStatus.dataset.statusUrl);
+    }
+
     // Form validation enhancements
     const forms = document.querySelectorAll('form');
     forms.forEach(function(form) {
@@ -85,17 +112,199 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
-// Function to analyze code (placeholder for AI integration)
+// Incremental analysis session for the live code editor (the report form's #code_snippet;
+// base.html loads this file on every page). Only the changed line range is sent; the
+// server keeps the rest.
+const editorSession = {
+    docId: Math.random().toString(36).slice(2) + Date.now().toString(36),
+    version: 0,
+    lines: null,
+    inFlight: false,
+    queued: null
+};
+
+// Smallest line range that turns oldLines into newLines
+function diffLines(oldLines, newLines) {
+    let start = 0;
+    const shortest = Math.min(oldLines.length, newLines.length);
+    while (start < shortest && oldLines[start] === newLines[start]) {
+        start++;
+    }
+    let oldEnd = oldLines.length;
+    let newEnd = newLines.length;
+    while (oldEnd > start && newEnd > start && oldLines[oldEnd - 1] === newLines[newEnd - 1]) {
+        oldEnd--;
+        newEnd--;
+    }
+    return {start: start, end: oldEnd, lines: newLines.slice(start, newEnd)};
+}
+
 function analyzeCode(code) {
-    console.log('Analyzing code:', code.substring(0, 50) + '...');
-    
-    // This would be replaced with an actual API call to your backend
-    // For now, we'll just simulate analysis
-    const issues = detectCommonIssues(code);
-    
-    if (issues.length > 0) {
-        showNotification(`Detected ${issues.length} potential issue(s) in your code`, 'info');
+    if (editorSession.inFlight) {
+        editorSession.queued = code;
+        return;
+    }
+
+    const lines = code.split('\n');
+    const descriptionField = document.getElementById('description');
+    const payload = {
+        doc_id: editorSession.docId,
+        version: editorSession.version + 1,
+        description: descriptionField ? descriptionField.value : ''
+    };
+    if (editorSession.lines === null) {
+        payload.text = code;
+    } else {
+        const diff = diffLines(editorSession.lines, lines);
+        if (diff.start === diff.end && diff.lines.length === 0) {
+            return;
+        }
+        payload.base_version = editorSession.version;
+        payload.start = diff.start;
+        payload.end = diff.end;
+        payload.lines = diff.lines;
+    }
+
+    editorSession.inFlight = true;
+    fetch('/api/analyze_code/incremental', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(payload)
+    }).then(function(response) {
+        if (response.status === 409) {
+            // Server lost our state (expired or another worker); resend everything
+            editorSession.lines = null;
+            if (editorSession.queued === null) {
+                editorSession.queued = code;
+            }
+            return null;
+        }
+        return response.json();
+    }).then(function(result) {
+        if (result && result.version) {
+            editorSession.version = result.version;
+            editorSession.lines = lines;
+            if (result.rules.length > 0) {
+                showNotification(`Detected ${result.rules.length} potential issue(s) in your code`, 'info');
+            }
+        }
+    }).catch(function() {
+        // Fall back to local checks when the server is unreachable
+        editorSession.lines = null;
+        const issues = detectCommonIssues(code);
+        if (issues.length > 0) {
+            showNotification(`Detected ${issues.length} potential issue(s) in your code`, 'info');
+        }
+    }).finally(function() {
+        editorSession.inFlight = false;
+        if (editorSession.queued !== null) {
+            const next = editorSession.queued;
+            editorSession.queued = null;
+            analyzeCode(next);
+        }
+    });
+}
+
+// Ask the server for near-duplicates of the report being written and list them in the panel
+function checkDuplicates(panel) {
+    const description = document.getElementById('description').value;
+    const codeField = document.getElementById('code_snippet');
+    const code = codeField ? codeField.value : '';
+    if (description.length + code.length < 20) {
+        panel.hidden = true;
+        return;
     }
+
+    fetch(panel.dataset.url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({description: description, code: code})
+    })
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+            const list = panel.querySelector('ul');
+            list.innerHTML = '';
+            (data.duplicates || []).forEach(function(bug) {
+                const item = document.createElement('li');
+                const link = document.createElement('a');
+                link.href = bug.url;
+                link.textContent = bug.title;
+                item.appendChild(link);
+                item.appendChild(document.createTextNode(
+                    ' - ' + bug.status + ' (' + Math.round(bug.similarity * 100) + '% similar' +
+                    (bug.has_fix ? ', fix available' : '') + ')'
+                ));
+                list.appendChild(item);
+            });
+            panel.hidden = list.children.length === 0;
+        })
+        .catch(function() {
+            panel.hidden = true;
+        });
+}
+
+// Live bug updates from /api/events. Pages marked data-events-refresh="panels" swap in
+// their [data-live-panel] elements from a fresh copy of the page; others reload, which
+// is a cheap 304 when nothing on the page changed. Bursts collapse into one refresh.
+function subscribeLiveEvents(element, analysisStatus) {
+    const source = new EventSource(element.dataset.eventsUrl);
+    let refreshTimeout = null;
+
+    source.onmessage = function() {
+        if (refreshTimeout) {
+            return;
+        }
+        refreshTimeout = setTimeout(function() {
+            refreshTimeout = null;
+            if (element.dataset.eventsRefresh === 'panels') {
+                refreshPanels();
+            } else {
+                window.location.reload();
+            }
+        }, 1000);
+    };
+    // Events were dropped for this tab; start over from the current state
+    source.addEventListener('resync', function() {
+        source.close();
+        window.location.reload();
+    });
+    source.onerror = function() {
+        // Closed for good (e.g. events disabled): fall back to polling
+        if (source.readyState === EventSource.CLOSED && analysisStatus) {
+            pollAnalysisStatus(analysisStatus.dataset.statusUrl);
+        }
+    };
+}
+
+function refreshPanels() {
+    fetch(window.location.href, {headers: {'Accept': 'text/html'}})
+        .then(function(response) { return response.text(); })
+        .then(function(html) {
+            const fresh = new DOMParser().parseFromString(html, 'text/html');
+            document.querySelectorAll('[data-live-panel]').forEach(function(panel) {
+                const replacement = fresh.querySelector('[data-live-panel="' + panel.dataset.livePanel + '"]');
+                if (replacement) {
+                    panel.innerHTML = replacement.innerHTML;
+                }
+            });
+        })
+        .catch(function() {});
+}
+
+// Poll the analysis status endpoint until the background job settles
+function pollAnalysisStatus(url) {
+    fetch(url, {headers: {'Accept': 'application/json'}})
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+            if (data.job_status === 'queued' || data.job_status === 'running') {
+                setTimeout(function() { pollAnalysisStatus(url); }, 2000);
+            } else {
+                window.location.reload();
+            }
+        })
+        .catch(function() {
+            setTimeout(function() { pollAnalysisStatus(url); }, 5000);
+        });
 }
 
 // Simple pattern detection for common code issues
@@ -156,21 +365,29 @@ document.addEventListener('keydown', function(e) {
         }
     }
     
-    // Escape key to clear forms
+    // Escape key clears a search box; other fields keep what was typed
     if (e.key === 'Escape') {
-        const focusedInput = document.querySelector('input:focus, textarea:focus');
+        const focusedInput = document.querySelector('input[type="search"]:focus');
         if (focusedInput) {
             focusedInput.value = '';
         }
     }
 });
 
-// Responsive navigation for mobile devices
+// Responsive navigation for mobile devices; runs on every resize, so the
+// menu button is created once and only shown or hidden afterwards
 function setupMobileNavigation() {
     const nav = document.querySelector('nav');
-    if (window.innerWidth < 768 && nav) {
+    if (!nav) {
+        return;
+    }
+    let menuButton = document.getElementById('mobile-menu-button');
+    const mobile = window.innerWidth < 768;
+
+    if (mobile && !menuButton) {
         // Create mobile menu button
-        const menuButton = document.createElement('button');
+        menuButton = document.createElement('button');
+        menuButton.id = 'mobile-menu-button';
         menuButton.textContent = '☰ Menu';
         menuButton.style.position = 'absolute';
         menuButton.style.top = '10px';
@@ -184,9 +401,19 @@ function setupMobileNavigation() {
         
         // Add button to page
         document.body.appendChild(menuButton);
-        
+    }
+
+    if (mobile && menuButton.style.display === 'none') {
+        menuButton.style.display = '';
+    }
+    if (mobile && !nav.dataset.mobile) {
         // Hide navigation by default on mobile
+        nav.dataset.mobile = '1';
         nav.style.display = 'none';
+    } else if (!mobile && nav.dataset.mobile) {
+        delete nav.dataset.mobile;
+        nav.style.display = '';
+        menuButton.style.display = 'none';
     }
 }
 
@@ -0,0 +1,270 @@
+# app/stats.py
+import threading
+import time
+from collections import Counter
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import inspect
+
+from app import db, register_session_listeners
+from app.models import Bug, BugStat, Project
+
+GLOBAL_SCOPE = "global"
+
+# -------------------------
+# Counter keys
+# -------------------------
+def _column_default(column):
+    default = Bug.__table__.c[column].default
+    return default.arg if default is not None else None
+
+def _bug_keys(project_id, status, severity):
+    scopes = [GLOBAL_SCOPE]
+    if project_id:
+        scopes.append(f"project:{project_id}")
+    keys = []
+    for scope in scopes:
+        keys.append((scope, "total", ""))
+        keys.append((scope, "status", status or ""))
+        keys.append((scope, "severity", severity or ""))
+    return keys
+
+def committed_value(bug, attr):
+    """Committed value of ``attr`` before this flush."""
+    history = getattr(inspect(bug).attrs, attr).history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    # Attribute was expired and overwritten without loading; read the stored value
+    return db.session.execute(
+        db.select(getattr(Bug, attr)).where(Bug.id == bug.id)
+    ).scalar()
+
+# -------------------------
+# Flush-time maintenance
+# -------------------------
+def _collect_deltas(session, flush_context, instances):
+    deltas = session.info.setdefault("bug_stat_deltas", Counter())
+
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Bug):
+                for key in _bug_keys(
+                    obj.project_id,
+                    obj.status or _column_default("status"),
+                    obj.severity or _column_default("severity"),
+                ):
+                    deltas[key] += 1
+            elif isinstance(obj, Project):
+                deltas[(GLOBAL_SCOPE, "projects", "")] += 1
+
+        for obj in session.deleted:
+            if isinstance(obj, Bug):
+                for key in _bug_keys(committed_value(obj, "project_id"), committed_value(obj, "status"),
+                                     committed_value(obj, "severity")):
+                    deltas[key] -= 1
+            elif isinstance(obj, Project):
+                deltas[(GLOBAL_SCOPE, "projects", "")] -= 1
+
+        for obj in session.dirty:
+            if not isinstance(obj, Bug) or not session.is_modified(obj):
+                continue
+            state = inspect(obj)
+            if not any(getattr(state.attrs, a).history.has_changes()
+                       for a in ("project_id", "status", "severity")):
+                continue
+            old = (committed_value(obj, "project_id"), committed_value(obj, "status"), committed_value(obj, "severity"))
+            new = (obj.project_id, obj.status, obj.severity)
+            for key in _bug_keys(*old):
+                deltas[key] -= 1
+            for key in _bug_keys(*new):
+                deltas[key] += 1
+
+def _apply_deltas(session, flush_context):
+    deltas = session.info.pop("bug_stat_deltas", None)
+    rows = [
+        {"scope": scope, "dimension": dimension, "value": value, "count": count}
+        for (scope, dimension, value), count in (deltas or {}).items() if count
+    ]
+    if not rows:
+        return
+    apply_counter_deltas(session.connection(), rows)
+    session.info["bug_stats_changed"] = True
+
+def apply_counter_deltas(connection, rows):
+    """Upsert ``count = count + delta`` for each row in one executemany."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = BugStat.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.scope, table.c.dimension, table.c.value],
+        set_={"count": table.c.count + stmt.excluded["count"]},
+    )
+    connection.execute(stmt, rows)
+
+def count_inserted_bugs(session, bugs):
+    """
+    Add counters for bugs inserted with Core statements, which bypass the
+    flush hooks. ``bugs`` are (project_id, status, severity) tuples.
+    """
+    deltas = Counter()
+    for project_id, status, severity in bugs:
+        for key in _bug_keys(project_id, status or _column_default("status"),
+                             severity or _column_default("severity")):
+            deltas[key] += 1
+    if not deltas:
+        return
+    apply_counter_deltas(session.connection(), [
+        {"scope": scope, "dimension": dimension, "value": value, "count": count}
+        for (scope, dimension, value), count in deltas.items()
+    ])
+    session.info["bug_stats_changed"] = True
+
+def _after_commit(session):
+    if session.info.pop("bug_stats_changed", False):
+        bug_stats.invalidate()
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("bug_stat_deltas", None)
+    session.info.pop("bug_stats_changed", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_deltas),
+    ("after_flush", _apply_deltas),
+    ("after_commit", _after_commit),
+    ("after_soft_rollback", _after_rollback),
+)
+
+# -------------------------
+# Read side with a TTL cache
+# -------------------------
+class BugStats:
+    """Reads counters from bug_stat, cached in-process for a few seconds."""
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get("STATS_CACHE_TTL", self.ttl)
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["bug_stats"] = self
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def snapshot(self, scope=GLOBAL_SCOPE):
+        """Counts for one scope as {'total', 'projects', 'status': {...}, 'severity': {...}}."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(scope)
+            if cached and now - cached[0] < self.ttl:
+                return cached[1]
+
+        rows = db.session.execute(
+            db.select(BugStat.dimension, BugStat.value, BugStat.count).where(BugStat.scope == scope)
+        ).all()
+        result = {"total": 0, "projects": 0, "status": {}, "severity": {}}
+        for dimension, value, count in rows:
+            if dimension in ("total", "projects"):
+                result[dimension] = count
+            else:
+                result[dimension][value] = count
+
+        with self._lock:
+            self._cache[scope] = (now, result)
+        return result
+
+    def project_snapshot(self, project_id):
+        return self.snapshot(f"project:{project_id}")
+
+    def scope_snapshot(self, access_scope):
+        """
+        Counts an AccessScope may see: everything for admins, otherwise the
+        counters of the user's team projects (one IN query over bug_stat)
+        plus the bugs they reported anywhere else (one query on
+        ix_bug_created_by_created_at). Not cached: both parts are per user.
+        """
+        if access_scope.is_admin:
+            return self.snapshot()
+        project_ids = sorted(access_scope.project_ids)
+        result = {"total": 0, "projects": len(project_ids), "status": Counter(), "severity": Counter()}
+        if project_ids:
+            rows = db.session.execute(
+                db.select(BugStat.dimension, BugStat.value, db.func.sum(BugStat.count))
+                .where(BugStat.scope.in_([f"project:{project_id}" for project_id in project_ids]),
+                       BugStat.dimension.in_(("total", "status", "severity")))
+                .group_by(BugStat.dimension, BugStat.value)
+            ).all()
+            for dimension, value, count in rows:
+                if dimension == "total":
+                    result["total"] += count
+                else:
+                    result[dimension][value] += count
+
+        elsewhere = Bug.created_by == access_scope.user_id
+        if project_ids:
+            elsewhere = db.and_(elsewhere, db.or_(Bug.project_id.is_(None), Bug.project_id.not_in(project_ids)))
+        rows = db.session.execute(
+            db.select(Bug.project_id, Bug.status, Bug.severity, db.func.count())
+            .where(elsewhere)
+            .group_by(Bug.project_id, Bug.status, Bug.severity)
+        ).all()
+        other_projects = set()
+        for project_id, status, severity, count in rows:
+            result["total"] += count
+            result["status"][status or ""] += count
+            result["severity"][severity or ""] += count
+            if project_id:
+                other_projects.add(project_id)
+        result["projects"] += len(other_projects)
+        result["status"] = dict(result["status"])
+        result["severity"] = dict(result["severity"])
+        return result
+
+bug_stats = BugStats()
+
+# -------------------------
+# Rebuild from scratch
+# -------------------------
+def rebuild_stats():
+    """Recalculate every counter from the bug and project tables in one transaction."""
+    db.session.execute(db.delete(BugStat))
+    rows = Counter()
+    grouped = db.session.execute(
+        db.select(Bug.project_id, Bug.status, Bug.severity, db.func.count())
+        .group_by(Bug.project_id, Bug.status, Bug.severity)
+    ).all()
+    for project_id, status, severity, count in grouped:
+        for key in _bug_keys(project_id, status, severity):
+            rows[key] += count
+    projects = db.session.execute(db.select(db.func.count(Project.id))).scalar()
+    if projects:
+        rows[(GLOBAL_SCOPE, "projects", "")] = projects
+
+    if rows:
+        db.session.execute(db.insert(BugStat), [
+            {"scope": s, "dimension": d, "value": v, "count": c} for (s, d, v), c in rows.items()
+        ])
+    db.session.commit()
+    bug_stats.invalidate()
+    return len(rows)
+
+# -------------------------
+# CLI: flask stats ...
+# -------------------------
+stats_cli = AppGroup("stats", help="Materialized dashboard statistics.")
+
+@stats_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Recalculate bug counters from the bug table."""
+    count = rebuild_stats()
+    click.echo(f"Rebuilt {count} counter row(s).")
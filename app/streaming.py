@@ -0,0 +1,399 @@
+# app/streaming.py
+import codecs
+import tempfile
+
+from app.ai_engine import classify_description
+from app.rewrite_engine import (
+    ANY_RULE, AppendRule, DEFAULT_RULES, DuplicateIdRule, TokenRule, TokenScanner,
+    apply_edits,
+)
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MEMORY_LIMIT = 1024 * 1024
+# id="..." values are planned in memory, so a pass tracks at most this many
+MAX_STREAM_IDS = 50000
+# ...each at most this long
+MAX_STREAM_ID_LENGTH = 4096
+# Uploads are spooled to disk, so their size is capped as well
+MAX_STREAM_BYTES = 64 * 1024 * 1024
+
+
+class StreamLimitError(ValueError):
+    """The upload needs more in-memory state than the streaming limits allow."""
+
+# -------------------------
+# Input helpers
+# -------------------------
+def iter_decoded(stream, chunk_size=CHUNK_SIZE, max_bytes=None):
+    """
+    Read a binary stream in fixed-size blocks and yield decoded UTF-8 text.
+    Raises StreamLimitError once more than ``max_bytes`` have been read.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    total = 0
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        total += len(data)
+        if max_bytes is not None and total > max_bytes:
+            raise StreamLimitError(f"upload larger than {max_bytes} bytes")
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class Spool:
+    """Text written once in chunks and replayed as often as needed; spills to disk."""
+
+    def __init__(self, memory_limit=SPOOL_MEMORY_LIMIT, chunk_size=CHUNK_SIZE):
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=memory_limit, mode="w+", encoding="utf-8", newline=""
+        )
+        self.chunk_size = chunk_size
+        self.length = 0
+
+    def write(self, text):
+        self._file.write(text)
+        self.length += len(text)
+
+    def chunks(self):
+        self._file.seek(0)
+        while True:
+            text = self._file.read(self.chunk_size)
+            if not text:
+                return
+            yield text
+
+    def read_all(self):
+        self._file.seek(0)
+        return self._file.read()
+
+    def close(self):
+        self._file.close()
+
+# -------------------------
+# Streaming id="..." matcher
+# -------------------------
+class IdValueTracker:
+    """
+    Incremental equivalent of ``re.findall(r'id="(.*?)"', text)``.
+    Calls ``on_match(index, value, quote_offset)`` for each match, where
+    ``quote_offset`` is the closing quote's position in the current chunk.
+    A value longer than ``max_length`` is not buffered: it raises
+    StreamLimitError if its closing quote arrives, and is dropped like any
+    other candidate if a newline comes first.
+    """
+
+    def __init__(self, on_match, max_length=None):
+        self.on_match = on_match
+        self.max_length = max_length
+        self.count = 0
+        self._tail = ""
+        self._value = None  # list of parts while inside a value
+        self._length = 0
+
+    def feed(self, chunk):
+        i = 0
+        while True:
+            if self._value is not None:
+                q = chunk.find('"', i)
+                newline = chunk.find("\n", i, q if q != -1 else len(chunk))
+                if newline != -1:
+                    # Unterminated on this line: the regex retries after the newline
+                    self._value = None
+                    i = newline + 1
+                    continue
+                part = chunk[i:] if q == -1 else chunk[i:q]
+                self._length += len(part)
+                if self.max_length is None or self._length <= self.max_length:
+                    self._value.append(part)
+                elif self._value:
+                    self._value = []
+                if q == -1:
+                    return
+                if self.max_length is not None and self._length > self.max_length:
+                    raise StreamLimitError(f"an id value longer than {self.max_length} characters")
+                self.on_match(self.count, "".join(self._value), q)
+                self.count += 1
+                self._value = None
+                i = q + 1
+                continue
+
+            buf = self._tail + chunk[i:]
+            p = buf.find('id="')
+            if p == -1:
+                self._tail = buf[-3:]
+                return
+            i += p + 4 - len(self._tail)
+            self._tail = ""
+            self._value = []
+            self._length = 0
+
+# -------------------------
+# Streaming rewrite engine
+# -------------------------
+class _Facts:
+    """Token presence over a whole stream, in the shape TokenRule.applies expects."""
+
+    def __init__(self, present, ids):
+        self.present = present
+        self.ids = ids
+
+    def has(self, token):
+        return token in self.present
+
+
+class StreamingRewriteEngine:
+    """
+    Runs the same ordered rules as RewriteEngine over a replayable stream.
+
+    Each engine pass reads its input twice: once to collect token presence
+    and id values (the rules' conditions are whole-text), then again to emit
+    edits window by window. Windows hold back ``max token length - 1``
+    characters so tokens split across chunks are still found. Intermediate
+    pass output goes to a Spool; the last pass is streamed to the caller.
+
+    Two things are still held in memory and are therefore capped: the id
+    values of a pass (at most ``max_ids``, each at most ``max_id_length``
+    characters) and, for the rare input whose id values run into the next
+    attribute, the whole text (at most ``memory_limit`` characters). Beyond
+    any of these, ``run`` raises StreamLimitError before any output is
+    produced.
+    """
+
+    def __init__(self, rules, memory_limit=SPOOL_MEMORY_LIMIT, chunk_size=CHUNK_SIZE, max_ids=MAX_STREAM_IDS,
+                 max_id_length=MAX_STREAM_ID_LENGTH):
+        for rule in rules:
+            if not isinstance(rule, (TokenRule, DuplicateIdRule)):
+                raise TypeError(f"Rule {rule.name!r} does not support streaming")
+        self.rules = list(rules)
+        self.scanner = TokenScanner(t for rule in self.rules for t in rule.tokens)
+        self.overlap = max(len(t) for t in self.scanner.tokens) - 1
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.max_ids = max_ids
+        self.max_id_length = max_id_length
+
+    def _new_spool(self):
+        return Spool(self.memory_limit, self.chunk_size)
+
+    # -------------------------
+    # Phase 1: facts
+    # -------------------------
+    def _collect(self, chunks, track_ids):
+        present = set()
+        ids = []
+
+        def on_match(index, value, q):
+            if index >= self.max_ids:
+                raise StreamLimitError(f"more than {self.max_ids} id attributes")
+            ids.append(value)
+
+        tracker = IdValueTracker(on_match, self.max_id_length) if track_ids else None
+        carry = ""
+        for chunk in chunks:
+            buf = carry + chunk
+            for match in self.scanner.pattern.finditer(buf):
+                token = match.group(1)
+                present.add(token)
+                present.update(self.scanner.prefixes[token])
+            carry = buf[-self.overlap:] if self.overlap else ""
+            if tracker:
+                tracker.feed(chunk)
+        return _Facts(present, ids)
+
+    # -------------------------
+    # Phase 2: token edits
+    # -------------------------
+    def _emit_tokens(self, chunks, rules):
+        edit_rules = {}
+        appends = []
+        for rule in rules:
+            if isinstance(rule, AppendRule):
+                appends.append(rule)
+            else:
+                edit_rules.setdefault(rule.token, []).append(rule)
+
+        last_end = dict.fromkeys(edit_rules, 0)  # non-overlap bookkeeping per token
+        carry = ""
+        offset = 0  # absolute position of carry[0]
+        source = iter(chunks)
+        final = False
+        while not final:
+            chunk = next(source, None)
+            final = chunk is None
+            buf = carry + (chunk or "")
+            safe = len(buf) if final else max(0, len(buf) - self.overlap)
+
+            edits = []
+            cut = safe
+            for match in self.scanner.pattern.finditer(buf):
+                start = match.start()
+                if start >= safe:
+                    break
+                token = match.group(1)
+                for t in [token] + self.scanner.prefixes[token]:
+                    if t in edit_rules and offset + start >= last_end[t]:
+                        last_end[t] = offset + start + len(t)
+                        cut = max(cut, start + len(t))
+                        edits.extend(rule.edit_at(start) for rule in edit_rules[t])
+            if final:
+                edits.extend(rule.edit_at(len(buf)) for rule in appends)
+
+            out = apply_edits(buf[:cut], edits) if edits else buf[:cut]
+            if out:
+                yield out
+            carry = buf[cut:]
+            offset += cut
+
+    # -------------------------
+    # Phase 2: duplicate id renames
+    # -------------------------
+    def _emit_renames(self, chunks, renamed, names):
+        inserts = []
+
+        def on_match(index, value, q):
+            if index in renamed:
+                # Renames only ever append a suffix, so insert it before the closing quote
+                inserts.append((q, q, renamed[index][len(names[index]):], 0))
+
+        tracker = IdValueTracker(on_match, self.max_id_length)
+        for chunk in chunks:
+            tracker.feed(chunk)
+            yield apply_edits(chunk, inserts) if inserts else chunk
+            inserts.clear()
+
+    # -------------------------
+    # Driver
+    # -------------------------
+    def run(self, spool):
+        """
+        Plan every pass over ``spool`` and return (notes, output_chunks).
+        Intermediate passes are materialised before returning; the final
+        pass is a lazy generator. Spools created here are closed when the
+        generator finishes, or before StreamLimitError propagates.
+        """
+        owned = []
+        try:
+            return self._run(spool, owned)
+        except Exception:
+            for next_spool in owned:
+                next_spool.close()
+            raise
+
+    def _run(self, spool, owned):
+        notes = []
+        fired = set()
+        index = 0
+        source = spool
+
+        while True:
+            track_ids = any(isinstance(r, DuplicateIdRule) for r in self.rules[index:])
+            facts = self._collect(source.chunks(), track_ids)
+
+            pass_rules = []
+            pending_rules = set()
+            rename_plan = None
+            while index < len(self.rules):
+                rule = self.rules[index]
+                if pending_rules and (rule.fresh_after == ANY_RULE or pending_rules.intersection(rule.fresh_after)):
+                    break
+                index += 1
+                if isinstance(rule, DuplicateIdRule):
+                    if not facts.ids:
+                        continue
+                    fired.add(rule.name)
+                    if any(v.endswith("id=") for v in facts.ids):
+                        # Values overlapping the next attribute need the literal replay
+                        text, rule_notes = self._in_memory(rule, source)
+                        notes.extend(rule_notes)
+                        rename_plan = ("text", text)
+                        pending_rules.add(rule.name)
+                        break
+                    renamed, rule_notes = rule.plan(facts.ids)
+                    notes.extend(rule_notes)
+                    if renamed:
+                        rename_plan = ("renames", renamed, facts.ids)
+                        pending_rules.add(rule.name)
+                        break
+                elif rule.applies(facts, fired):
+                    fired.add(rule.name)
+                    notes.append(rule.note)
+                    pass_rules.append(rule)
+                    pending_rules.add(rule.name)
+
+            if rename_plan is None:
+                output = self._emit_tokens(source.chunks(), pass_rules) if pass_rules else source.chunks()
+            elif rename_plan[0] == "text":
+                output = iter([rename_plan[1]])
+            else:
+                output = self._emit_renames(source.chunks(), rename_plan[1], rename_plan[2])
+
+            if index >= len(self.rules):
+                return notes, self._closing(output, owned)
+
+            next_spool = self._new_spool()
+            owned.append(next_spool)
+            for piece in output:
+                next_spool.write(piece)
+            source = next_spool
+
+    def _in_memory(self, rule, source):
+        if source.length > self.memory_limit:
+            raise StreamLimitError(f"id values overlapping attributes in more than {self.memory_limit} characters")
+        text = source.read_all()
+        edits, rule_notes = rule.rewrite(TokenScanner(rule.tokens).scan(text), set())
+        return apply_edits(text, edits), rule_notes
+
+    @staticmethod
+    def _closing(output, spools):
+        try:
+            yield from output
+        finally:
+            for spool in spools:
+                spool.close()
+
+# -------------------------
+# Streaming analysis entry point
+# -------------------------
+def analyze_stream(chunks, description="", memory_limit=SPOOL_MEMORY_LIMIT, chunk_size=CHUNK_SIZE,
+                   max_ids=MAX_STREAM_IDS, max_id_length=MAX_STREAM_ID_LENGTH):
+    """
+    Streaming counterpart of ``analyze_and_fix_code``.
+    Returns (fixed_chunks, notes, severity); ``fixed_chunks`` concatenates
+    to the same text analyze_and_fix_code would return. Raises
+    StreamLimitError for input past the engine's in-memory caps.
+    """
+    spool = Spool(memory_limit, chunk_size)
+    try:
+        for chunk in chunks:
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+
+    matches = classify_description(description or "")
+    if spool.length == 0:
+        spool.close()
+        return iter(()), "No code provided", "Low"
+
+    engine = StreamingRewriteEngine(DEFAULT_RULES, memory_limit, chunk_size, max_ids, max_id_length)
+    try:
+        rule_notes, output = engine.run(spool)
+    except Exception:
+        spool.close()
+        raise
+    fixes = list(matches["templates"]) + rule_notes
+    notes = "\n---\n".join(fixes) if fixes else "No automated fix available."
+
+    def generate():
+        try:
+            yield from output
+        finally:
+            spool.close()
+
+    return generate(), notes, matches["severity"]
@@ -0,0 +1,102 @@
+# app/ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_app_context
+
+# -------------------------
+# Per-process TTL/LRU with a per-request memo
+# -------------------------
+class TTLCache:
+    """
+    Two-level cache keyed by id: a memo on ``g`` (under ``memo_key``) for
+    the current request and a bounded LRU with a short TTL for the process.
+    Subclasses implement ``_load(key)``; a None result is memoised for the
+    request but never kept in the LRU.
+    """
+
+    memo_key = None
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on invalidation so a load that raced with a commit is not cached
+        self._generation = 0
+        self.request_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        memo = g.setdefault(self.memo_key, {}) if has_app_context() else {}
+        if key in memo:
+            with self._lock:
+                self.request_hits += 1
+            return memo[key]
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                memo[key] = entry[1]
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = self._load(key)
+        memo[key] = value
+        if value is not None and self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (now + self.ttl, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return value
+
+    def _load(self, key):
+        raise NotImplementedError
+
+    def invalidate(self, keys=None):
+        """Drop the given keys, or everything when ``keys`` is None."""
+        with self._lock:
+            self._generation += 1
+            if keys is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            else:
+                for key in keys:
+                    if self._entries.pop(key, None) is not None:
+                        self.invalidations += 1
+        if has_app_context():
+            memo = g.get(self.memo_key)
+            if memo:
+                for key in (list(memo) if keys is None else keys):
+                    memo.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.request_hits + self.hits + self.misses
+            return {
+                "request_hits": self.request_hits,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.request_hits + self.hits) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
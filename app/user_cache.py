@@ -0,0 +1,94 @@
+# app/user_cache.py
+from flask_login import UserMixin
+
+from app import db, register_session_listeners
+from app.ttl_cache import TTLCache
+
+# -------------------------
+# Slim user record
+# -------------------------
+class CachedUser(UserMixin):
+    """
+    Detached snapshot of the User columns request handling needs. It is what
+    ``current_user`` holds on authenticated requests; load the ORM User
+    explicitly to change anything.
+    """
+
+    def __init__(self, id, username, name, email, role):
+        self.id = id
+        self.username = username
+        self.name = name
+        self.email = email
+        self.role = role
+
+    @property
+    def is_admin(self):
+        return self.role == "Admin"
+
+    def __repr__(self):
+        return f"<CachedUser {self.id} {self.username}>"
+
+# -------------------------
+# Identity cache for the Flask-Login user_loader
+# -------------------------
+class UserCache(TTLCache):
+    """
+    Two-level cache of CachedUser records by id: a memo on ``g`` for the
+    current request and a bounded LRU with a short TTL for the process.
+
+    Committed changes to a User (role, password or anything else) and
+    deletions invalidate its entry in this process; other processes pick
+    the change up when their entry expires, so the TTL bounds how long a
+    revoked role or changed password can still be honoured elsewhere.
+    """
+
+    memo_key = "_user_cache"
+
+    def __init__(self, ttl=30.0, max_entries=10000):
+        super().__init__(ttl, max_entries)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", self.max_entries)
+        register_session_listeners(_SESSION_LISTENERS)
+        app.extensions["user_cache"] = self
+
+    @staticmethod
+    def _load(user_id):
+        from app.models import User
+
+        row = db.session.execute(
+            db.select(User.id, User.username, User.name, User.email, User.role).where(User.id == user_id)
+        ).first()
+        return CachedUser(*row) if row else None
+
+
+user_cache = UserCache()
+
+# -------------------------
+# Flush-time invalidation
+# -------------------------
+def _collect_changed_users(session, flush_context, instances):
+    from app.models import User
+
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj):
+            changed.add(obj.id)
+
+def _after_commit(session):
+    changed = session.info.pop("changed_user_ids", None)
+    if changed:
+        user_cache.invalidate(changed)
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("changed_user_ids", None)
+
+_SESSION_LISTENERS = (
+    ("before_flush", _collect_changed_users),
+    ("after_commit", _after_commit),
+    ("after_soft_rollback", _after_rollback),
+)
@@ -0,0 +1,11 @@
+"""
+Benchmarks and load tests; everything runs offline against SQLite.
+
+    python benchmarks/run.py                      engine + route suites, JSON report
+    python benchmarks/datagen.py --scale medium   synthetic data in a database
+    python benchmarks/engine.py                   ai_engine microbenchmarks
+    python benchmarks/routes.py                   in-process HTTP route load test
+    python benchmarks/query_plans.py              EXPLAIN QUERY PLAN check of every endpoint
+    python benchmarks/sqlite_write_concurrency.py multi-process write throughput
+    python benchmarks/login_throughput.py         password hashing policies
+"""
@@ -0,0 +1,76 @@
+"""Shared helpers: timing summaries, run metadata and app setup for benchmarks."""
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def summarize(suite, name, samples, **extra):
+    """One result record for a list of per-call durations in seconds."""
+    total = sum(samples)
+    record = {
+        "suite": suite,
+        "name": name,
+        "unit": "ms",
+        "n": len(samples),
+        "min": round(min(samples) * 1000, 4),
+        "median": round(statistics.median(samples) * 1000, 4),
+        "mean": round(total / len(samples) * 1000, 4),
+        "p95": round(percentile(samples, 0.95) * 1000, 4),
+        "max": round(max(samples) * 1000, 4),
+        "ops_per_sec": round(len(samples) / total, 2) if total else None,
+    }
+    record.update(extra)
+    return record
+
+def measure(fn, min_time=0.5, min_runs=5, max_runs=10000):
+    """Call ``fn`` until ``min_time`` seconds and ``min_runs`` calls have passed; return per-call durations."""
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_runs:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= min_runs and time.perf_counter() - started >= min_time:
+            break
+    return samples
+
+def run_metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def make_app(database_url, **config):
+    """
+    Flask app on ``database_url`` with in-process analysis workers off.
+    Config is read from the environment on first import, so call this
+    before anything else imports app.config.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JOB_INPROCESS_WORKERS", "0")
+    os.environ.setdefault("SLOW_REQUEST_MS", "0")
+    from app import create_app
+
+    app = create_app()
+    app.config.update(config)
+    return app
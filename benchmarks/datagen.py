@@ -0,0 +1,250 @@
+"""
+Synthetic data for benchmarks: users, projects, bugs (with code blobs),
+comments and status history, at a configurable scale.
+
+    python benchmarks/datagen.py --database sqlite:////tmp/bench.db --scale medium
+    python benchmarks/datagen.py --database sqlite:////tmp/bench.db --bugs 200000 --skip-signatures
+
+Rows are bulk-inserted; blob reference counts, dashboard counters, the
+search index and duplicate signatures are brought up to date as well,
+so the result looks like data written through the app.
+Every generated user's password is "bench".
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {
+    "tiny": {"users": 5, "projects": 2, "bugs": 200, "comments": 1.0, "history": 1.0, "distinct_code": 40},
+    "small": {"users": 20, "projects": 5, "bugs": 2000, "comments": 2.0, "history": 1.5, "distinct_code": 200},
+    "medium": {"users": 200, "projects": 20, "bugs": 50000, "comments": 2.0, "history": 1.5, "distinct_code": 2000},
+    "large": {"users": 1000, "projects": 50, "bugs": 500000, "comments": 3.0, "history": 2.0, "distinct_code": 10000},
+}
+PASSWORD = "bench"
+CHUNK = 5000
+
+# Code fragments chosen to trigger the auto-fix rules in app/rewrite_engine.py
+FRAGMENTS = [
+    "def load_{n}(path):\n    data = open(path).read()\n    print(data)\n    return data\n",
+    "if user_{n} is None\n    raise ValueError('missing user {n}')\n",
+    "for item in items_{n}\n    total += item.price\n",
+    '<button id="save-{n}" disabled>Save</button>\n',
+    '<div class="modal" id="modal-{n}">\n  <p>Confirm?</p>\n</div>\n',
+    '<form action="/submit/{n}">\n  <input name="email">\n</form>\n',
+    "# TODO_BUG handle retries for {n}\nresponse = requests.get(url_{n}, timeout=None)\n",
+    "async def fetch_{n}(session):\n    result = session.get('/api/{n}')\n    return result\n",
+    "def total_{n}(values):\n    count = len(values)\n    return sum(values) / count\n",
+    "query = \"SELECT * FROM users WHERE name = '\" + name_{n} + \"'\"\ncursor.execute(query)\n",
+]
+COMPONENTS = ["Login page", "Dashboard", "Report form", "Search", "Settings", "API", "Export", "Modal dialog",
+              "Image gallery", "Payment form", "Session handling", "Database layer", "Sync job"]
+PROBLEMS = ["crash", "error", "slow", "typo", "button", "form", "modal", "database", "network", "security",
+            "image", "css", "async", "data loss", "login", "ui"]
+WORDS = ("when saving after clicking the submit button the page shows an error and nothing happens "
+         "the request times out users report it on mobile and desktop since the last deploy intermittently "
+         "with a large payload while offline after a refresh in the admin area").split()
+STATUSES = [("Open", 45), ("In Progress", 20), ("Fixed", 25), ("Closed", 10)]
+SEVERITIES = [("Low", 30), ("Medium", 45), ("High", 25)]
+
+def make_snippet(rng, fragments=1):
+    return "".join(rng.choice(FRAGMENTS).format(n=rng.randint(1, 10 ** 6)) for _ in range(fragments))
+
+def snippet_of_size(size, seed=0):
+    """Deterministic snippet of about ``size`` characters."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        part = rng.choice(FRAGMENTS).format(n=rng.randint(1, 10 ** 6))
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size]
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+def _description(rng):
+    problem = rng.choice(PROBLEMS)
+    words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+    return problem, f"{problem.capitalize()} {words}."
+
+def _count(rng, mean):
+    # Geometric-ish spread around the mean, including zero
+    return round(rng.expovariate(1 / mean)) if mean else 0
+
+# -------------------------
+# Generator
+# -------------------------
+def generate(users=20, projects=5, bugs=2000, comments=2.0, history=1.5, distinct_code=200,
+             code_ratio=0.7, fixed_ratio=0.5, days=365, seed=1, signatures=True, progress=None):
+    """
+    Append synthetic rows to the current app's database and return a count
+    per table. ``comments`` and ``history`` are means per bug.
+    Must run inside an app context.
+    """
+    from app import db
+    from app.activity import backfill_activity
+    from app.ai_engine import analyze_and_fix_code
+    from app.code_store import code_store
+    from app.dedup import reindex_all
+    from app.models import Bug, BugHistory, Comment, Project, Team, User, team_members
+    from app.passwords import password_hasher
+    from app.rollups import rebuild_rollups
+    from app.search import get_backend, search_index
+    from app.stats import rebuild_stats
+
+    progress = progress or (lambda message: None)
+    rng = random.Random(seed)
+    get_backend()  # the search index must exist before bugs are inserted
+
+    def next_id(model):
+        return (db.session.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+    # Users and projects
+    password_hash = password_hasher.hash(PASSWORD)
+    first_user = next_id(User)
+    user_ids = list(range(first_user, first_user + users))
+    db.session.execute(db.insert(User), [
+        {"id": uid, "username": f"bench{uid}", "email": f"bench{uid}@example.com", "name": f"Bench User {uid}",
+         "password_hash": password_hash, "role": "Admin" if i == 0 else "User", "created_at": datetime.utcnow()}
+        for i, uid in enumerate(user_ids)
+    ])
+    first_project = next_id(Project)
+    project_ids = list(range(first_project, first_project + projects))
+    db.session.execute(db.insert(Project), [
+        {"id": pid, "name": f"Project {pid}", "description": f"Synthetic project {pid}",
+         "created_at": datetime.utcnow()}
+        for pid in project_ids
+    ])
+    # One team per project; every user but the admin joins one or two of them
+    first_team = next_id(Team)
+    team_ids = list(range(first_team, first_team + projects))
+    db.session.execute(db.insert(Team), [
+        {"id": tid, "name": f"Team {pid}", "project_id": pid} for tid, pid in zip(team_ids, project_ids)
+    ])
+    memberships = {(tid, uid) for uid in user_ids[1:] for tid in rng.sample(team_ids, min(len(team_ids), 2))}
+    if memberships:
+        db.session.execute(db.insert(team_members), [{"team_id": t, "user_id": u} for t, u in sorted(memberships)])
+    db.session.commit()
+    progress(f"{users} users, {projects} projects, {len(memberships)} team memberships")
+
+    # Code pool: distinct snippets of varied size, half with a stored fix
+    pool = []
+    for _ in range(distinct_code):
+        code = make_snippet(rng, fragments=min(int(rng.paretovariate(1.2)), 60))
+        original = code_store.put(code)
+        fixed_code, notes, _ = analyze_and_fix_code(code, "")
+        fixed = code_store.put(fixed_code, base_hash=original) if fixed_code != code else original
+        pool.append((original, fixed, notes, code))
+    db.session.commit()
+    progress(f"{len(pool)} distinct code blobs")
+
+    # Bugs, comments and history, oldest first so ids follow created_at
+    start = datetime.utcnow() - timedelta(days=days)
+    step = timedelta(days=days) / max(bugs, 1)
+    bug_id = next_id(Bug)
+    comment_id = next_id(Comment)
+    history_id = next_id(BugHistory)
+    totals = {"users": users, "projects": projects, "teams": len(team_ids), "bugs": 0, "comments": 0, "history": 0}
+    started = time.perf_counter()
+    for chunk_start in range(0, bugs, CHUNK):
+        bug_rows, comment_rows, history_rows, code_rows = [], [], [], []
+        for i in range(chunk_start, min(bugs, chunk_start + CHUNK)):
+            created = start + step * i + timedelta(seconds=rng.random() * step.total_seconds())
+            problem, description = _description(rng)
+            status = _weighted(rng, STATUSES)
+            original = fixed = notes = None
+            if rng.random() < code_ratio:
+                original, fixed_hash, fix_notes, code = rng.choice(pool)
+                code_rows.append((bug_id, code))
+                if rng.random() < fixed_ratio or status in ("Fixed", "Closed"):
+                    fixed, notes = fixed_hash, fix_notes
+            bug_rows.append({
+                "id": bug_id, "title": f"{rng.choice(COMPONENTS)}: {problem} on {rng.choice(WORDS)}",
+                "description": description, "severity": _weighted(rng, SEVERITIES), "status": status,
+                "original_code_hash": original, "fixed_code_hash": fixed, "ai_notes": notes,
+                "project_id": rng.choice(project_ids) if rng.random() < 0.9 else None,
+                "created_by": rng.choice(user_ids), "created_at": created,
+            })
+            for _ in range(_count(rng, comments)):
+                comment_rows.append({
+                    "id": comment_id, "bug_id": bug_id, "author_id": rng.choice(user_ids),
+                    "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))),
+                    "created_at": created + timedelta(hours=rng.random() * 72),
+                })
+                comment_id += 1
+            previous = "Open"
+            for n in range(_count(rng, history)):
+                new = rng.choice(["In Progress", "Fixed", "Closed", "Open"])
+                history_rows.append({
+                    "id": history_id, "bug_id": bug_id, "old_status": previous, "new_status": new,
+                    "changed_at": created + timedelta(hours=(n + 1) * rng.random() * 48),
+                })
+                previous = new
+                history_id += 1
+            bug_id += 1
+
+        db.session.execute(db.insert(Bug), bug_rows)
+        # Triggers index the text columns; code is indexed by the app
+        search_index.index_code(db.session, code_rows)
+        if comment_rows:
+            db.session.execute(db.insert(Comment), comment_rows)
+        if history_rows:
+            db.session.execute(db.insert(BugHistory), history_rows)
+        db.session.commit()
+        totals["bugs"] += len(bug_rows)
+        totals["comments"] += len(comment_rows)
+        totals["history"] += len(history_rows)
+        rate = totals["bugs"] / (time.perf_counter() - started)
+        progress(f"{totals['bugs']}/{bugs} bugs ({rate:.0f}/s)")
+
+    # Derived data the app normally maintains at write time
+    code_store.recount_refs()
+    db.session.commit()
+    rebuild_stats()
+    progress("blob refcounts and dashboard counters rebuilt")
+    backfill_activity()
+    progress("activity log backfilled from bug history")
+    rebuild_rollups()
+    progress("trend rollups rebuilt")
+    if signatures:
+        totals["signatures"] = reindex_all()
+        progress(f"{totals['signatures']} duplicate signatures")
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", required=True, help="SQLAlchemy URL, e.g. sqlite:////tmp/bench.db")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    for name in ("users", "projects", "bugs", "distinct_code"):
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"override the scale's {name}")
+    for name in ("comments", "history"):
+        parser.add_argument(f"--{name}", type=float, help=f"mean {name} rows per bug")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-signatures", action="store_true", help="do not build duplicate signatures")
+    args = parser.parse_args()
+
+    from benchmarks.common import make_app
+
+    params = dict(SCALES[args.scale])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+
+    app = make_app(args.database)
+    from app import db
+
+    with app.app_context():
+        db.create_all()
+        totals = generate(**params, seed=args.seed, signatures=not args.skip_signatures,
+                          progress=lambda message: print(message, file=sys.stderr, flush=True))
+    print(json.dumps(totals))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Microbenchmarks for the AI engine on snippets of increasing size.
+
+    python benchmarks/engine.py
+    python benchmarks/engine.py --sizes 1024,65536 --min-time 1
+
+Prints one JSON record per (function, size). Calls the engine directly,
+bypassing the analysis cache.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, summarize
+from benchmarks.datagen import snippet_of_size
+
+DEFAULT_SIZES = [1024, 4096, 16384, 65536, 262144, 1048576]
+DESCRIPTION = "Crash when the submit button in the login form is clicked; modal never closes"
+
+def _label(size):
+    return f"{size // 1024}KB" if size >= 1024 else f"{size}B"
+
+def run(sizes=None, min_time=0.5):
+    from app.ai_engine import analyze_and_fix_code, classify_description, generate_auto_fix
+
+    results = []
+    templates = classify_description(DESCRIPTION)["templates"]
+    results.append(summarize("engine", "classify_description", measure(
+        lambda: classify_description(DESCRIPTION), min_time=min_time)))
+    for size in sizes or DEFAULT_SIZES:
+        code = snippet_of_size(size)
+        cases = {
+            "analyze_and_fix_code": lambda: analyze_and_fix_code(code, DESCRIPTION),
+            "generate_auto_fix": lambda: generate_auto_fix(DESCRIPTION, code, templates),
+        }
+        for name, fn in cases.items():
+            samples = measure(fn, min_time=min_time)
+            results.append(summarize(
+                "engine", f"{name}[{_label(size)}]", samples,
+                bytes=size, mb_per_sec=round(size / (sum(samples) / len(samples)) / 1e6, 2),
+            ))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", help="comma-separated snippet sizes in bytes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per case")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+    for record in run(sizes, args.min_time):
+        print(json.dumps(record), flush=True)
+
+if __name__ == "__main__":
+    main()
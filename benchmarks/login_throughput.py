@@ -0,0 +1,127 @@
+"""
+Login throughput under different password hashing policies.
+
+Drives POST /login through the Flask test client from several threads for
+a fixed time per policy, against a temporary SQLite database, and reports
+logins per second and per core. Requests beyond the hashing pool's
+capacity (PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE) are counted as
+rejected (HTTP 503).
+
+    python benchmarks/login_throughput.py --seconds 5 --concurrency 4
+    python benchmarks/login_throughput.py --policy pbkdf2:sha256:600000 --queue 0 --concurrency 16
+
+Prints one JSON object per policy.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_POLICIES = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:260000",
+]
+PASSWORD = "correct horse battery staple"
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run_policy(app, policy, concurrency, seconds, workers, queue):
+    from app import db
+    from app.models import User
+    from app.passwords import password_hasher
+
+    app.config.update(
+        PASSWORD_HASH_METHOD=policy,
+        PASSWORD_HASH_WORKERS=workers,
+        PASSWORD_HASH_QUEUE=queue,
+    )
+    password_hasher.init_app(app)
+    with app.app_context():
+        user = User.query.filter_by(username="bench").first()
+        user.set_password(PASSWORD)  # stored with this policy, so logins do not rehash
+        db.session.commit()
+
+    latencies, statuses = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+
+    def drive():
+        client = app.test_client()
+        mine, codes = [], []
+        barrier.wait()
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            started = time.perf_counter()
+            response = client.post("/login", data={"username": "bench", "password": PASSWORD})
+            mine.append(time.perf_counter() - started)
+            codes.append(response.status_code)
+        with lock:
+            latencies.extend(mine)
+            statuses.extend(codes)
+
+    threads = [threading.Thread(target=drive) for _ in range(concurrency)]
+    cpu_before = time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cpu_seconds = time.process_time() - cpu_before
+
+    ok = [l for l, code in zip(latencies, statuses) if code == 302]
+    cores = min(concurrency, password_hasher.workers, os.cpu_count() or 1)
+    return {
+        "policy": password_hasher.method_prefix,
+        "concurrency": concurrency,
+        "hash_workers": password_hasher.workers,
+        "hash_queue": queue,
+        "cores": cores,
+        "seconds": seconds,
+        "logins": len(ok),
+        "rejected": statuses.count(503),
+        "logins_per_sec": round(len(ok) / seconds, 2),
+        "logins_per_sec_per_core": round(len(ok) / seconds / cores, 2),
+        "cpu_ms_per_login": round(cpu_seconds * 1000 / len(ok), 2) if ok else None,
+        "p50_ms": round(statistics.median(ok) * 1000, 2) if ok else None,
+        "p95_ms": round(_percentile(ok, 0.95) * 1000, 2) if ok else None,
+        "rejected_p50_ms": round(statistics.median(
+            [l for l, code in zip(latencies, statuses) if code == 503]) * 1000, 2) if 503 in statuses else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--policy", action="append", help="werkzeug hash method (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1, help="client threads")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per policy")
+    parser.add_argument("--workers", type=int, default=0, help="hashing threads (0 = one per CPU)")
+    parser.add_argument("--queue", type=int, default=16, help="hashes allowed to wait before 503")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.db")
+        os.environ.setdefault("JOB_INPROCESS_WORKERS", "0")
+        from app import create_app, db
+        from app.models import User
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username="bench", email="bench@example.com", password_hash=""))
+            db.session.commit()
+
+        for policy in args.policy or DEFAULT_POLICIES:
+            row = run_policy(app, policy, args.concurrency, args.seconds, args.workers, args.queue)
+            print(json.dumps(row), flush=True)
+
+if __name__ == "__main__":
+    main()
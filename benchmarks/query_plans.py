@@ -0,0 +1,182 @@
+"""
+Query-plan regression check: runs every endpoint of the route suite once,
+plus a few ORM access paths, against a seeded SQLite database, captures
+the SQL each one issues,
+and records EXPLAIN QUERY PLAN for it. Exits with status 1 when a
+statement reads a large table with a full scan (``SCAN <table>`` without
+an index).
+
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --scale small --output plans.json
+    python benchmarks/query_plans.py --compare plans-main.json
+
+Tables in SMALL_TABLES stay small in production and may be scanned.
+With --compare, plans that changed since an earlier report are listed.
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import SCALES
+from benchmarks.routes import _cases, _login, prepare
+
+# Bounded by configuration rather than by traffic
+SMALL_TABLES = {"project", "user", "team", "team_members", "bug_stat", "alembic_version"}
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+def _normalize(statement):
+    return " ".join(statement.split())
+
+def explain(connection, statement, parameters):
+    """EXPLAIN QUERY PLAN rows for one statement, as indented detail strings."""
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+def full_scans(plan, tables, allowed=SMALL_TABLES):
+    """Tables read in full; scans of subqueries and CTEs (anon_1, ...) read rows already produced."""
+    scans = []
+    for line in plan:
+        match = FULL_SCAN.match(line.strip())
+        if match and match.group(1) in tables and match.group(1) not in allowed:
+            scans.append(match.group(1))
+    return scans
+
+def _model_paths(bug_id, project_id):
+    """ORM access paths that no route reads yet, e.g. relationship loads."""
+    from app import db
+    from app.jobs import latest_job_for
+    from app.models import Bug, Project
+
+    return [
+        ("orm.bug_comments", lambda: db.session.get(Bug, bug_id).comments),
+        ("orm.bug_histories", lambda: db.session.get(Bug, bug_id).histories),
+        ("orm.project_bugs", lambda: db.session.get(Project, project_id).bugs),
+        ("orm.latest_job", lambda: latest_job_for(bug_id)),
+    ]
+
+def capture(app, only=None):
+    """{case: [(statement, parameters), ...]} for one request per endpoint (and model path), in order."""
+    from sqlalchemy import event
+
+    from app import db
+    from app.models import Bug, User
+
+    with app.app_context():
+        admin = db.session.execute(db.select(User.username).where(User.role == "Admin").limit(1)).scalar()
+        user_id, username = db.session.execute(
+            db.select(User.id, User.username).join(Bug, Bug.created_by == User.id)
+            .where(User.role != "Admin").group_by(User.id).order_by(db.func.count().desc()).limit(1)
+        ).one()
+        engine = db.engine
+        bug_id, project_id = db.session.execute(
+            db.select(Bug.id, Bug.project_id).where(Bug.project_id.isnot(None)).limit(1)
+        ).one()
+
+    current = {"case": None}
+    statements = OrderedDict()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if current["case"] and not executemany and verb in ("SELECT", "WITH", "UPDATE", "DELETE"):
+            statements.setdefault(current["case"], []).append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for case in _cases(app, user_id):
+            if only and case.name not in only:
+                continue
+            client = _login(app, admin if case.user == "admin" else username)
+            method, url, kwargs = case.build(0)
+            current["case"] = case.name
+            response = client.open(url, method=method, **kwargs)
+            response.close()
+            current["case"] = None
+        for name, load in _model_paths(bug_id, project_id):
+            if only and name not in only:
+                continue
+            with app.app_context():
+                current["case"] = name
+                load()
+                current["case"] = None
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+def analyze(app, statements):
+    from app import db
+
+    report = []
+    tables = set(db.metadata.tables)
+    with app.app_context():
+        connection = db.session.connection()
+        for case, executed in statements.items():
+            seen = set()
+            for statement, parameters in executed:
+                key = _normalize(statement)
+                if key in seen:
+                    continue
+                seen.add(key)
+                plan = explain(connection, statement, parameters)
+                report.append({"case": case, "sql": key, "plan": plan, "full_scans": full_scans(plan, tables)})
+        db.session.rollback()
+    return report
+
+def compare(report, baseline):
+    old = {(row["case"], row["sql"]): row["plan"] for row in baseline}
+    return [row for row in report if (row["case"], row["sql"]) in old and old[(row["case"], row["sql"])] != row["plan"]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", help="existing database made by datagen.py (default: generate one)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="tiny")
+    parser.add_argument("--only", action="append", help="endpoint name to check (repeatable)")
+    parser.add_argument("--output", help="write every statement and plan as JSON here")
+    parser.add_argument("--compare", help="earlier --output report; list plans that changed")
+    args = parser.parse_args()
+
+    # Routes print their errors; keep stdout for the summary
+    with contextlib.redirect_stdout(sys.stderr):
+        app, tmp = prepare(args.database, args.scale)
+        try:
+            if app.config["SQLALCHEMY_DATABASE_URI"].split(":", 1)[0] != "sqlite":
+                sys.exit("query_plans.py needs a SQLite database (EXPLAIN QUERY PLAN)")
+            report = analyze(app, capture(app, args.only))
+        finally:
+            if tmp is not None:
+                tmp.cleanup()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            changed = compare(report, json.load(f))
+        for row in changed:
+            print(f"# plan changed: {row['case']}: {row['sql'][:120]}")
+            for line in row["plan"]:
+                print(f"#     {line}")
+
+    failures = [row for row in report if row["full_scans"]]
+    print(f"{len(report)} statement(s) across {len({row['case'] for row in report})} endpoint(s); "
+          f"{len(failures)} with full table scans")
+    for row in failures:
+        print(f"FULL SCAN of {', '.join(row['full_scans'])} in {row['case']}:")
+        print(f"    {row['sql'][:300]}")
+        for line in row["plan"]:
+            print(f"      {line}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Route-level load test: drives the Flask app in-process (test client)
+against a synthetic SQLite database and times every list, detail and API
+endpoint, with SQL statements per request.
+
+    python benchmarks/routes.py --scale small --requests 100
+    python benchmarks/routes.py --database sqlite:////tmp/bench.db --threads 4
+
+Without --database a temporary database is generated at --scale.
+Prints one JSON record per endpoint.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import make_app, summarize
+from benchmarks.datagen import PASSWORD, SCALES, generate, snippet_of_size
+
+class Case:
+    """One endpoint: ``build(i)`` returns (method, url, kwargs) for the i-th request."""
+
+    def __init__(self, name, build, user="user", expect=(200,)):
+        self.name = name
+        self.build = build
+        self.user = user
+        self.expect = expect
+
+
+def _cases(app, user_id, seed=1):
+    from app import db
+    from app.models import Bug
+    from app.pagination import encode_cursor
+
+    rng = random.Random(seed)
+    with app.app_context():
+        own = db.session.execute(db.select(Bug.id).where(Bug.created_by == user_id)).scalars().all()
+        any_ids = db.session.execute(db.select(Bug.id)).scalars().all()
+        with_code = db.session.execute(
+            db.select(Bug.id).where(Bug.created_by == user_id, Bug.original_code_hash.isnot(None))
+        ).scalars().all() or own
+        middle = db.session.execute(
+            db.select(Bug.created_at, Bug.id).order_by(Bug.created_at.desc(), Bug.id.desc())
+            .offset(len(any_ids) // 2).limit(1)
+        ).first()
+    own_ids = rng.sample(own, min(len(own), 500))
+    all_ids = rng.sample(any_ids, min(len(any_ids), 500))
+    code_ids = rng.sample(with_code, min(len(with_code), 500))
+    cursor = encode_cursor(*middle) if middle else ""
+    snippet = snippet_of_size(4096, seed=seed)
+    description = "Crash when the submit button is clicked"
+    lines = snippet.splitlines()
+    year_ago = (datetime.utcnow() - timedelta(days=365)).date().isoformat()
+
+    def incremental(i):
+        # First request sends the document, the rest send one-line edits
+        if i == 0:
+            return "POST", "/api/analyze_code/incremental", {"json": {
+                "doc_id": "bench", "version": 1, "text": snippet, "description": description}}
+        line = i % len(lines)
+        return "POST", "/api/analyze_code/incremental", {"json": {
+            "doc_id": "bench", "version": i + 1, "base_version": i, "start": line, "end": line + 1,
+            "lines": [lines[line] + f"  # edit {i}"], "description": description}}
+
+    def get(url):
+        return lambda i: ("GET", url, {})
+
+    return [
+        Case("dashboard", get("/dashboard")),
+        Case("projects", get("/")),
+        Case("bug_list", get("/list")),
+        Case("bug_list.admin", get("/list"), user="admin"),
+        Case("bug_list.filtered", get("/list?status=Open&severity=High"), user="admin"),
+        Case("bug_list.deep_page", get(f"/list?cursor={cursor}"), user="admin"),
+        Case("search", get("/search?q=button"), user="admin"),
+        Case("api_search", get("/api/search?q=crash+sub"), user="admin"),
+        Case("bug_detail", lambda i: ("GET", f"/{own_ids[i % len(own_ids)]}", {})),
+        Case("bug_detail.admin", lambda i: ("GET", f"/{all_ids[i % len(all_ids)]}", {}), user="admin"),
+        Case("analysis_status", lambda i: ("GET", f"/{own_ids[i % len(own_ids)]}/analysis_status", {})),
+        Case("download", lambda i: ("GET", f"/{code_ids[i % len(code_ids)]}/download", {})),
+        Case("bug_activity", lambda i: ("GET", f"/api/bugs/{own_ids[i % len(own_ids)]}/activity", {})),
+        Case("time_in_status", get("/api/activity/time_in_status")),
+        Case("mttr", get("/api/activity/mttr?group_by=severity"), user="admin"),
+        Case("trends", get(f"/api/analytics/trends?since={year_ago}&by=category")),
+        Case("api_analyze_code", lambda i: ("POST", "/api/analyze_code", {"json": {
+            "code": snippet + f"# {i % 20}\n", "description": description}})),
+        Case("api_duplicates", lambda i: ("POST", "/api/bugs/duplicates", {"json": {
+            "description": description, "code": snippet}})),
+        Case("api_incremental", incremental),
+        Case("report", lambda i: ("POST", "/report", {"data": {
+            "title": f"Benchmark bug {i}", "description": description,
+            "code_snippet": snippet + f"# report {i}\n", "severity": "High"}}), expect=(302,)),
+        Case("metrics", get("/metrics"), user="admin"),
+    ]
+
+def _login(app, username):
+    client = app.test_client()
+    response = client.post("/login", data={"username": username, "password": PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f"login as {username} failed with {response.status_code}")
+    return client
+
+def run(app, requests=100, warmup=5, threads=1, only=None):
+    from sqlalchemy import event
+
+    from app import db
+    from app.models import Bug, User
+
+    with app.app_context():
+        admin = db.session.execute(db.select(User.username).where(User.role == "Admin").limit(1)).scalar()
+        # The regular user with the most bugs
+        user_id, username = db.session.execute(
+            db.select(User.id, User.username).join(Bug, Bug.created_by == User.id)
+            .where(User.role != "Admin").group_by(User.id).order_by(db.func.count().desc()).limit(1)
+        ).one()
+        engine = db.engine
+
+    counter = {"n": 0}
+    def count_statement(*args):
+        counter["n"] += 1
+    event.listen(engine, "before_cursor_execute", count_statement)
+
+    results = []
+    try:
+        for case in _cases(app, user_id):
+            if only and case.name not in only:
+                continue
+            username_for = admin if case.user == "admin" else username
+            clients = [_login(app, username_for) for _ in range(threads)]
+            sequence = itertools.count()
+            lock = threading.Lock()
+            samples, statuses, sql_counts = [], Counter(), []
+
+            def drive(client, n, record):
+                for _ in range(n):
+                    with lock:
+                        i = next(sequence)
+                    method, url, kwargs = case.build(i)
+                    before = counter["n"]
+                    t0 = time.perf_counter()
+                    response = client.open(url, method=method, **kwargs)
+                    elapsed = time.perf_counter() - t0
+                    response.close()
+                    if record:
+                        with lock:
+                            samples.append(elapsed)
+                            statuses[response.status_code] += 1
+                            if threads == 1:
+                                sql_counts.append(counter["n"] - before)
+
+            drive(clients[0], warmup, record=False)
+            per_thread = max(1, requests // threads)
+            workers = [threading.Thread(target=drive, args=(c, per_thread, True)) for c in clients]
+            t0 = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            wall = time.perf_counter() - t0
+
+            errors = sum(n for code, n in statuses.items() if code not in case.expect)
+            results.append(summarize(
+                "routes", case.name, samples,
+                threads=threads,
+                requests_per_sec=round(len(samples) / wall, 2),
+                statuses={str(code): n for code, n in sorted(statuses.items())},
+                errors=errors,
+                sql_per_request=round(sum(sql_counts) / len(sql_counts), 2) if sql_counts else None,
+            ))
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    return results
+
+def prepare(database=None, scale="small", seed=1):
+    """App on ``database``, or on a new temporary database generated at ``scale``; returns (app, tmpdir)."""
+    tmp = None
+    if database is None:
+        tmp = tempfile.TemporaryDirectory()
+        database = "sqlite:///" + os.path.join(tmp.name, "bench.db")
+    app = make_app(database)
+    if tmp is not None:
+        from app import db
+        with app.app_context():
+            db.create_all()
+            generate(**SCALES[scale], seed=seed,
+                     progress=lambda message: print(f"datagen: {message}", file=sys.stderr, flush=True))
+    return app, tmp
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", help="existing database made by datagen.py")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--requests", type=int, default=100, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=1, help="concurrent clients per endpoint")
+    parser.add_argument("--only", action="append", help="endpoint name to run (repeatable)")
+    args = parser.parse_args()
+
+    # Routes print their errors; keep stdout for the JSON records
+    with contextlib.redirect_stdout(sys.stderr):
+        app, tmp = prepare(args.database, args.scale)
+        try:
+            results = run(app, args.requests, args.warmup, args.threads, args.only)
+        finally:
+            if tmp is not None:
+                tmp.cleanup()
+    for record in results:
+        print(json.dumps(record), flush=True)
+
+if __name__ == "__main__":
+    main()
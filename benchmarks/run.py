@@ -0,0 +1,94 @@
+"""
+Run the benchmark suites and write one JSON report, optionally comparing
+it with an earlier report.
+
+    python benchmarks/run.py --output bench-$(git rev-parse --short HEAD).json
+    python benchmarks/run.py --suite engine --compare bench-main.json --threshold 0.15
+
+The report is {"meta": {...}, "results": [...]}; each result is keyed by
+(suite, name) and carries min/median/mean/p95/max in ms. With --compare,
+medians that got slower by more than --threshold are listed and the exit
+status is 1.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import engine, routes
+from benchmarks.common import run_metadata
+from benchmarks.datagen import SCALES
+
+SUITES = ("engine", "routes")
+
+def compare(current, baseline, threshold):
+    """(regressions, improvements) as lists of (key, old_median, new_median, ratio)."""
+    old = {(r["suite"], r["name"]): r for r in baseline["results"]}
+    regressions, improvements = [], []
+    for record in current["results"]:
+        key = (record["suite"], record["name"])
+        previous = old.get(key)
+        if not previous or not previous.get("median"):
+            continue
+        ratio = record["median"] / previous["median"]
+        row = (key, previous["median"], record["median"], ratio)
+        if ratio > 1 + threshold:
+            regressions.append(row)
+        elif ratio < 1 / (1 + threshold):
+            improvements.append(row)
+    return regressions, improvements
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (repeatable); default all")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="route suite data scale")
+    parser.add_argument("--database", help="route suite database made by datagen.py (skips generation)")
+    parser.add_argument("--requests", type=int, default=100, help="route suite requests per endpoint")
+    parser.add_argument("--min-time", type=float, default=0.5, help="engine suite seconds per case")
+    args = parser.parse_args()
+    suites = args.suite or list(SUITES)
+
+    meta = run_metadata()
+    meta.update(suites=suites, scale=args.scale, requests=args.requests)
+    results = []
+    # Routes print their errors; keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        if "engine" in suites:
+            results += engine.run(min_time=args.min_time)
+        if "routes" in suites:
+            app, tmp = routes.prepare(args.database, args.scale)
+            try:
+                results += routes.run(app, requests=args.requests)
+            finally:
+                if tmp is not None:
+                    tmp.cleanup()
+    report = {"meta": meta, "results": results}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions, improvements = compare(report, baseline, args.threshold)
+        print(f"# compared with {baseline['meta'].get('commit')} ({args.compare})", file=sys.stderr)
+        for title, rows in (("Regressions", regressions), ("Improvements", improvements)):
+            if rows:
+                print(f"# {title}:", file=sys.stderr)
+            for (suite, name), old, new, ratio in rows:
+                print(f"#   {suite}/{name}: {old:.3f}ms -> {new:.3f}ms ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
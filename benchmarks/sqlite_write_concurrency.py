@@ -0,0 +1,185 @@
+"""
+Concurrent bug-report write throughput on SQLite, with and without the
+engine tuning in app/engine_config.py (WAL, busy_timeout, pragmas, pool).
+
+Each worker is a separate process, like a gunicorn sync worker, posting
+bug reports through the Flask test client for a fixed time. Optional
+reader processes load the bug list meanwhile.
+
+    python benchmarks/sqlite_write_concurrency.py --workers 8 --seconds 10
+
+Prints one JSON object per mode, then a short comparison.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = {
+    # SQLAlchemy and sqlite3 defaults: rollback journal, 5s sqlite3 timeout
+    "baseline": {"DB_TUNING": "0"},
+    "tuned": {"DB_TUNING": "1"},
+}
+
+CODE = "def handler(request):\n    data = request.json\n    if data\n        return data['id']\n" * 5
+
+def _make_app():
+    from app import create_app
+    app = create_app()
+    app.config["WTF_CSRF_ENABLED"] = False
+    return app
+
+def _setup(db_path, ready):
+    from app import db
+    from app.models import Project, User
+    from app.search import get_backend
+
+    app = _make_app()
+    with app.app_context():
+        db.create_all()
+        get_backend()  # install the FTS index and triggers, as migrations would
+        user = User(username="bench", email="bench@example.com")
+        user.set_password("bench")
+        db.session.add_all([user, Project(name="Bench")])
+        db.session.commit()
+    ready.put(True)
+
+def _login(app):
+    client = app.test_client()
+    response = client.post("/login", data={"username": "bench", "password": "bench"})
+    if response.status_code != 302:
+        raise RuntimeError(f"login failed with {response.status_code}")
+    return client
+
+def _writer(index, barrier, seconds, results):
+    app = _make_app()
+    client = _login(app)
+    latencies, errors = [], 0
+    # The route prints errors; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        barrier.wait()  # every process has imported and logged in
+        deadline = time.time() + seconds
+        n = 0
+        while time.time() < deadline:
+            n += 1
+            started = time.perf_counter()
+            response = client.post("/report", data={
+                "title": f"Worker {index} bug {n}",
+                "description": "Crash when saving the form",
+                "code_snippet": CODE + f"# {index}-{n}\n",
+                "severity": "High",
+                "project_id": "1",
+            })
+            elapsed = time.perf_counter() - started
+            # Success redirects to the new bug; failures flash an error and go to the dashboard
+            location = response.headers.get("Location", "")
+            if response.status_code == 302 and location.rstrip("/").rsplit("/", 1)[-1].isdigit():
+                latencies.append(elapsed)
+            else:
+                errors += 1
+    results.put({"role": "writer", "latencies": latencies, "errors": errors})
+
+def _reader(barrier, seconds, results):
+    app = _make_app()
+    client = _login(app)
+    count, errors = 0, 0
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        barrier.wait()  # every process has imported and logged in
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            response = client.get("/list")
+            if response.status_code == 200:
+                count += 1
+            else:
+                errors += 1
+    results.put({"role": "reader", "count": count, "errors": errors})
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def run_mode(mode, workers, readers, seconds):
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        env = dict(MODES[mode], DATABASE_URL=f"sqlite:///{db_path}", JOB_INPROCESS_WORKERS="0")
+        saved = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)  # spawned children read config from the environment
+        try:
+            ready = ctx.Queue()
+            setup = ctx.Process(target=_setup, args=(db_path, ready))
+            setup.start()
+            ready.get()
+            setup.join()
+
+            results = ctx.Queue()
+            barrier = ctx.Barrier(workers + readers)
+            procs = [ctx.Process(target=_writer, args=(i, barrier, seconds, results)) for i in range(workers)]
+            procs += [ctx.Process(target=_reader, args=(barrier, seconds, results)) for _ in range(readers)]
+            for proc in procs:
+                proc.start()
+            collected = [results.get() for _ in procs]
+            for proc in procs:
+                proc.join()
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    latencies = [l for r in collected if r["role"] == "writer" for l in r["latencies"]]
+    write_errors = sum(r["errors"] for r in collected if r["role"] == "writer")
+    reads = sum(r["count"] for r in collected if r["role"] == "reader")
+    return {
+        "mode": mode,
+        "workers": workers,
+        "readers": readers,
+        "seconds": seconds,
+        "writes": len(latencies),
+        "write_errors": write_errors,
+        "writes_per_sec": round(len(latencies) / seconds, 1),
+        "reads_per_sec": round(reads / seconds, 1),
+        "write_p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "write_p95_ms": round(_percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "write_max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8, help="concurrent writer processes")
+    parser.add_argument("--readers", type=int, default=2, help="concurrent /list reader processes")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration per mode")
+    parser.add_argument("--mode", choices=sorted(MODES), action="append",
+                        help="run only this mode (repeatable); default runs all")
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.mode or ["baseline", "tuned"]:
+        row = run_mode(mode, args.workers, args.readers, args.seconds)
+        print(json.dumps(row), flush=True)
+        rows.append(row)
+
+    by_mode = {row["mode"]: row for row in rows}
+    if "baseline" in by_mode and "tuned" in by_mode:
+        before, after = by_mode["baseline"], by_mode["tuned"]
+        speedup = after["writes_per_sec"] / before["writes_per_sec"] if before["writes_per_sec"] else float("inf")
+        print(
+            f"# writes/s {before['writes_per_sec']} -> {after['writes_per_sec']} ({speedup:.1f}x), "
+            f"errors {before['write_errors']} -> {after['write_errors']}",
+            file=sys.stderr,
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""fill the SQLite search index's code column from the application
+
+Revision ID: b2f7c9e4a1d8
+Revises: 9c3f5a1e7b82
+Create Date: 2026-10-18 10:21:37.514290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.code_store import inflate, register_sqlite_functions
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2f7c9e4a1d8'
+down_revision = '9c3f5a1e7b82'
+branch_labels = None
+depends_on = None
+
+CHUNK = 500
+TRIGGERS = ('bug_fts_ai', 'bug_fts_ad', 'bug_fts_au')
+
+bug = sa.table('bug', sa.column('id', sa.Integer), sa.column('original_code_hash', sa.String))
+code_blob = sa.table('code_blob',
+    sa.column('hash', sa.String), sa.column('codec', sa.String), sa.column('data', sa.LargeBinary),
+    sa.column('base_hash', sa.String))
+
+
+def _drop_index():
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS bug_fts')
+    op.execute('DROP VIEW IF EXISTS bug_search_source')
+
+
+def upgrade():
+    # Not autogenerated: the index lives outside the ORM metadata (see app/search.py).
+    # The triggers of a93e1f6c2b48 called code_inflate(), which only the app's own
+    # connections define; these are plain SQL and code is written by the application.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    _drop_index()
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, original_code,
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            DELETE FROM bug_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes ON bug BEGIN
+            UPDATE bug_fts SET title = new.title, description = new.description, ai_notes = new.ai_notes
+            WHERE rowid = new.id;
+        END
+    """)
+    op.execute("INSERT INTO bug_fts(rowid, title, description, ai_notes) SELECT id, title, description, ai_notes FROM bug")
+
+    blob = sa.alias(code_blob, 'blob')
+    base = sa.alias(code_blob, 'base')
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(bug.c.id, blob.c.codec, blob.c.data, base.c.codec, base.c.data)
+            .select_from(bug.join(blob, blob.c.hash == bug.c.original_code_hash)
+                         .outerjoin(base, base.c.hash == blob.c.base_hash))
+            .where(bug.c.id > last_id).order_by(bug.c.id).limit(CHUNK)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE bug_fts SET original_code = :code WHERE rowid = :id"),
+            [{'id': bug_id, 'code': inflate(*encoded)} for bug_id, *encoded in rows],
+        )
+        last_id = rows[-1][0]
+    op.execute("INSERT INTO bug_fts(bug_fts) VALUES ('optimize')")
+
+
+def downgrade():
+    # Restore the index of revision a93e1f6c2b48
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    register_sqlite_functions(bind.connection.driver_connection)
+    _drop_index()
+    code_for = """(SELECT code_inflate(blob.codec, blob.data, base.codec, base.data)
+        FROM code_blob AS blob LEFT JOIN code_blob AS base ON base.hash = blob.base_hash
+        WHERE blob.hash = {}.original_code_hash)"""
+    op.execute("""
+        CREATE VIEW IF NOT EXISTS bug_search_source AS
+        SELECT bug.id AS id, bug.title AS title, bug.description AS description,
+               bug.ai_notes AS ai_notes, """ + code_for.format('bug') + """ AS original_code
+        FROM bug
+    """)
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, original_code,
+            content='bug_search_source', content_rowid='id', prefix='2 3',
+            tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes, original_code)
+            SELECT id, title, description, ai_notes, original_code FROM bug_search_source WHERE id = new.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes, original_code)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes, """ + code_for.format('old') + """);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes, original_code_hash ON bug BEGIN
+            INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes, original_code)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes, """ + code_for.format('old') + """);
+            INSERT INTO bug_fts(rowid, title, description, ai_notes, original_code)
+            SELECT id, title, description, ai_notes, original_code FROM bug_search_source WHERE id = new.id;
+        END
+    """)
+    op.execute("INSERT INTO bug_fts(bug_fts) VALUES ('rebuild')")
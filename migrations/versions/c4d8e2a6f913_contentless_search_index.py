@@ -0,0 +1,149 @@
+"""make the SQLite search index contentless and index code separately
+
+Revision ID: c4d8e2a6f913
+Revises: b2f7c9e4a1d8
+Create Date: 2026-10-18 14:52:08.203117
+
+"""
+import sqlite3
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.code_store import inflate
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e2a6f913'
+down_revision = 'b2f7c9e4a1d8'
+branch_labels = None
+depends_on = None
+
+CHUNK = 500
+TRIGGERS = ('bug_fts_ai', 'bug_fts_ad', 'bug_fts_au', 'bug_fts_code_ad', 'bug_fts_code_au')
+
+bug = sa.table('bug', sa.column('id', sa.Integer), sa.column('original_code_hash', sa.String))
+code_blob = sa.table('code_blob',
+    sa.column('hash', sa.String), sa.column('codec', sa.String), sa.column('data', sa.LargeBinary),
+    sa.column('base_hash', sa.String))
+
+
+def _drop_index():
+    for trigger in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.execute('DROP TABLE IF EXISTS bug_fts_code')
+    op.execute('DROP TABLE IF EXISTS bug_fts')
+
+
+def _fill_code(bind, statement):
+    blob = sa.alias(code_blob, 'blob')
+    base = sa.alias(code_blob, 'base')
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(bug.c.id, blob.c.codec, blob.c.data, base.c.codec, base.c.data)
+            .select_from(bug.join(blob, blob.c.hash == bug.c.original_code_hash)
+                         .outerjoin(base, base.c.hash == blob.c.base_hash))
+            .where(bug.c.id > last_id).order_by(bug.c.id).limit(CHUNK)
+        ).all()
+        if not rows:
+            break
+        bind.execute(sa.text(statement), [{'id': bug_id, 'code': inflate(*encoded)} for bug_id, *encoded in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # Not autogenerated: the index lives outside the ORM metadata (see app/search.py).
+    # The FTS5 table of b2f7c9e4a1d8 kept a full copy of every bug's text and code in
+    # bug_fts_content; contentless tables keep tokens only.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    contentless_delete = sqlite3.sqlite_version_info >= (3, 43, 0)
+    options = "content='', contentless_delete=1" if contentless_delete else "content=''"
+    if contentless_delete:
+        remove_text = "DELETE FROM bug_fts WHERE rowid = old.id;"
+    else:
+        remove_text = """INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes);"""
+
+    _drop_index()
+    op.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, {options},
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts_code USING fts5(
+            original_code, {options},
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            {remove_text}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes ON bug BEGIN
+            {remove_text}
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END
+    """)
+    if contentless_delete:
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS bug_fts_code_ad AFTER DELETE ON bug BEGIN
+                DELETE FROM bug_fts_code WHERE rowid = old.id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS bug_fts_code_au AFTER UPDATE OF original_code_hash ON bug BEGIN
+                DELETE FROM bug_fts_code WHERE rowid = old.id;
+            END
+        """)
+    op.execute("INSERT INTO bug_fts(rowid, title, description, ai_notes) SELECT id, title, description, ai_notes FROM bug")
+    _fill_code(bind, "INSERT INTO bug_fts_code(rowid, original_code) VALUES (:id, :code)")
+    op.execute("INSERT INTO bug_fts(bug_fts) VALUES ('optimize')")
+    op.execute("INSERT INTO bug_fts_code(bug_fts_code) VALUES ('optimize')")
+
+
+def downgrade():
+    # Restore the single FTS5 table of revision b2f7c9e4a1d8
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    _drop_index()
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, original_code,
+            prefix='2 3', tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes)
+            VALUES (new.id, new.title, new.description, new.ai_notes);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            DELETE FROM bug_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes ON bug BEGIN
+            UPDATE bug_fts SET title = new.title, description = new.description, ai_notes = new.ai_notes
+            WHERE rowid = new.id;
+        END
+    """)
+    op.execute("INSERT INTO bug_fts(rowid, title, description, ai_notes) SELECT id, title, description, ai_notes FROM bug")
+    _fill_code(bind, "UPDATE bug_fts SET original_code = :code WHERE rowid = :id")
+    op.execute("INSERT INTO bug_fts(bug_fts) VALUES ('optimize')")
@@ -0,0 +1,70 @@
+"""add bug full-text search index
+
+Revision ID: e5a8b3c17d20
+Revises: d41c7a2e9f03
+Create Date: 2026-10-17 14:10:48.207361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a8b3c17d20'
+down_revision = 'd41c7a2e9f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not autogenerated: the index lives outside the ORM metadata (see app/search.py)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            ALTER TABLE bug ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(ai_notes, '')), 'C') ||
+                setweight(to_tsvector('simple', coalesce(original_code, '')), 'D')
+            ) STORED
+        """)
+        op.execute('CREATE INDEX IF NOT EXISTS ix_bug_search_vector ON bug USING GIN (search_vector)')
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bug_fts USING fts5(
+            title, description, ai_notes, original_code,
+            content='bug', content_rowid='id', prefix='2 3',
+            tokenize="unicode61 tokenchars '_'"
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ai AFTER INSERT ON bug BEGIN
+            INSERT INTO bug_fts(rowid, title, description, ai_notes, original_code)
+            VALUES (new.id, new.title, new.description, new.ai_notes, new.original_code);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_ad AFTER DELETE ON bug BEGIN
+            INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes, original_code)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes, old.original_code);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS bug_fts_au AFTER UPDATE OF title, description, ai_notes, original_code ON bug BEGIN
+            INSERT INTO bug_fts(bug_fts, rowid, title, description, ai_notes, original_code)
+            VALUES ('delete', old.id, old.title, old.description, old.ai_notes, old.original_code);
+            INSERT INTO bug_fts(rowid, title, description, ai_notes, original_code)
+            VALUES (new.id, new.title, new.description, new.ai_notes, new.original_code);
+        END
+    """)
+    op.execute("INSERT INTO bug_fts(bug_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_bug_search_vector')
+        op.execute('ALTER TABLE bug DROP COLUMN IF EXISTS search_vector')
+    else:
+        for trigger in ('bug_fts_ai', 'bug_fts_ad', 'bug_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS bug_fts')
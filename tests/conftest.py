@@ -0,0 +1,40 @@
+# tests/conftest.py
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config is read from the environment when app.config is first imported,
+# so point it at a scratch database before any test module imports the app
+_TMP = tempfile.mkdtemp(prefix="bugtracker-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_TMP, "test.db")
+os.environ["JOB_INPROCESS_WORKERS"] = "0"
+os.environ["SLOW_REQUEST_MS"] = "0"
+
+
+@pytest.fixture(scope="session")
+def app():
+    """App on a database seeded by benchmarks/datagen.py at the tiny scale."""
+    from benchmarks.common import make_app
+    from benchmarks.datagen import SCALES, generate
+
+    app = make_app(os.environ["DATABASE_URL"], TESTING=True)
+    from app import db
+    with app.app_context():
+        db.create_all()
+        generate(**SCALES["tiny"], seed=1)
+    yield app
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture
+def session(app):
+    """db.session in an app context; anything left uncommitted is rolled back."""
+    from app import db
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
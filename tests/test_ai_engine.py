@@ -0,0 +1,91 @@
+# tests/test_ai_engine.py
+import random
+
+from app import ai_engine
+from benchmarks.datagen import FRAGMENTS, _description, make_snippet
+from tests import baseline_ai_engine as baseline
+
+KEYWORDS = list(dict.fromkeys(
+    list(baseline.FIX_SUGGESTIONS) + list(baseline.CATEGORY_MAP) + list(baseline.AUTO_FIX_TEMPLATES)
+))
+
+# Inputs that sit on the edges of the original if-chains
+EDGE_CODE = [
+    "",
+    "print('x')",
+    "print ('x')\nprint('y')",
+    "if x\n    y()",
+    "if x:\n    y()",
+    "for i in range(3)\n    pass",
+    "for i in range(3):\n    print(i)",
+    "TODO_BUG TODO_BUG",
+    '<button id="a">A</button><button id="a">B</button><button id="a">C</button>',
+    '<button disabled title="t">Go</button>',
+    '<button onclick="go()">Go</button>',
+    '<button disabled>x</button><span id="b"></span><span id="b"></span>',
+    '<div class="modal"><p>Hi</p></div>',
+    '<div class="modal"><button class="close">x</button></div>',
+    '<form><input name="q"></form>',
+    '<form><input type="submit" pattern="\\d+"></form>',
+    "input = disabled_flag",
+    'id="x" id="x" id="x_1"',
+]
+
+
+def _descriptions(seed=1, count=300):
+    rng = random.Random(seed)
+    descriptions = ["", "nothing relevant here"]
+    descriptions += KEYWORDS
+    descriptions += [keyword.upper() for keyword in KEYWORDS]
+    descriptions += [f"{a} then {b}" for a in KEYWORDS for b in KEYWORDS[::7]]
+    descriptions += [_description(rng)[1] for _ in range(count)]
+    return descriptions
+
+
+def _snippets(seed=1, count=300):
+    rng = random.Random(seed)
+    snippets = list(EDGE_CODE)
+    snippets += [fragment.format(n=i) for i, fragment in enumerate(FRAGMENTS)]
+    snippets += [make_snippet(rng, rng.randint(1, 6)) for _ in range(count)]
+    # Random splices, so rules see fragments joined mid-line
+    for _ in range(count):
+        text = make_snippet(rng, 3)
+        cut = rng.randrange(len(text))
+        snippets.append(text[:cut] + rng.choice(EDGE_CODE) + text[cut:])
+    return snippets
+
+
+def test_classify_description_matches_baseline():
+    mismatches = []
+    for description in _descriptions():
+        desc = description.lower()
+        expected = {
+            "severity": baseline.predict_bug_severity(description),
+            "category": baseline.detect_category(description),
+            "fix": baseline.suggest_fix(description),
+            "templates": [t for k, t in baseline.AUTO_FIX_TEMPLATES.items() if k.lower() in desc],
+        }
+        if ai_engine.classify_description(description) != expected:
+            mismatches.append(description)
+    assert mismatches == []
+
+
+def test_generate_auto_fix_matches_baseline():
+    rng = random.Random(2)
+    descriptions = _descriptions()
+    mismatches = []
+    for code in _snippets():
+        description = rng.choice(descriptions)
+        expected = baseline.generate_auto_fix(description, code)
+        if ai_engine.generate_auto_fix(description, code) != expected:
+            mismatches.append((description, code))
+    assert mismatches == []
+
+
+def test_analyze_and_fix_code_matches_baseline():
+    rng = random.Random(3)
+    descriptions = _descriptions(count=50)
+    for code in _snippets(count=50):
+        description = rng.choice(descriptions)
+        assert ai_engine.analyze_and_fix_code(code, description) == \
+            tuple(baseline.analyze_and_fix_code(code, description))
@@ -0,0 +1,146 @@
+# tests/test_counters.py
+from collections import Counter
+
+import pytest
+
+from app import db
+from app.models import Bug, BugStat, CodeBlob, Project
+from app.stats import GLOBAL_SCOPE, _bug_keys
+
+
+def expected_stats():
+    """Counters recomputed from the bug and project tables, zeros dropped."""
+    rows = Counter()
+    for project_id, status, severity in db.session.execute(
+        db.select(Bug.project_id, Bug.status, Bug.severity)
+    ):
+        for key in _bug_keys(project_id, status, severity):
+            rows[key] += 1
+    rows[(GLOBAL_SCOPE, "projects", "")] = db.session.execute(db.select(db.func.count(Project.id))).scalar()
+    return {key: count for key, count in rows.items() if count}
+
+
+def stored_stats():
+    return {
+        (row.scope, row.dimension, row.value): row.count
+        for row in db.session.execute(db.select(BugStat)).scalars()
+        if row.count
+    }
+
+
+def expected_refs():
+    """References per blob hash from bug columns and delta bases."""
+    refs = Counter()
+    for original, fixed in db.session.execute(db.select(Bug.original_code_hash, Bug.fixed_code_hash)):
+        refs[original] += 1
+        refs[fixed] += 1
+    for (base,) in db.session.execute(db.select(CodeBlob.base_hash)):
+        refs[base] += 1
+    refs.pop(None, None)
+    return dict(refs)
+
+
+def stored_refs():
+    return dict(db.session.execute(db.select(CodeBlob.hash, CodeBlob.refcount)).all())
+
+
+def assert_consistent():
+    assert stored_stats() == expected_stats()
+    stored, expected = stored_refs(), expected_refs()
+    assert {digest: stored.get(digest) for digest in expected} == expected
+    # Unreferenced blobs (e.g. from bulk loads) wait for `flask blobs gc` with no count
+    assert {digest: count for digest, count in stored.items() if digest not in expected and count} == {}
+
+
+@pytest.fixture
+def project(session):
+    return db.session.execute(db.select(Project).order_by(Project.id).limit(1)).scalar_one()
+
+
+def _new_bug(project, code, **fields):
+    bug = Bug(title="Counter test", description="Crash on save", project_id=project.id, created_by=1, **fields)
+    bug.original_code = code
+    return bug
+
+
+def test_seeded_database_is_consistent(session):
+    assert_consistent()
+
+
+def test_insert(session, project):
+    bug = _new_bug(project, "print('insert test')\n", status="Open", severity="High")
+    bug.fixed_code = "print ('insert test')\n"
+    session.add(bug)
+    session.commit()
+    assert_consistent()
+    assert stored_refs()[bug.original_code_hash] == 1
+
+
+def test_update(session, project):
+    bug = _new_bug(project, "print('update test')\n", status="Open", severity="Low")
+    session.add(bug)
+    session.commit()
+    old_hash = bug.original_code_hash
+
+    other = db.session.execute(
+        db.select(Project).where(Project.id != project.id).limit(1)
+    ).scalar_one()
+    bug.status = "Fixed"
+    bug.severity = "Medium"
+    bug.project_id = other.id
+    bug.original_code = "print('update test, edited')\n"
+    session.commit()
+    assert_consistent()
+    assert old_hash not in stored_refs()
+
+    bug.project_id = None
+    session.commit()
+    assert_consistent()
+
+
+def test_delete(session, project):
+    code = "print('delete test')\n"
+    first = _new_bug(project, code)
+    second = _new_bug(project, code, status="In Progress")
+    session.add_all([first, second])
+    session.commit()
+    digest = first.original_code_hash
+    assert stored_refs()[digest] == 2
+
+    session.delete(first)
+    session.commit()
+    assert_consistent()
+    assert stored_refs()[digest] == 1
+
+    session.delete(second)
+    session.commit()
+    assert_consistent()
+    assert digest not in stored_refs()
+
+
+def test_rollback(session, project):
+    before_stats, before_refs = stored_stats(), stored_refs()
+
+    bug = _new_bug(project, "print('rollback test')\n", severity="High")
+    session.add(bug)
+    session.flush()
+    assert stored_refs()[bug.original_code_hash] == 1
+    session.rollback()
+    assert stored_stats() == before_stats
+    assert stored_refs() == before_refs
+
+    existing = db.session.execute(
+        db.select(Bug).where(Bug.original_code_hash.isnot(None)).limit(1)
+    ).scalar_one()
+    existing.status = "Closed" if existing.status != "Closed" else "Open"
+    existing.original_code = "print('rollback edit')\n"
+    session.flush()
+    session.rollback()
+    assert stored_stats() == before_stats
+    assert stored_refs() == before_refs
+
+    # The discarded deltas must not leak into the next flush
+    bug = _new_bug(project, "print('after rollback')\n")
+    session.add(bug)
+    session.commit()
+    assert_consistent()
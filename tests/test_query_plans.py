@@ -0,0 +1,52 @@
+# tests/test_query_plans.py
+import contextlib
+import io
+import re
+
+import pytest
+
+from benchmarks.query_plans import analyze, capture
+
+# (case, indexes) pairs: each case must read through one of those indexes somewhere in its plans
+EXPECTED_INDEXES = [
+    ("dashboard", "ix_bug_created_by_created_at"),
+    ("dashboard", "ix_bug_project_created_at"),
+    ("bug_list", "ix_bug_created_by_created_at"),
+    ("bug_list", "ix_bug_project_created_at"),
+    ("bug_list.admin", "ix_bug_created_at_id"),
+    # Filtered by status and severity; the planner picks either
+    ("bug_list.filtered", ("ix_bug_status_created_at", "ix_bug_severity_created_at")),
+    ("bug_activity", "ix_bug_activity_bug_id_created_at"),
+    ("trends", "ix_bug_created_by_created_at"),
+    ("trends", "ix_bug_activity_kind_bug_id_created_at"),
+    ("orm.bug_comments", "ix_comment_bug_id_created_at"),
+    ("orm.bug_histories", "ix_bug_history_bug_id_changed_at"),
+    ("orm.project_bugs", "ix_bug_project_created_at"),
+    ("orm.latest_job", "ix_analysis_job_bug_id"),
+]
+INDEX_USED = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+CASES = sorted({case for case, _ in EXPECTED_INDEXES} | {"search", "api_search", "bug_detail"})
+
+
+@pytest.fixture(scope="module")
+def report(app):
+    # Routes print their errors; keep them out of the test output
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyze(app, capture(app, CASES))
+
+
+def test_every_case_ran(report):
+    assert {row["case"] for row in report} == set(CASES)
+
+
+def test_no_full_table_scans(report):
+    failures = [(row["case"], row["full_scans"], row["sql"][:200]) for row in report if row["full_scans"]]
+    assert failures == []
+
+
+@pytest.mark.parametrize("case,indexes", EXPECTED_INDEXES)
+def test_uses_index(report, case, indexes):
+    names = (indexes,) if isinstance(indexes, str) else indexes
+    used = {match.group(1) for row in report if row["case"] == case
+            for match in map(INDEX_USED.search, row["plan"]) if match}
+    assert used & set(names), sorted(used)